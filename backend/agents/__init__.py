@@ -9,11 +9,21 @@ Adding a new subject:
   1. Create `agents/<slug>/` mirroring the PMP layout (config, instructions.md,
      knowledge_base/{chapters.py, retrieval.py, ingest.py, seed/}).
   2. Each agent module must expose: SUBJECT_NAME, SUBJECT_COLOR, SUBJECT_ICON,
-     INSTRUCTIONS, CHAPTERS, get_chapter_by_slug, build_corpus_text.
+     INSTRUCTIONS, CHAPTERS, get_chapter_by_slug, build_corpus_text — the
+     config names directly, the rest through `agents._lazy.lazy_exports` so
+     the knowledge base isn't loaded at boot.
   3. Register the slug in PREDEFINED_AGENTS below.
+
+Chapter lookups used on the request path go through a registry-wide index
+(`get_chapter`, `find_chapter_by_name`, `get_corpus_text`) instead of scanning
+each agent's chapter list. It is built once — main.py warms it at startup —
+and corpus strings are memoized per (agent, set of focus chapters).
 """
 
-from typing import Optional
+import threading
+from functools import lru_cache
+from types import ModuleType
+from typing import Iterable, Optional
 
 from agents import clf_c02 as _clf_c02
 from agents import deutsch_a1 as _deutsch_a1
@@ -26,110 +36,116 @@ from agents import deutsch_b1_lesen as _deutsch_b1_lesen
 from agents import pmp as _pmp
 
 
+class _AgentEntry(dict):
+    """A registry entry. Metadata (slug, name, color, icon, status, ...) is
+    stored up front; `instructions`, `chapters`, `get_chapter_by_slug` and
+    `build_corpus_text` are pulled from the agent package on first access,
+    which is what loads its knowledge base (see agents/_lazy.py)."""
+
+    def __init__(self, module: ModuleType, *, chapters_attr: str, **metadata) -> None:
+        super().__init__(**metadata)
+        self._module = module
+        self._lazy = {
+            "instructions": "INSTRUCTIONS",
+            "chapters": chapters_attr,
+            "get_chapter_by_slug": "get_chapter_by_slug",
+            "build_corpus_text": "build_corpus_text",
+        }
+
+    def __missing__(self, key: str):
+        if key not in self._lazy:
+            raise KeyError(key)
+        value = getattr(self._module, self._lazy[key])
+        self[key] = value
+        return value
+
+
 # `status` controls how the frontend renders the subject card:
 #   "live"    — fully integrated, click-to-launch the standard quiz flow (default).
 #   "preview" — visible but routed to a dedicated preview surface
 #               (e.g. /horen/<slug> for the B1 Hören prototype). The standard
 #               quiz endpoints can't yet handle these subjects.
 PREDEFINED_AGENTS: dict[str, dict] = {
-    "pmp": {
-        "slug": "pmp",
-        "name": _pmp.PMP_SUBJECT_NAME,
-        "color": _pmp.PMP_SUBJECT_COLOR,
-        "icon": _pmp.PMP_SUBJECT_ICON,
-        "instructions": _pmp.INSTRUCTIONS,
-        "chapters": _pmp.PMP_CHAPTERS,
-        "get_chapter_by_slug": _pmp.get_chapter_by_slug,
-        "build_corpus_text": _pmp.build_corpus_text,
-    },
-    "clf_c02": {
-        "slug": "clf_c02",
-        "name": _clf_c02.CLF_C02_SUBJECT_NAME,
-        "color": _clf_c02.CLF_C02_SUBJECT_COLOR,
-        "icon": _clf_c02.CLF_C02_SUBJECT_ICON,
-        "instructions": _clf_c02.INSTRUCTIONS,
-        "chapters": _clf_c02.CLF_C02_CHAPTERS,
-        "get_chapter_by_slug": _clf_c02.get_chapter_by_slug,
-        "build_corpus_text": _clf_c02.build_corpus_text,
-    },
-    "deutsch_a1": {
-        "slug": "deutsch_a1",
-        "name": _deutsch_a1.DEUTSCH_A1_SUBJECT_NAME,
-        "color": _deutsch_a1.DEUTSCH_A1_SUBJECT_COLOR,
-        "icon": _deutsch_a1.DEUTSCH_A1_SUBJECT_ICON,
-        "instructions": _deutsch_a1.INSTRUCTIONS,
-        "chapters": _deutsch_a1.DEUTSCH_A1_CHAPTERS,
-        "get_chapter_by_slug": _deutsch_a1.get_chapter_by_slug,
-        "build_corpus_text": _deutsch_a1.build_corpus_text,
-    },
-    "deutsch_a2": {
-        "slug": "deutsch_a2",
-        "name": _deutsch_a2.DEUTSCH_A2_SUBJECT_NAME,
-        "color": _deutsch_a2.DEUTSCH_A2_SUBJECT_COLOR,
-        "icon": _deutsch_a2.DEUTSCH_A2_SUBJECT_ICON,
-        "instructions": _deutsch_a2.INSTRUCTIONS,
-        "chapters": _deutsch_a2.DEUTSCH_A2_CHAPTERS,
-        "get_chapter_by_slug": _deutsch_a2.get_chapter_by_slug,
-        "build_corpus_text": _deutsch_a2.build_corpus_text,
-    },
-    "deutsch_b1": {
-        "slug": "deutsch_b1",
-        "name": _deutsch_b1.DEUTSCH_B1_SUBJECT_NAME,
-        "color": _deutsch_b1.DEUTSCH_B1_SUBJECT_COLOR,
-        "icon": _deutsch_b1.DEUTSCH_B1_SUBJECT_ICON,
-        "instructions": _deutsch_b1.INSTRUCTIONS,
-        "chapters": _deutsch_b1.DEUTSCH_B1_CHAPTERS,
-        "get_chapter_by_slug": _deutsch_b1.get_chapter_by_slug,
-        "build_corpus_text": _deutsch_b1.build_corpus_text,
-    },
-    "deutsch_b1_horen": {
-        "slug": "deutsch_b1_horen",
-        "name": _deutsch_b1_horen.DEUTSCH_B1_HOREN_SUBJECT_NAME,
-        "color": _deutsch_b1_horen.DEUTSCH_B1_HOREN_SUBJECT_COLOR,
-        "icon": _deutsch_b1_horen.DEUTSCH_B1_HOREN_SUBJECT_ICON,
-        "instructions": _deutsch_b1_horen.INSTRUCTIONS,
-        "chapters": _deutsch_b1_horen.DEUTSCH_B1_HOREN_CHAPTERS,
-        "get_chapter_by_slug": _deutsch_b1_horen.get_chapter_by_slug,
-        "build_corpus_text": _deutsch_b1_horen.build_corpus_text,
-        "status": "preview",
-        "preview_path": "/horen/deutsch_b1_horen",
-    },
-    "deutsch_a2_horen": {
-        "slug": "deutsch_a2_horen",
-        "name": _deutsch_a2_horen.DEUTSCH_A2_HOREN_SUBJECT_NAME,
-        "color": _deutsch_a2_horen.DEUTSCH_A2_HOREN_SUBJECT_COLOR,
-        "icon": _deutsch_a2_horen.DEUTSCH_A2_HOREN_SUBJECT_ICON,
-        "instructions": _deutsch_a2_horen.INSTRUCTIONS,
-        "chapters": _deutsch_a2_horen.DEUTSCH_A2_HOREN_CHAPTERS,
-        "get_chapter_by_slug": _deutsch_a2_horen.get_chapter_by_slug,
-        "build_corpus_text": _deutsch_a2_horen.build_corpus_text,
-        "status": "preview",
-        "preview_path": "/horen/deutsch_a2_horen",
-    },
-    "deutsch_b1_lesen": {
-        "slug": "deutsch_b1_lesen",
-        "name": _deutsch_b1_lesen.DEUTSCH_B1_LESEN_SUBJECT_NAME,
-        "color": _deutsch_b1_lesen.DEUTSCH_B1_LESEN_SUBJECT_COLOR,
-        "icon": _deutsch_b1_lesen.DEUTSCH_B1_LESEN_SUBJECT_ICON,
-        "instructions": _deutsch_b1_lesen.INSTRUCTIONS,
-        "chapters": _deutsch_b1_lesen.DEUTSCH_B1_LESEN_CHAPTERS,
-        "get_chapter_by_slug": _deutsch_b1_lesen.get_chapter_by_slug,
-        "build_corpus_text": _deutsch_b1_lesen.build_corpus_text,
-        "status": "preview",
-        "preview_path": "/lesen/deutsch_b1_lesen",
-    },
-    "deutsch_a2_lesen": {
-        "slug": "deutsch_a2_lesen",
-        "name": _deutsch_a2_lesen.DEUTSCH_A2_LESEN_SUBJECT_NAME,
-        "color": _deutsch_a2_lesen.DEUTSCH_A2_LESEN_SUBJECT_COLOR,
-        "icon": _deutsch_a2_lesen.DEUTSCH_A2_LESEN_SUBJECT_ICON,
-        "instructions": _deutsch_a2_lesen.INSTRUCTIONS,
-        "chapters": _deutsch_a2_lesen.DEUTSCH_A2_LESEN_CHAPTERS,
-        "get_chapter_by_slug": _deutsch_a2_lesen.get_chapter_by_slug,
-        "build_corpus_text": _deutsch_a2_lesen.build_corpus_text,
-        "status": "preview",
-        "preview_path": "/lesen/deutsch_a2_lesen",
-    },
+    "pmp": _AgentEntry(
+        _pmp,
+        slug="pmp",
+        name=_pmp.PMP_SUBJECT_NAME,
+        color=_pmp.PMP_SUBJECT_COLOR,
+        icon=_pmp.PMP_SUBJECT_ICON,
+        chapters_attr="PMP_CHAPTERS",
+    ),
+    "clf_c02": _AgentEntry(
+        _clf_c02,
+        slug="clf_c02",
+        name=_clf_c02.CLF_C02_SUBJECT_NAME,
+        color=_clf_c02.CLF_C02_SUBJECT_COLOR,
+        icon=_clf_c02.CLF_C02_SUBJECT_ICON,
+        chapters_attr="CLF_C02_CHAPTERS",
+    ),
+    "deutsch_a1": _AgentEntry(
+        _deutsch_a1,
+        slug="deutsch_a1",
+        name=_deutsch_a1.DEUTSCH_A1_SUBJECT_NAME,
+        color=_deutsch_a1.DEUTSCH_A1_SUBJECT_COLOR,
+        icon=_deutsch_a1.DEUTSCH_A1_SUBJECT_ICON,
+        chapters_attr="DEUTSCH_A1_CHAPTERS",
+    ),
+    "deutsch_a2": _AgentEntry(
+        _deutsch_a2,
+        slug="deutsch_a2",
+        name=_deutsch_a2.DEUTSCH_A2_SUBJECT_NAME,
+        color=_deutsch_a2.DEUTSCH_A2_SUBJECT_COLOR,
+        icon=_deutsch_a2.DEUTSCH_A2_SUBJECT_ICON,
+        chapters_attr="DEUTSCH_A2_CHAPTERS",
+    ),
+    "deutsch_b1": _AgentEntry(
+        _deutsch_b1,
+        slug="deutsch_b1",
+        name=_deutsch_b1.DEUTSCH_B1_SUBJECT_NAME,
+        color=_deutsch_b1.DEUTSCH_B1_SUBJECT_COLOR,
+        icon=_deutsch_b1.DEUTSCH_B1_SUBJECT_ICON,
+        chapters_attr="DEUTSCH_B1_CHAPTERS",
+    ),
+    "deutsch_b1_horen": _AgentEntry(
+        _deutsch_b1_horen,
+        slug="deutsch_b1_horen",
+        name=_deutsch_b1_horen.DEUTSCH_B1_HOREN_SUBJECT_NAME,
+        color=_deutsch_b1_horen.DEUTSCH_B1_HOREN_SUBJECT_COLOR,
+        icon=_deutsch_b1_horen.DEUTSCH_B1_HOREN_SUBJECT_ICON,
+        chapters_attr="DEUTSCH_B1_HOREN_CHAPTERS",
+        status="preview",
+        preview_path="/horen/deutsch_b1_horen",
+    ),
+    "deutsch_a2_horen": _AgentEntry(
+        _deutsch_a2_horen,
+        slug="deutsch_a2_horen",
+        name=_deutsch_a2_horen.DEUTSCH_A2_HOREN_SUBJECT_NAME,
+        color=_deutsch_a2_horen.DEUTSCH_A2_HOREN_SUBJECT_COLOR,
+        icon=_deutsch_a2_horen.DEUTSCH_A2_HOREN_SUBJECT_ICON,
+        chapters_attr="DEUTSCH_A2_HOREN_CHAPTERS",
+        status="preview",
+        preview_path="/horen/deutsch_a2_horen",
+    ),
+    "deutsch_b1_lesen": _AgentEntry(
+        _deutsch_b1_lesen,
+        slug="deutsch_b1_lesen",
+        name=_deutsch_b1_lesen.DEUTSCH_B1_LESEN_SUBJECT_NAME,
+        color=_deutsch_b1_lesen.DEUTSCH_B1_LESEN_SUBJECT_COLOR,
+        icon=_deutsch_b1_lesen.DEUTSCH_B1_LESEN_SUBJECT_ICON,
+        chapters_attr="DEUTSCH_B1_LESEN_CHAPTERS",
+        status="preview",
+        preview_path="/lesen/deutsch_b1_lesen",
+    ),
+    "deutsch_a2_lesen": _AgentEntry(
+        _deutsch_a2_lesen,
+        slug="deutsch_a2_lesen",
+        name=_deutsch_a2_lesen.DEUTSCH_A2_LESEN_SUBJECT_NAME,
+        color=_deutsch_a2_lesen.DEUTSCH_A2_LESEN_SUBJECT_COLOR,
+        icon=_deutsch_a2_lesen.DEUTSCH_A2_LESEN_SUBJECT_ICON,
+        chapters_attr="DEUTSCH_A2_LESEN_CHAPTERS",
+        status="preview",
+        preview_path="/lesen/deutsch_a2_lesen",
+    ),
 }
 
 
@@ -151,3 +167,70 @@ def list_agents() -> list[dict]:
         }
         for a in PREDEFINED_AGENTS.values()
     ]
+
+
+# ── chapter index ─────────────────────────────────────────────────────────────
+
+
+class _ChapterIndex:
+    def __init__(self, agents: dict[str, dict]) -> None:
+        # slug -> (chapters in order, {chapter_slug: chapter}, {chapter_slug: corpus block})
+        self.by_agent: dict[str, tuple[list[dict], dict[str, dict], dict[str, str]]] = {}
+        # chapter name -> (agent slug, chapter); the first registered agent
+        # wins if two share a chapter name.
+        self.by_name: dict[str, tuple[str, dict]] = {}
+        for agent_slug, agent in agents.items():
+            chapters = list(agent["chapters"])
+            self.by_agent[agent_slug] = (
+                chapters,
+                {c["slug"]: c for c in chapters},
+                # Same block format as each agent's build_corpus_text.
+                {c["slug"]: f"--- Chapter: {c['name']} ---\n{c['content']}" for c in chapters},
+            )
+            for c in chapters:
+                self.by_name.setdefault(c["name"], (agent_slug, c))
+
+
+_index: Optional[_ChapterIndex] = None
+_index_lock = threading.Lock()
+
+
+def _chapter_index() -> _ChapterIndex:
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = _ChapterIndex(PREDEFINED_AGENTS)
+    return _index
+
+
+def warm_chapter_index() -> None:
+    """Load every agent's chapters and build the index (startup hook)."""
+    _chapter_index()
+
+
+def get_chapter(agent_slug: str, chapter_slug: str) -> Optional[dict]:
+    """The chapter `chapter_slug` of agent `agent_slug`, or None."""
+    entry = _chapter_index().by_agent.get(agent_slug)
+    return entry[1].get(chapter_slug) if entry else None
+
+
+def find_chapter_by_name(name: str) -> tuple[Optional[str], Optional[dict]]:
+    """(agent slug, chapter) for the first agent with a chapter called `name`,
+    or (None, None)."""
+    return _chapter_index().by_name.get(name, (None, None))
+
+
+def get_corpus_text(agent_slug: str, focus_chapter_slugs: Optional[Iterable[str]] = None) -> str:
+    """`build_corpus_text` for `agent_slug`, memoized. Unknown slugs are
+    dropped before the cache lookup, and an empty selection means every
+    chapter, as in build_corpus_text."""
+    chapters_by_slug = _chapter_index().by_agent[agent_slug][1]
+    focus = frozenset(s for s in (focus_chapter_slugs or ()) if s in chapters_by_slug)
+    return _corpus_text(agent_slug, focus)
+
+
+@lru_cache(maxsize=256)
+def _corpus_text(agent_slug: str, focus: frozenset[str]) -> str:
+    chapters, _, blocks = _chapter_index().by_agent[agent_slug]
+    return "\n\n".join(blocks[c["slug"]] for c in chapters if not focus or c["slug"] in focus)
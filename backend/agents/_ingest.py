@@ -0,0 +1,268 @@
+"""
+Shared exam-bank ingest engine for predefined subjects.
+
+Each agent's `knowledge_base/ingest.py` only names its subject, seed file and
+chapters and hands off to `run_cli`. Reseeding goes:
+
+  1. validate — every row is checked and all problems are reported at once
+     (not just the first), along with content hashes repeated in the seed;
+  2. diff — the existing rows for the seed's content hashes are read in
+     batches and compared column by column, so unchanged rows are skipped
+     without being written;
+  3. upsert — new and changed rows are written INGEST_BATCH_SIZE at a time,
+     one multi-row `INSERT ... ON CONFLICT (content_hash) DO UPDATE` per
+     batch instead of one statement per row.
+
+The report counts inserted / updated / unchanged rows; inserted vs updated
+comes from Postgres itself (`xmax = 0` on the returned rows), so a row
+written by someone else between the diff and the upsert is still counted
+correctly.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from dataclasses import dataclass
+from hashlib import sha256
+from pathlib import Path
+from typing import Iterable, Iterator
+
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "1000"))
+
+VALID_QUIZ_TYPES = {"single_choice", "multiple_select", "true_or_false"}
+VALID_DIFFICULTIES = {"easy", "medium", "hard"}
+REQUIRED_FIELDS = ("chapter_slug", "stem", "quiz_type", "options", "explanation", "source")
+
+# Columns an upsert may change. `content_hash` is the key and `source` is
+# part of it, so neither is ever updated.
+UPDATABLE_COLUMNS = (
+    "subject_slug",
+    "chapter_slug",
+    "stem",
+    "quiz_type",
+    "options",
+    "correct_index",
+    "correct_option_indices",
+    "explanation",
+    "difficulty",
+)
+
+# Errors printed before "... and N more".
+_MAX_REPORTED_ERRORS = 20
+
+
+@dataclass
+class IngestReport:
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    duplicates: int = 0
+
+    @property
+    def processed(self) -> int:
+        return self.inserted + self.updated + self.unchanged
+
+
+def row_errors(row: dict, chapter_slugs: set[str]) -> list[str]:
+    """Every problem with one seed row (empty when it's valid)."""
+    if not isinstance(row, dict):
+        return ["row must be a JSON object"]
+    missing = [f for f in REQUIRED_FIELDS if f not in row]
+    if missing:
+        return [f"missing required field '{f}'" for f in missing]
+
+    errors = []
+    if row["chapter_slug"] not in chapter_slugs:
+        errors.append(f"unknown chapter_slug '{row['chapter_slug']}' (valid: {sorted(chapter_slugs)})")
+
+    quiz_type = row["quiz_type"]
+    if quiz_type not in VALID_QUIZ_TYPES:
+        errors.append(f"invalid quiz_type '{quiz_type}' (valid: {sorted(VALID_QUIZ_TYPES)})")
+
+    options = row["options"]
+    if not isinstance(options, list) or not all(isinstance(o, str) for o in options):
+        errors.append("'options' must be a list of strings")
+        return errors
+
+    if quiz_type == "true_or_false":
+        if options != ["True", "False"]:
+            errors.append("true_or_false requires options == ['True', 'False']")
+    elif quiz_type == "multiple_select":
+        if not (4 <= len(options) <= 6):
+            errors.append(f"multiple_select requires 4-6 options, got {len(options)}")
+    elif len(options) != 4:
+        errors.append(f"{quiz_type} requires exactly 4 options, got {len(options)}")
+
+    if quiz_type == "multiple_select":
+        indices = row.get("correct_option_indices")
+        if not isinstance(indices, list) or not indices:
+            errors.append("multiple_select requires 'correct_option_indices' (non-empty list of ints)")
+        elif not all(isinstance(i, int) and 0 <= i < len(options) for i in indices):
+            errors.append("'correct_option_indices' contains out-of-range value")
+    else:
+        idx = row.get("correct_index")
+        if not isinstance(idx, int) or not (0 <= idx < len(options)):
+            errors.append("'correct_index' must be an int within options range")
+
+    difficulty = row.get("difficulty", "medium")
+    if difficulty not in VALID_DIFFICULTIES:
+        errors.append(f"invalid difficulty '{difficulty}'")
+    return errors
+
+
+def validate_rows(rows: list[dict], chapter_slugs: set[str]) -> list[str]:
+    """All validation errors across `rows`, as "row N: ..." strings."""
+    return [
+        f"row {i}: {error}"
+        for i, row in enumerate(rows)
+        for error in row_errors(row, chapter_slugs)
+    ]
+
+
+def load_seed(seed_path: Path) -> list[dict]:
+    if not seed_path.exists():
+        raise FileNotFoundError(f"seed file not found: {seed_path}")
+    with seed_path.open(encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, list):
+        raise ValueError("seed file must contain a JSON array at the top level")
+    return data
+
+
+def content_hash(stem: str, source: str) -> str:
+    """Stable hash over normalized stem+source; serves as the upsert key."""
+    normalized = f"{stem.strip().lower()}|{source.strip().lower()}"
+    return sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def build_payloads(rows: Iterable[dict], subject_slug: str) -> tuple[dict[str, dict], int]:
+    """Validated seed rows → ({content_hash: column values}, duplicates).
+    A hash repeated in the seed keeps its last row, as the per-row upsert
+    did — and one multi-row upsert can't touch the same key twice anyway."""
+    payloads: dict[str, dict] = {}
+    seen = 0
+    for row in rows:
+        seen += 1
+        key = content_hash(row["stem"], row["source"])
+        payloads[key] = {
+            "content_hash": key,
+            "subject_slug": subject_slug,
+            "chapter_slug": row["chapter_slug"],
+            "stem": row["stem"],
+            "quiz_type": row["quiz_type"],
+            "options": row["options"],
+            "correct_index": row.get("correct_index"),
+            "correct_option_indices": row.get("correct_option_indices"),
+            "explanation": row["explanation"],
+            "source": row["source"],
+            "difficulty": row.get("difficulty", "medium"),
+        }
+    return payloads, seen - len(payloads)
+
+
+def _batches(items: list, size: int) -> Iterator[list]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def upsert_rows(rows: list[dict], subject_slug: str, batch_size: int = INGEST_BATCH_SIZE) -> IngestReport:
+    """Upsert validated seed rows into predefined_exam_questions tagged with
+    `subject_slug`, skipping rows whose stored columns already match."""
+    # Deferred imports so --dry-run works without DATABASE_URL.
+    from sqlalchemy import literal_column
+    from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+    from agents.pmp.knowledge_base.retrieval import exemplar_index
+    from db.database import SessionLocal
+    from db.models import PredefinedExamQuestion
+
+    batch_size = max(1, batch_size)
+    payloads, duplicates = build_payloads(rows, subject_slug)
+    report = IngestReport(duplicates=duplicates)
+    columns = [getattr(PredefinedExamQuestion, c) for c in UPDATABLE_COLUMNS]
+
+    session = SessionLocal()
+    try:
+        pending = []
+        for keys in _batches(list(payloads), batch_size):
+            stored = {
+                row[0]: row[1:]
+                for row in session.query(PredefinedExamQuestion.content_hash, *columns)
+                .filter(PredefinedExamQuestion.content_hash.in_(keys))
+            }
+            for key in keys:
+                payload = payloads[key]
+                current = stored.get(key)
+                if current is not None and current == tuple(payload[c] for c in UPDATABLE_COLUMNS):
+                    report.unchanged += 1
+                else:
+                    pending.append(payload)
+
+        for batch in _batches(pending, batch_size):
+            stmt = pg_insert(PredefinedExamQuestion).values(batch)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["content_hash"],
+                set_={c: stmt.excluded[c] for c in UPDATABLE_COLUMNS},
+            ).returning(literal_column("(xmax = 0)"))
+            for (inserted,) in session.execute(stmt):
+                if inserted:
+                    report.inserted += 1
+                else:
+                    report.updated += 1
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+    if report.inserted or report.updated:
+        # Other API processes pick the new rows up on their next refresh probe.
+        exemplar_index.invalidate()
+    return report
+
+
+def run_cli(subject_slug: str, seed_path: Path, chapter_slugs: set[str], label: str) -> int:
+    """Entry point shared by each agent's `python -m ...knowledge_base.ingest`."""
+    parser = argparse.ArgumentParser(description=f"Ingest {label} exam bank seed data.")
+    parser.add_argument("--dry-run", action="store_true", help="Validate without writing to DB.")
+    parser.add_argument(
+        "--batch-size", type=int, default=INGEST_BATCH_SIZE, help="Rows per multi-row upsert statement."
+    )
+    args = parser.parse_args()
+
+    try:
+        rows = load_seed(seed_path)
+    except (FileNotFoundError, ValueError, json.JSONDecodeError) as e:
+        print(f"ERROR loading seed: {e}", file=sys.stderr)
+        return 1
+
+    errors = validate_rows(rows, chapter_slugs)
+    if errors:
+        for error in errors[:_MAX_REPORTED_ERRORS]:
+            print(f"VALIDATION FAILED: {error}", file=sys.stderr)
+        if len(errors) > _MAX_REPORTED_ERRORS:
+            print(f"... and {len(errors) - _MAX_REPORTED_ERRORS} more", file=sys.stderr)
+        return 1
+
+    print(f"Validated {len(rows)} rows.")
+
+    if args.dry_run:
+        print("Dry run complete — no DB writes.")
+        return 0
+
+    if not rows:
+        print("No rows to ingest. Add questions to seed/exam_bank.json first.")
+        return 0
+
+    report = upsert_rows(rows, subject_slug, batch_size=args.batch_size)
+    print(
+        f"Upserted {report.processed} rows: {report.inserted} inserted, "
+        f"{report.updated} updated, {report.unchanged} unchanged."
+    )
+    if report.duplicates:
+        print(f"Note: {report.duplicates} row(s) repeat an earlier stem+source; the last one was kept.")
+    return 0
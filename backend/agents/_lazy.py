@@ -0,0 +1,37 @@
+"""
+Deferred loading for agent packages.
+
+Importing `agents` happens on every API boot (the registry feeds several
+routers), but an agent's knowledge base and instructions.md are only needed
+when a quiz for that subject is generated. Agent packages therefore import
+their `config` eagerly and expose everything else through `lazy_exports`, a
+module-level `__getattr__` (PEP 562) that imports the owning submodule — or
+reads instructions.md — on first access and caches the value on the package.
+"""
+
+from __future__ import annotations
+
+import importlib
+import sys
+from pathlib import Path
+from typing import Any, Callable
+
+
+def lazy_exports(package: str, exports: dict[str, tuple[str, ...]]) -> Callable[[str], Any]:
+    """Build a `__getattr__` for `package`. `exports` maps a relative
+    submodule (".knowledge_base.chapters") to the names it provides;
+    `INSTRUCTIONS` is always served from the package's instructions.md."""
+    owner = {name: module for module, names in exports.items() for name in names}
+
+    def __getattr__(name: str) -> Any:
+        module = sys.modules[package]
+        if name == "INSTRUCTIONS":
+            value = (Path(module.__file__).parent / "instructions.md").read_text(encoding="utf-8")
+        elif name in owner:
+            value = getattr(importlib.import_module(owner[name], package), name)
+        else:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        setattr(module, name, value)
+        return value
+
+    return __getattr__
@@ -0,0 +1,53 @@
+"""
+Progress aggregation for exams whose sections are generated in parallel.
+
+`generate_full_exam` runs every Teil on its own thread and each Teil's
+`generate_session` reports `progress(stage, current, total)` for itself.
+`MergedProgress` folds those per-section reports into one exam-wide stream:
+for each stage it keeps the latest (current, total) per section and forwards
+the sums, so "audio 3/8" means three of the exam's eight clips are rendered,
+whichever Teile they came from.
+
+`expected` pins a stage's total up front (e.g. the exam's item count) so the
+first section to report doesn't look like 100% of the stage.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Callable, Hashable, Optional
+
+ProgressFn = Callable[[str, int, int], None]
+
+
+class MergedProgress:
+    def __init__(self, progress: Optional[ProgressFn], expected: Optional[dict[str, int]] = None) -> None:
+        self._progress = progress
+        self._expected = expected or {}
+        self._lock = threading.Lock()
+        self._by_stage: dict[str, dict[Hashable, tuple[int, int]]] = {}
+
+    def for_section(self, section: Hashable) -> Optional[ProgressFn]:
+        """Per-section callback to hand to the section generator. None when
+        there is no downstream listener, so generators skip the bookkeeping."""
+        if self._progress is None:
+            return None
+
+        def report(stage: str, current: int, total: int) -> None:
+            with self._lock:
+                per_section = self._by_stage.setdefault(stage, {})
+                per_section[section] = (current, total)
+                merged_current = sum(c for c, _ in per_section.values())
+                merged_total = max(sum(t for _, t in per_section.values()), self._expected.get(stage, 0))
+                # Forwarded under the lock so the downstream sees each stage's
+                # counts in order even though sections report concurrently.
+                self._progress(stage, merged_current, merged_total)
+
+        return report
+
+    def __call__(self, stage: str, current: int, total: int) -> None:
+        """Exam-level report (e.g. "teil" completions) — passed straight through."""
+        if self._progress is None:
+            return
+        with self._lock:
+            self._progress(stage, current, total)
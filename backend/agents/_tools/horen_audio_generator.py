@@ -4,12 +4,34 @@ B1 Hören TTS audio generator — Phase 1b.
 Reads the JSON scripts produced by horen_script_generator.py and renders each
 to an MP3. Single-speaker scripts (Teil 1, Teil 2) are one TTS call. Multi-
 speaker scripts (Teil 3, Teil 4) are split into speaker turns, each rendered
-separately with a per-speaker voice, then stitched together with ffmpeg using
-a short silence between turns.
+separately with a per-speaker voice, then stitched together with a short
+silence between turns — in-process, by joining MP3 frames (mp3_frames.py),
+or with one ffmpeg pass when the turns' formats differ.
+
+Turns are rendered concurrently on one event loop per script: up to
+TTS_TURN_CONCURRENCY provider calls in flight (a semaphore around each
+attempt), each turn retried on its own with the provider's backoff, and the
+files reassembled in script order. A script takes about
+turns / TTS_TURN_CONCURRENCY times the average turn instead of the sum: a
+20-turn Teil 4 panel at 300–900 ms per call goes from ~13.8 s to ~3.4 s at
+4. TTS_TURN_CONCURRENCY=1 renders them one at a time.
+scripts/bench_tts_turns.py measures both.
+
+That semaphore is per script. Every provider call, across all scripts and
+exams in the process, is also admitted by that provider's guard
+(tts_guard.py): a process-wide in-flight cap (`max_in_flight`), so Teile and
+exams rendering side by side share it instead of multiplying the
+per-script bound, a rate limiter and a circuit breaker. While a provider
+refuses calls, segments go to TTS_FALLBACK_PROVIDER.
 
 Idempotent: re-runs skip scripts whose MP3 already exists. Use --force to
 regenerate.
 
+Every TTS segment (a single-speaker script, or one speaker turn) goes
+through the on-disk segment cache in tts_cache.py, keyed by provider, voice
+and normalised text, so regenerations and recurring turns (announcements,
+greetings) don't call the provider again. --no-cache bypasses it.
+
 Provider abstraction
 --------------------
 TTS is behind a small `TTSProvider` interface. Each provider exposes a name,
@@ -39,7 +61,8 @@ Usage:
     python -m agents._tools.horen_audio_generator --force
 
 Requires:
-    - ffmpeg on PATH (used to concat multi-speaker turns).
+    - ffmpeg on PATH, only for multi-speaker turns that can't be joined
+      in-process (mixed MP3 formats).
     - For edge_tts:   the edge-tts package (pinned in requirements.txt). No API key.
     - For openai:     the openai package + OPENAI_API_KEY in the environment.
 """
@@ -48,26 +71,40 @@ from __future__ import annotations
 
 import argparse
 import asyncio
+import contextlib
 import json
 import logging
 import os
+import random
 import re
 import shutil
 import subprocess
 import sys
 import tempfile
+import threading
 import time
 from pathlib import Path
 from typing import ClassVar
 
 from dotenv import load_dotenv
 
+from agents._tools import mp3_frames, tts_guard
+from agents._tools.tts_cache import TTSCache, cache_key
+from agents._tools.tts_cache import cache as segment_cache
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
 TURN_PAUSE_SECONDS = 0.4
 
+# Provider calls in flight at once while rendering one script's turns.
+TTS_TURN_CONCURRENCY = max(1, int(os.getenv("TTS_TURN_CONCURRENCY", "4")))
+
+# Provider to render with while the primary's circuit breaker is open (or its
+# rate-limit queue too deep); empty = no fallback, the segment fails.
+TTS_FALLBACK_PROVIDER = os.getenv("TTS_FALLBACK_PROVIDER", "")
+
 # Edge TTS sometimes returns empty audio under load (the "No audio was received"
 # error). Retry the websocket call with exponential backoff before giving up.
 EDGE_TTS_MAX_ATTEMPTS = 4
@@ -105,13 +142,23 @@ class TTSProvider:
     Adding a new provider:
       1. Subclass TTSProvider.
       2. Set `name`, `voice_map` (voice_role → concrete voice id), `default_voice`.
-      3. Implement synthesize(text, voice_role, out_path).
-      4. Register in PROVIDERS at the bottom of this file.
+      3. Implement synthesize(text, voice_role, out_path) for a blocking SDK,
+         or asynthesize(...) for an asyncio one — the other defaults to it.
+         Either is one attempt; retries (`max_attempts`,
+         `retry_backoff_seconds`) are applied by `synthesize_with_retry`.
+      4. Optionally set the process-wide limits (`max_in_flight`,
+         `rate_per_second`, `burst`; see tts_guard.py). 0 = unlimited.
+      5. Register in PROVIDERS at the bottom of this file.
     """
 
     name: ClassVar[str] = ""
     voice_map: ClassVar[dict[str, str]] = {}
     default_voice: ClassVar[str] = ""
+    max_attempts: ClassVar[int] = 1
+    retry_backoff_seconds: ClassVar[tuple[float, ...]] = ()
+    max_in_flight: ClassVar[int] = 0
+    rate_per_second: ClassVar[float] = 0.0
+    burst: ClassVar[float] = 1.0
 
     def __init__(self) -> None:
         """Override to lazy-import the underlying SDK and validate config."""
@@ -121,7 +168,11 @@ class TTSProvider:
 
     def synthesize(self, text: str, voice_role: str, out_path: Path) -> None:
         """Render `text` to an MP3 at `out_path` with the voice for `voice_role`."""
-        raise NotImplementedError
+        asyncio.run(self.asynthesize(text, voice_role, out_path))
+
+    async def asynthesize(self, text: str, voice_role: str, out_path: Path) -> None:
+        """`synthesize` as a coroutine; by default on a worker thread."""
+        await asyncio.to_thread(self.synthesize, text, voice_role, out_path)
 
 
 class EdgeTTSProvider(TTSProvider):
@@ -133,6 +184,13 @@ class EdgeTTSProvider(TTSProvider):
     """
 
     name = "edge_tts"
+    max_attempts = EDGE_TTS_MAX_ATTEMPTS
+    retry_backoff_seconds = EDGE_TTS_BACKOFF_SECONDS
+    # One script's worth of turns at once, for the whole process: the
+    # websocket endpoint starts returning empty audio under more.
+    max_in_flight = 4
+    rate_per_second = 10.0
+    burst = 10.0
     # NOTE: Microsoft retires Edge TTS voices periodically. Validate against
     # `edge-tts --list-voices | grep de-DE` if a voice starts returning
     # "No audio was received" — that's the failure mode for a removed voice.
@@ -149,39 +207,18 @@ class EdgeTTSProvider(TTSProvider):
         import edge_tts  # lazy — optional dep
         self._edge_tts = edge_tts
 
-    def synthesize(self, text: str, voice_role: str, out_path: Path) -> None:
+    async def asynthesize(self, text: str, voice_role: str, out_path: Path) -> None:
         text = (text or "").strip()
         if not text:
             raise ValueError("Edge TTS called with empty text")
 
-        voice = self.voice_for(voice_role)
-        last_err: Exception | None = None
-        for attempt in range(1, EDGE_TTS_MAX_ATTEMPTS + 1):
-            try:
-                communicate = self._edge_tts.Communicate(text, voice)
-                asyncio.run(communicate.save(str(out_path)))
-                # Edge TTS sometimes "succeeds" but writes a zero-byte file when
-                # the upstream returns no audio frames — treat that as a retry.
-                if out_path.exists() and out_path.stat().st_size > 1024:
-                    return
-                last_err = RuntimeError(
-                    f"Edge TTS produced an empty/short file ({out_path.stat().st_size if out_path.exists() else 0} bytes)"
-                )
-            except Exception as e:
-                last_err = e
-
-            if attempt < EDGE_TTS_MAX_ATTEMPTS:
-                backoff = EDGE_TTS_BACKOFF_SECONDS[attempt - 1]
-                logger.warning(
-                    "Edge TTS attempt %d/%d failed for %d-char text (%s); retrying in %.1fs",
-                    attempt, EDGE_TTS_MAX_ATTEMPTS, len(text), last_err, backoff,
-                )
-                time.sleep(backoff)
-
-        raise RuntimeError(
-            f"Edge TTS failed after {EDGE_TTS_MAX_ATTEMPTS} attempts for "
-            f"{len(text)}-char text (voice={voice}): {last_err}"
-        )
+        communicate = self._edge_tts.Communicate(text, self.voice_for(voice_role))
+        await communicate.save(str(out_path))
+        # Edge TTS sometimes "succeeds" but writes a zero-byte file when
+        # the upstream returns no audio frames — treat that as a retry.
+        size = out_path.stat().st_size if out_path.exists() else 0
+        if size <= 1024:
+            raise RuntimeError(f"Edge TTS produced an empty/short file ({size} bytes)")
 
 
 class OpenAITTSProvider(TTSProvider):
@@ -196,6 +233,9 @@ class OpenAITTSProvider(TTSProvider):
         "male_casual":           "echo",
     }
     default_voice = "alloy"
+    max_in_flight = 8
+    rate_per_second = 5.0
+    burst = 10.0
 
     def __init__(self) -> None:
         if not os.getenv("OPENAI_API_KEY"):
@@ -219,6 +259,51 @@ PROVIDERS: dict[str, type[TTSProvider]] = {
 }
 
 
+async def synthesize_with_retry(
+    provider: TTSProvider,
+    text: str,
+    voice_role: str,
+    out_path: Path,
+    slots: asyncio.Semaphore | None = None,
+) -> None:
+    """One segment, retried up to `provider.max_attempts` times. `slots`
+    bounds the script's concurrent provider calls; it is held per attempt, not during the
+    backoff, so a retrying turn doesn't hold up the others.
+
+    Every attempt is admitted by the provider's process-wide guard
+    (in-flight cap, rate limit, circuit breaker; tts_guard.py). `tts_guard.ProviderUnavailable`
+    — breaker open, queue too deep — is raised at once, not retried.
+    Backoffs are jittered so turns that failed together don't retry in
+    lockstep."""
+    guard = tts_guard.guard_for(provider)
+    last_err: Exception | None = None
+    for attempt in range(1, provider.max_attempts + 1):
+        try:
+            async with slots or contextlib.nullcontext():
+                async with guard.admit():
+                    await provider.asynthesize(text, voice_role, out_path)
+            return
+        except (ValueError, tts_guard.ProviderUnavailable):
+            raise  # bad input / provider refused: retrying won't help
+        except Exception as e:
+            last_err = e
+
+        if attempt < provider.max_attempts:
+            backoff = provider.retry_backoff_seconds[attempt - 1] * random.uniform(0.5, 1.0)
+            logger.warning(
+                "%s attempt %d/%d failed for %d-char text (%s); retrying in %.1fs",
+                provider.name, attempt, provider.max_attempts, len(text), last_err, backoff,
+            )
+            await asyncio.sleep(backoff)
+
+    if provider.max_attempts == 1:
+        raise last_err
+    raise RuntimeError(
+        f"{provider.name} failed after {provider.max_attempts} attempts for "
+        f"{len(text)}-char text (voice={provider.voice_for(voice_role)}): {last_err}"
+    )
+
+
 # ── Speaker tag parsing ───────────────────────────────────────────────────────
 
 
@@ -257,57 +342,215 @@ def parse_turns(script: str, expected_first_names: list[str]) -> list[tuple[str,
     return turns
 
 
-# ── ffmpeg stitching ──────────────────────────────────────────────────────────
+# ── Stitching ─────────────────────────────────────────────────────────────────
 
 
-def _make_silence(seconds: float, out: Path) -> None:
-    """Generate a short MP3 of silence at 24 kHz mono, matching what Azure /
-    OpenAI TTS produce — so concat doesn't re-sample."""
-    subprocess.run(
-        [
-            FFMPEG_BIN, "-y", "-loglevel", "error",
-            "-f", "lavfi", "-i", "anullsrc=channel_layout=mono:sample_rate=24000",
-            "-t", str(seconds),
-            "-c:a", "libmp3lame", "-q:a", "4",
-            str(out),
-        ],
-        check=True,
-    )
-
+class StitchStats:
+    """Per-process timings of multi-speaker stitching, by method."""
 
-def stitch_turns(turn_files: list[Path], out: Path, pause_seconds: float) -> None:
-    """Concat per-turn MP3s with `pause_seconds` of silence between each."""
-    with tempfile.TemporaryDirectory() as tmp_dir:
-        tmp = Path(tmp_dir)
-        silence = tmp / "silence.mp3"
-        _make_silence(pause_seconds, silence)
-
-        concat_list = tmp / "concat.txt"
-        with concat_list.open("w") as f:
-            for i, turn_file in enumerate(turn_files):
-                f.write(f"file '{turn_file.absolute()}'\n")
-                if i < len(turn_files) - 1:
-                    f.write(f"file '{silence.absolute()}'\n")
-
-        # Re-encode to keep MP3 timing accurate with mixed-source frames.
-        subprocess.run(
-            [
-                FFMPEG_BIN, "-y", "-loglevel", "error",
-                "-f", "concat", "-safe", "0",
-                "-i", str(concat_list),
-                "-c:a", "libmp3lame", "-q:a", "4",
-                str(out),
-            ],
-            check=True,
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._totals = {"in_process": [0, 0.0], "ffmpeg": [0, 0.0]}  # method -> [count, seconds]
+
+    def record(self, method: str, seconds: float) -> None:
+        with self._lock:
+            self._totals[method][0] += 1
+            self._totals[method][1] += seconds
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            out = {
+                method: {
+                    "count": count,
+                    "total_ms": round(seconds * 1000, 1),
+                    "avg_ms": round(seconds * 1000 / count, 1) if count else 0.0,
+                }
+                for method, (count, seconds) in self._totals.items()
+            }
+        # What the in-process joins would have cost at this process's
+        # average ffmpeg pass; unknown until ffmpeg has run at least once.
+        fast, slow = out["in_process"], out["ffmpeg"]
+        out["estimated_saved_ms"] = (
+            round(fast["count"] * (slow["avg_ms"] - fast["avg_ms"]), 1) if slow["count"] else None
         )
+        return out
+
+
+stitch_stats = StitchStats()
+
+
+def _stitch_with_ffmpeg(turn_files: list[Path], out: Path, pause_seconds: float) -> None:
+    """One ffmpeg pass: decode every turn, bring it to 24 kHz mono (what Edge
+    / OpenAI TTS produce), interleave with generated silence and re-encode."""
+    n = len(turn_files)
+    cmd = [FFMPEG_BIN, "-y", "-loglevel", "error"]
+    for turn_file in turn_files:
+        cmd += ["-i", str(turn_file)]
+    chains = [f"[{i}:a]aresample=24000,aformat=channel_layouts=mono[t{i}]" for i in range(n)]
+    if n > 1:
+        cmd += ["-f", "lavfi", "-t", str(pause_seconds), "-i", "anullsrc=channel_layout=mono:sample_rate=24000"]
+        chains.append(f"[{n}:a]asplit={n - 1}" + "".join(f"[s{i}]" for i in range(n - 1)))
+    labels = "".join(f"[t{i}]" + (f"[s{i}]" if i < n - 1 else "") for i in range(n))
+    chains.append(f"{labels}concat=n={2 * n - 1}:v=0:a=1[out]")
+    cmd += ["-filter_complex", ";".join(chains), "-map", "[out]", "-c:a", "libmp3lame", "-q:a", "4", str(out)]
+    subprocess.run(cmd, check=True)
+
+
+def stitch_turns(turn_files: list[Path], out: Path, pause_seconds: float) -> str:
+    """Concat per-turn MP3s with `pause_seconds` of silence between each.
+
+    Turns in one MP3 format are joined frame by frame in-process
+    (`mp3_frames.concat`, no decode or subprocess); otherwise one ffmpeg
+    pass re-encodes them. Returns the method used ("in_process" / "ffmpeg").
+    """
+    started = time.perf_counter()
+    joined = mp3_frames.concat([turn_file.read_bytes() for turn_file in turn_files], pause_seconds)
+    if joined is not None:
+        out.write_bytes(joined)
+        method = "in_process"
+    else:
+        logger.info("Turn formats can't be spliced; stitching %d turns with ffmpeg", len(turn_files))
+        _stitch_with_ffmpeg(turn_files, out, pause_seconds)
+        method = "ffmpeg"
+    stitch_stats.record(method, time.perf_counter() - started)
+    return method
 
 
 # ── Rendering ─────────────────────────────────────────────────────────────────
 
 
-def render_script(provider: TTSProvider, item: dict, out_path: Path) -> dict:
+_fallbacks: dict[str, TTSProvider | None] = {}
+_fallbacks_lock = threading.Lock()
+
+
+def fallback_provider(provider: TTSProvider) -> TTSProvider | None:
+    """The TTS_FALLBACK_PROVIDER instance to use when `provider` is
+    unavailable, built once per process; None if there is none (not set,
+    same as `provider`, or failed to initialise)."""
+    name = TTS_FALLBACK_PROVIDER
+    if not name or name == provider.name:
+        return None
+    with _fallbacks_lock:
+        if name not in _fallbacks:
+            try:
+                _fallbacks[name] = PROVIDERS[name]()
+            except Exception:
+                logger.warning("TTS fallback provider %r unavailable", name, exc_info=True)
+                _fallbacks[name] = None
+        return _fallbacks[name]
+
+
+async def _render_segment(
+    provider: TTSProvider,
+    text: str,
+    voice_role: str,
+    out_path: Path,
+    cache: TTSCache | None,
+    slots: asyncio.Semaphore,
+) -> bool:
+    """One segment through the segment cache (None = no cache), with the
+    fallback provider if `provider` refuses it. Returns True if it came from
+    the cache."""
+    try:
+        return await _render_segment_with(provider, text, voice_role, out_path, cache, slots)
+    except tts_guard.ProviderUnavailable as e:
+        fallback = fallback_provider(provider)
+        if fallback is None:
+            raise
+        tts_guard.guard_for(provider).record_fallback()
+        logger.warning("%s; rendering %d-char segment with %s", e, len(text), fallback.name)
+        return await _render_segment_with(fallback, text, voice_role, out_path, cache, slots)
+
+
+async def _render_segment_with(
+    provider: TTSProvider,
+    text: str,
+    voice_role: str,
+    out_path: Path,
+    cache: TTSCache | None,
+    slots: asyncio.Semaphore,
+) -> bool:
+    if cache is None or not cache.enabled:
+        await synthesize_with_retry(provider, text, voice_role, out_path, slots)
+        return False
+    voice = provider.voice_for(voice_role)
+    key = cache_key(provider.name, voice, text)
+    # Cache lookups copy files: keep them off the event loop the turns share.
+    if await asyncio.to_thread(cache.get, key, out_path):
+        return True
+    await synthesize_with_retry(provider, text, voice_role, out_path, slots)
+    await asyncio.to_thread(cache.put, key, out_path, provider=provider.name, voice=voice, chars=len(text))
+    return False
+
+
+async def _render_segments(
+    provider: TTSProvider,
+    segments: list[tuple[str, str, Path]],
+    cache: TTSCache | None,
+    concurrency: int,
+) -> int:
+    # A turn repeated within the script is rendered once and copied, so it
+    # isn't sent to the provider twice while the first render is in flight.
+    unique: dict[str, tuple[str, str, Path]] = {}
+    copies: list[tuple[Path, Path]] = []
+    for text, role, path in segments:
+        key = cache_key(provider.name, provider.voice_for(role), text)
+        if key in unique:
+            copies.append((unique[key][2], path))
+        else:
+            unique[key] = (text, role, path)
+
+    slots = asyncio.BoundedSemaphore(concurrency)
+    hits = await asyncio.gather(*(
+        _render_segment(provider, text, role, path, cache, slots)
+        for text, role, path in unique.values()
+    ))
+    for src, dst in copies:
+        shutil.copyfile(src, dst)
+    return sum(hits) + len(copies)
+
+
+def render_segments(
+    provider: TTSProvider,
+    segments: list[tuple[str, str, Path]],
+    cache: TTSCache | None = None,
+    concurrency: int | None = None,
+) -> int:
+    """Render (text, voice_role, out_path) segments on one event loop, at most
+    `concurrency` (default TTS_TURN_CONCURRENCY) provider calls at a time,
+    within the provider's process-wide `max_in_flight`.
+    Each file lands at its own path, so order is kept whatever finishes
+    first; the first failure (after its retries) is raised. Returns the
+    number of segments that didn't need a provider call (cached, or a
+    repeat of an earlier segment)."""
+    return asyncio.run(_render_segments(provider, segments, cache, concurrency or TTS_TURN_CONCURRENCY))
+
+
+def render_script(
+    provider: TTSProvider,
+    item: dict,
+    out_path: Path,
+    cache: TTSCache | None = segment_cache,
+    concurrency: int | None = None,
+) -> dict:
     """Render one script item to one MP3 at `out_path`. Returns a small dict
-    summary (voices used, turn count) for logging."""
+    summary (voices used, turn count, segments that needed no provider
+    call) for logging. `concurrency` bounds parallel turn renders (see
+    `render_segments`)."""
+    try:
+        return _render_script(provider, item, out_path, cache, concurrency)
+    finally:
+        if cache is not None:
+            cache.flush()
+
+
+def _render_script(
+    provider: TTSProvider,
+    item: dict,
+    out_path: Path,
+    cache: TTSCache | None,
+    concurrency: int | None,
+) -> dict:
     script_text = item.get("script") or ""
     if not script_text.strip():
         raise ValueError("empty 'script' field")
@@ -315,14 +558,14 @@ def render_script(provider: TTSProvider, item: dict, out_path: Path) -> dict:
     speakers = item.get("speakers") or []
     if not isinstance(speakers, list) or not speakers:
         # Fallback — treat as single-speaker with the provider's default voice
-        provider.synthesize(script_text, "", out_path)
-        return {"speakers": 0, "turns": 1, "voices": [provider.default_voice]}
+        hits = render_segments(provider, [(script_text, "", out_path)], cache)
+        return {"speakers": 0, "turns": 1, "voices": [provider.default_voice], "cache_hits": hits}
 
     # Single speaker: one TTS call, no stitching needed.
     if len(speakers) == 1:
         role = speakers[0].get("voice_role", "")
-        provider.synthesize(script_text, role, out_path)
-        return {"speakers": 1, "turns": 1, "voices": [provider.voice_for(role)]}
+        hits = render_segments(provider, [(script_text, role, out_path)], cache)
+        return {"speakers": 1, "turns": 1, "voices": [provider.voice_for(role)], "cache_hits": hits}
 
     # Multi-speaker: parse turns, render each, stitch.
     speaker_first_names = [s["name"].split()[0] for s in speakers if s.get("name")]
@@ -340,17 +583,16 @@ def render_script(provider: TTSProvider, item: dict, out_path: Path) -> dict:
 
     with tempfile.TemporaryDirectory() as tmp_dir:
         tmp = Path(tmp_dir)
-        turn_files: list[Path] = []
+        segments: list[tuple[str, str, Path]] = []
         voices_used: list[str] = []
         for i, (speaker, text) in enumerate(turns):
             role = role_by_name.get(speaker, "")
             voices_used.append(provider.voice_for(role))
-            turn_path = tmp / f"turn_{i:03d}.mp3"
-            provider.synthesize(text, role, turn_path)
-            turn_files.append(turn_path)
-        stitch_turns(turn_files, out_path, TURN_PAUSE_SECONDS)
+            segments.append((text, role, tmp / f"turn_{i:03d}.mp3"))
+        cache_hits = render_segments(provider, segments, cache, concurrency)
+        stitch_turns([path for _, _, path in segments], out_path, TURN_PAUSE_SECONDS)
 
-    return {"speakers": len(speakers), "turns": len(turns), "voices": voices_used}
+    return {"speakers": len(speakers), "turns": len(turns), "voices": voices_used, "cache_hits": cache_hits}
 
 
 # ── CLI ───────────────────────────────────────────────────────────────────────
@@ -385,11 +627,19 @@ def main() -> int:
         action="store_true",
         help="Re-render even if the target MP3 already exists.",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Call the provider for every segment instead of reusing cached TTS audio.",
+    )
     args = parser.parse_args()
 
     if not shutil.which("ffmpeg"):
-        print("ERROR: ffmpeg not found on PATH (required for multi-speaker stitching).", file=sys.stderr)
-        return 1
+        print(
+            "WARNING: ffmpeg not found on PATH — multi-speaker scripts whose turns "
+            "can't be joined in-process will fail.",
+            file=sys.stderr,
+        )
 
     backend_root = Path(__file__).parent.parent.parent  # backend/
     input_path = Path(args.input) if args.input else (
@@ -439,7 +689,7 @@ def main() -> int:
             continue
 
         try:
-            summary = render_script(provider, item, out_path)
+            summary = render_script(provider, item, out_path, cache=None if args.no_cache else segment_cache)
         except Exception as e:
             print(f"  [{idx + 1:>3}] FAIL Teil {teil} ({context}): {e}", file=sys.stderr)
             failed += 1
@@ -448,13 +698,26 @@ def main() -> int:
         size_kb = out_path.stat().st_size // 1024
         print(
             f"  [{idx + 1:>3}] OK   Teil {teil} ({context}): "
-            f"{summary['speakers']}-speaker, {summary['turns']} turn(s), "
+            f"{summary['speakers']}-speaker, {summary['turns']} turn(s) ({summary['cache_hits']} cached), "
             f"voices={summary['voices']}, {size_kb}KB → {out_path.name}"
         )
         rendered += 1
 
     print()
     print(f"Rendered: {rendered}, Skipped: {skipped}, Failed: {failed}")
+    if not args.no_cache and segment_cache.enabled:
+        stats = segment_cache.stats()
+        print(
+            f"TTS cache: {stats['hits']} hit(s), {stats['misses']} miss(es), "
+            f"{stats['entries']} segment(s) / {stats['bytes'] // 1024}KB in {stats['directory']}"
+        )
+    stitched = stitch_stats.snapshot()
+    if stitched["in_process"]["count"] or stitched["ffmpeg"]["count"]:
+        print(
+            f"Stitching: {stitched['in_process']['count']} in-process "
+            f"({stitched['in_process']['avg_ms']} ms avg), {stitched['ffmpeg']['count']} via ffmpeg "
+            f"({stitched['ffmpeg']['avg_ms']} ms avg)"
+        )
     print(f"Output:   {output_dir}")
     if rendered or skipped:
         print()
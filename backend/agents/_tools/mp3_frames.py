@@ -0,0 +1,220 @@
+"""
+MPEG audio Layer III frame splicing for Hören turn stitching.
+
+Every TTS provider returns self-contained MP3s, and an MP3 stream is just a
+sequence of independent frames: turns recorded in the same format (MPEG
+version, sample rate, mono/stereo) can be joined by concatenating their
+frames, with no decode or re-encode. `concat` does that:
+
+  - ID3v2 / ID3v1 tags are stripped, and so is a leading Xing/Info/VBRI
+    frame (it describes the single file, not the joined one);
+  - the pause between turns is "digital silence" frames — a header plus
+    zeroed side info, which every decoder plays as silence — built once per
+    (format, bitrate) and cached;
+  - an Info (constant bitrate) or Xing (mixed bitrates) frame is written
+    first with the joined frame and byte counts, so players show the right
+    duration and can seek.
+
+It returns None whenever the inputs can't be joined safely — not Layer III,
+formats that differ between turns, a first audio frame that borrows bits
+from a previous file (bit reservoir), or bytes that aren't frames — and the
+caller falls back to re-encoding with ffmpeg.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+# version bits -> sample rates by index
+_SAMPLE_RATES = {
+    0b11: (44100, 48000, 32000),  # MPEG-1
+    0b10: (22050, 24000, 16000),  # MPEG-2
+    0b00: (11025, 12000, 8000),   # MPEG-2.5
+}
+# Layer III bitrates (kbit/s) by index; 0 = free format, 15 = invalid.
+_BITRATES_V1 = (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320)
+_BITRATES_V2 = (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160)
+
+_MONO = 0b11
+_LAYER_III = 0b01
+
+
+@dataclass(frozen=True)
+class FrameFormat:
+    """What has to match for frames to share one stream."""
+
+    version: int       # version bits
+    sr_index: int
+    mono: bool
+
+    @property
+    def sample_rate(self) -> int:
+        return _SAMPLE_RATES[self.version][self.sr_index]
+
+    @property
+    def samples_per_frame(self) -> int:
+        return 1152 if self.version == 0b11 else 576
+
+    @property
+    def side_info_size(self) -> int:
+        if self.version == 0b11:
+            return 17 if self.mono else 32
+        return 9 if self.mono else 17
+
+    def bitrate(self, index: int) -> int:
+        return (_BITRATES_V1 if self.version == 0b11 else _BITRATES_V2)[index]
+
+    def frame_size(self, bitrate_index: int, padding: int = 0) -> int:
+        coefficient = 144 if self.version == 0b11 else 72
+        return coefficient * self.bitrate(bitrate_index) * 1000 // self.sample_rate + padding
+
+
+@dataclass
+class _Parsed:
+    fmt: FrameFormat
+    header: bytes           # first audio frame's header, the template for generated frames
+    frames: list[bytes]
+    bitrate_indices: list[int]
+
+
+def _header_fields(data: bytes, pos: int) -> Optional[tuple]:
+    if pos + 4 > len(data) or data[pos] != 0xFF or data[pos + 1] & 0xE0 != 0xE0:
+        return None
+    b1, b2, b3 = data[pos + 1], data[pos + 2], data[pos + 3]
+    version = (b1 >> 3) & 0b11
+    layer = (b1 >> 1) & 0b11
+    protected = not (b1 & 1)
+    bitrate_index = b2 >> 4
+    sr_index = (b2 >> 2) & 0b11
+    padding = (b2 >> 1) & 1
+    channel_mode = b3 >> 6
+    if version == 0b01 or layer != _LAYER_III or bitrate_index in (0, 15) or sr_index == 3:
+        return None
+    fmt = FrameFormat(version=version, sr_index=sr_index, mono=channel_mode == _MONO)
+    return fmt, bitrate_index, padding, protected
+
+
+def _skip_id3v2(data: bytes) -> int:
+    if data[:3] != b"ID3" or len(data) < 10:
+        return 0
+    size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+    return 10 + size + (10 if data[5] & 0x10 else 0)
+
+
+def _is_info_frame(frame: bytes, fmt: FrameFormat, protected: bool) -> bool:
+    offset = 4 + (2 if protected else 0) + fmt.side_info_size
+    return frame[offset:offset + 4] in (b"Xing", b"Info") or frame[36:40] == b"VBRI"
+
+
+def _main_data_begin(frame: bytes, fmt: FrameFormat, protected: bool) -> int:
+    offset = 4 + (2 if protected else 0)
+    if fmt.version == 0b11:
+        return (frame[offset] << 1) | (frame[offset + 1] >> 7)  # 9 bits
+    return frame[offset]                                         # 8 bits
+
+
+def parse(data: bytes) -> Optional[_Parsed]:
+    """The Layer III frames of one MP3 file, or None if it isn't one we can
+    splice."""
+    end = len(data)
+    if end >= 128 and data[end - 128:end - 125] == b"TAG":
+        end -= 128
+    pos = _skip_id3v2(data)
+    parsed: Optional[_Parsed] = None
+    while pos < end:
+        fields = _header_fields(data, pos)
+        if fields is None:
+            return None
+        fmt, bitrate_index, padding, protected = fields
+        size = fmt.frame_size(bitrate_index, padding)
+        if pos + size > end:
+            return None
+        frame = data[pos:pos + size]
+        pos += size
+        if parsed is None:
+            if _is_info_frame(frame, fmt, protected):
+                continue
+            if _main_data_begin(frame, fmt, protected) != 0:
+                return None
+            parsed = _Parsed(fmt=fmt, header=frame[:4], frames=[], bitrate_indices=[])
+        elif fmt != parsed.fmt:
+            return None
+        parsed.frames.append(frame)
+        parsed.bitrate_indices.append(bitrate_index)
+    return parsed if parsed is not None and parsed.frames else None
+
+
+def _with_bitrate(header: bytes, bitrate_index: int) -> bytes:
+    """`header` with no CRC, no padding, mode extension cleared and the given
+    bitrate."""
+    return bytes((
+        header[0],
+        header[1] | 0x01,
+        (bitrate_index << 4) | (header[2] & 0x0C) | (header[2] & 0x01),
+        header[3] & 0xCF,
+    ))
+
+
+def silence_frame(header: bytes, bitrate_index: int) -> bytes:
+    """One frame that decodes to silence, in the format of `header`: zero
+    side info means no main data and all-zero spectral values."""
+    return _silence_frame(_with_bitrate(header, bitrate_index))
+
+
+@lru_cache(maxsize=64)
+def _silence_frame(header: bytes) -> bytes:
+    fields = _header_fields(header, 0)
+    if fields is None:
+        raise ValueError("not a Layer III frame header")
+    fmt, bitrate_index = fields[0], fields[1]
+    return header + bytes(fmt.frame_size(bitrate_index) - 4)
+
+
+def _info_frame(header: bytes, fmt: FrameFormat, bitrate_index: int, vbr: bool, frames: int, size: int) -> bytes:
+    """Xing/Info frame carrying the frame and byte counts of the stream."""
+    tag_offset = 4 + fmt.side_info_size
+    needed = tag_offset + 16
+    while fmt.frame_size(bitrate_index) < needed:
+        # Too small for the tag at the stream's bitrate (only the lowest
+        # MPEG-2.5 rates); a bigger frame makes the stream mixed-rate.
+        bitrate_index += 1
+        vbr = True
+    frame = bytearray(silence_frame(header, bitrate_index))
+    total = size + len(frame)
+    frame[tag_offset:needed] = (
+        (b"Xing" if vbr else b"Info")
+        + (0x03).to_bytes(4, "big")  # frames + bytes fields present
+        + frames.to_bytes(4, "big")
+        + total.to_bytes(4, "big")
+    )
+    return bytes(frame)
+
+
+def concat(files: list[bytes], pause_seconds: float) -> Optional[bytes]:
+    """`files` joined frame by frame with `pause_seconds` of silence between
+    them, or None if they can't be spliced (see module docstring)."""
+    parsed = [parse(data) for data in files]
+    if not parsed or any(p is None for p in parsed) or len({p.fmt for p in parsed}) != 1:
+        return None
+    fmt = parsed[0].fmt
+    header = parsed[0].header
+    bitrates = Counter(i for p in parsed for i in p.bitrate_indices)
+    bitrate_index = bitrates.most_common(1)[0][0]
+
+    pause_frames = round(pause_seconds * fmt.sample_rate / fmt.samples_per_frame)
+    pause = silence_frame(header, bitrate_index) * pause_frames
+
+    body = bytearray()
+    frame_count = 0
+    for i, p in enumerate(parsed):
+        if i:
+            body += pause
+            frame_count += pause_frames
+        for frame in p.frames:
+            body += frame
+        frame_count += len(p.frames)
+    vbr = len(bitrates) > 1
+    return _info_frame(header, fmt, bitrate_index, vbr, frame_count, len(body)) + bytes(body)
@@ -0,0 +1,38 @@
+"""
+Topic rotation for the German exam generators.
+
+Each Teil's generator assigns the model one scenario from the Teil's topic
+catalog (TOPICS_BY_TEIL). A plain `random.choice` per item lets the same
+scenario come up in back-to-back exams — and, for Teile with several items
+(Hören Teil 1 has five), twice within one exam. Since the exam inventory
+(exam_inventory.py) generates exams back to back to stock its pool, that
+would show up as a shelf of near-identical exams.
+
+`pick(key, pool)` still picks at random, but only among the topics not
+handed out in the last len(pool) // 2 picks for the same key (one key per
+level and Teil), so a scenario can't come round again until half the
+catalog has been used. State is per process and isn't persisted.
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+from collections import deque
+from typing import Hashable, Sequence
+
+_recent: dict[Hashable, deque] = {}
+_lock = threading.Lock()
+
+
+def pick(key: Hashable, pool: Sequence[str]) -> str:
+    """A random topic from `pool` that `key` hasn't had recently. Empty
+    string for an empty pool."""
+    if not pool:
+        return ""
+    with _lock:
+        recent = _recent.setdefault(key, deque(maxlen=max(len(pool) // 2, 1)))
+        fresh = [topic for topic in pool if topic not in recent]
+        topic = random.choice(fresh or list(pool))
+        recent.append(topic)
+        return topic
@@ -0,0 +1,291 @@
+"""
+Content-addressed cache of rendered TTS segments for Hören audio.
+
+Every segment `render_script` sends to a provider (a whole single-speaker
+script, or one speaker turn) is keyed by sha256(provider, voice id,
+normalised text) and its MP3 kept on disk. Recurring phrases — station
+announcements, greetings, speaker intros — and regenerations of a failed
+exam are then copied from disk instead of costing a TTS round trip.
+
+Layout: one `<key>.mp3` per segment plus `index.json` (size, last use,
+provider, voice, length per key) in TTS_CACHE_DIR. The total size is kept
+under TTS_CACHE_MAX_MB by evicting the least recently used segments;
+TTS_CACHE_MAX_MB=0 turns the cache off.
+
+`get` and `put` copy the segment and update the in-memory index; `flush`
+(called once per rendered script) writes index.json. Callers on an event
+loop run them with asyncio.to_thread. The lock only covers the in-memory
+index: copies and directory scans run outside it, so one thread's disk I/O
+never stalls another's lookups.
+
+Files are written to a temp name and renamed into place, so workers sharing
+the directory never read a half-written segment. Each process keeps its own
+view of the index and evicts against it as it puts; `flush` first merges
+the index.json other processes wrote (their segments and last-use times)
+and evicts against that total. At most once a minute, or whenever the
+cache is near its bound, it also re-scans the directory — adopting MP3s
+nobody indexed, dropping entries whose file is gone. So the bound holds
+across all the workers sharing TTS_CACHE_DIR, overshooting by at most the
+segments each is rendering between flushes. A cache failure is logged and treated as
+a miss — the segment is just rendered as before.
+
+Text is normalised the way `parse_turns` already collapses turn bodies
+(whitespace runs → one space, trimmed), plus Unicode NFC, so the same
+sentence typed with different line wrapping or composed umlauts hits the
+same entry.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+TTS_CACHE_DIR = Path(
+    os.getenv("TTS_CACHE_DIR")
+    or Path(__file__).resolve().parent.parent.parent / "uploads" / "tts_cache"
+)
+TTS_CACHE_MAX_MB = int(os.getenv("TTS_CACHE_MAX_MB", "512"))
+
+_INDEX_FILE = "index.json"
+# How often `flush` re-scans the directory rather than only merging
+# index.json, and the fill level past which it re-scans on every flush.
+_RESYNC_SECONDS = 60.0
+_RESYNC_FILL = 0.9
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFC", text or "").split())
+
+
+def cache_key(provider: str, voice: str, text: str) -> str:
+    raw = "\x00".join((provider, voice, normalize_text(text)))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+    def __init__(self, directory: Path, max_bytes: int) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        # Guards the in-memory index only; segment copies and directory
+        # scans run outside it.
+        self._lock = threading.Lock()
+        # key -> {"size", "last_used", ...}, least recently used first.
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self._bytes = 0
+        self._loaded = False
+        self._dirty = False
+        self._synced_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.mp3"
+
+    def _read_index(self) -> dict:
+        try:
+            index = json.loads((self.directory / _INDEX_FILE).read_text())
+        except (OSError, ValueError):
+            return {}
+        return index if isinstance(index, dict) else {}
+
+    def _scan(self) -> dict[str, os.stat_result]:
+        """Stat every MP3 in the directory. Not called under the lock."""
+        files = {}
+        for path in self.directory.glob("*.mp3"):
+            try:
+                files[path.stem] = path.stat()
+            except OSError:
+                continue
+        return files
+
+    def _merge(self, index: dict, files: dict | None = None, scanned_at: float = 0.0) -> None:
+        """Rebuild the entries from this process's entries and `index` (the
+        later last use wins). With `files` (a `_scan` started at
+        `scanned_at`) the directory is the source of truth: MP3s nobody
+        indexed are adopted, entries whose file is gone dropped — except
+        ones put while the scan ran. Called under the lock."""
+        if files is None:
+            keys = set(self._entries) | {
+                key for key, meta in index.items()
+                if isinstance(meta, dict) and isinstance(meta.get("size"), int)
+            }
+        else:
+            keys = set(files) | {
+                key for key, meta in self._entries.items() if meta["last_used"] >= scanned_at
+            }
+        merged = []
+        for key in keys:
+            ours, theirs = self._entries.get(key), index.get(key)
+            theirs = theirs if isinstance(theirs, dict) else {}
+            meta = dict(ours or theirs)
+            stat = files.get(key) if files is not None else None
+            if stat is not None:
+                meta["size"] = stat.st_size
+            last_used = [
+                m["last_used"] for m in (meta, theirs) if isinstance(m.get("last_used"), (int, float))
+            ]
+            meta["last_used"] = max(last_used) if last_used else (stat.st_mtime if stat else time.time())
+            merged.append((meta["last_used"], key, meta))
+        self._entries = OrderedDict((key, meta) for _, key, meta in sorted(merged))
+        self._bytes = sum(meta["size"] for meta in self._entries.values())
+
+    def _resync_due(self) -> bool:
+        return (
+            time.monotonic() - self._synced_at >= _RESYNC_SECONDS
+            or self._bytes >= self.max_bytes * _RESYNC_FILL
+        )
+
+    def _load(self) -> None:
+        """Read the index and reconcile it with the MP3s on disk, once, on
+        first use. Takes the lock itself."""
+        if self._loaded:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        scanned_at = time.time()
+        index, files = self._read_index(), self._scan()
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            self._merge(index, files, scanned_at)
+            self._synced_at = time.monotonic()
+            self._dirty = len(self._entries) != len(index)
+            self._evict()
+
+    def _evict(self) -> None:
+        while self._bytes > self.max_bytes and self._entries:
+            key, meta = self._entries.popitem(last=False)
+            self._bytes -= meta["size"]
+            self._path(key).unlink(missing_ok=True)
+            self.evictions += 1
+            self._dirty = True
+
+    def _save_index(self) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".index-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp, self.directory / _INDEX_FILE)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        self._dirty = False
+
+    def get(self, key: str, out_path: Path) -> bool:
+        """Copy the cached segment for `key` to `out_path`; False on a miss."""
+        try:
+            self._load()
+            with self._lock:
+                hit = key in self._entries
+            if hit:
+                shutil.copyfile(self._path(key), out_path)
+        except FileNotFoundError:
+            # Evicted, by this worker or another one sharing the directory,
+            # since the lookup.
+            with self._lock:
+                meta = self._entries.pop(key, None)
+                if meta is not None:
+                    self._bytes -= meta["size"]
+                    self._dirty = True
+            hit = False
+        except OSError:
+            logger.warning("TTS cache read failed for %s", key, exc_info=True)
+            hit = False
+        with self._lock:
+            if not hit:
+                self.misses += 1
+                return False
+            meta = self._entries.get(key)
+            if meta is not None:
+                self._entries.move_to_end(key)
+                meta["last_used"] = time.time()
+                self._dirty = True
+            self.hits += 1
+            return True
+
+    def put(self, key: str, src_path: Path, **meta) -> None:
+        """Store the freshly rendered MP3 at `src_path` under `key`."""
+        try:
+            self._load()
+            size = src_path.stat().st_size
+            if size > self.max_bytes:
+                return
+            fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".seg-", suffix=".tmp")
+            os.close(fd)
+            try:
+                shutil.copyfile(src_path, tmp)
+                os.replace(tmp, self._path(key))
+            except BaseException:
+                Path(tmp).unlink(missing_ok=True)
+                raise
+            with self._lock:
+                old = self._entries.pop(key, None)
+                if old is not None:
+                    self._bytes -= old["size"]
+                self._entries[key] = {"size": size, "last_used": time.time(), **meta}
+                self._bytes += size
+                self._evict()
+                self._dirty = True
+        except OSError:
+            logger.warning("TTS cache write failed for %s", key, exc_info=True)
+
+    def flush(self) -> None:
+        """Write the index if anything changed since the last flush, after
+        merging the one other workers last wrote and evicting against the
+        total. Every _RESYNC_SECONDS, or when the cache nears its bound,
+        the directory itself is re-scanned as well."""
+        with self._lock:
+            if not self._dirty:
+                return
+            resync = self._resync_due()
+        try:
+            scanned_at = time.time()
+            index = self._read_index()
+            files = self._scan() if resync else None
+            with self._lock:
+                self._merge(index, files, scanned_at)
+                if resync:
+                    self._synced_at = time.monotonic()
+                self._evict()
+                self._save_index()
+        except OSError:
+            logger.warning("TTS cache index write failed", exc_info=True)
+
+    def stats(self) -> dict:
+        if self.enabled:
+            try:
+                self._load()
+            except OSError:
+                logger.warning("TTS cache load failed", exc_info=True)
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "directory": str(self.directory),
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+
+cache = TTSCache(TTS_CACHE_DIR, TTS_CACHE_MAX_MB * 1024 * 1024)
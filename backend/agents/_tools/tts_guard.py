@@ -0,0 +1,346 @@
+"""
+Process-wide admission control for TTS providers.
+
+Hören exams render on the generation worker pool, four Teile at a time, each
+script on its own event loop (see horen_audio_generator.render_segments).
+Without a shared limit, every one of those loops hits the provider as fast
+as it can, and when the upstream starts failing each turn retries on its
+own — a retry storm that slows every exam in the process down together.
+
+Every provider attempt (`synthesize_with_retry`) now goes through the
+provider's `ProviderGuard`, shared by all threads and loops of the process:
+
+  - an in-flight cap (`max_in_flight`) bounds the provider's concurrent
+    calls across every script and exam. A script's own semaphore
+    (TTS_TURN_CONCURRENCY) only bounds that script, so four Teile rendering
+    at once, or several exams, would otherwise multiply it. The slot is a
+    threading semaphore, waited for on a worker thread (asyncio.to_thread),
+    since the callers are on different event loops;
+  - a token bucket caps the call rate (`rate_per_second`, `burst`); callers
+    reserve a token and sleep until it's theirs, so waiting costs no CPU and
+    calls go out in arrival order. A wait longer than
+    TTS_QUEUE_TIMEOUT_SECONDS is refused instead of queued;
+  - a circuit breaker opens after TTS_BREAKER_FAILURES consecutive failed
+    calls and refuses calls for TTS_BREAKER_COOLDOWN_SECONDS, then lets one
+    trial call through (half-open): success closes it, failure re-opens it.
+
+A refused call raises `ProviderUnavailable` without touching the network;
+the renderer doesn't retry it but falls back to TTS_FALLBACK_PROVIDER, if
+one is configured. A call that waits longer than TTS_QUEUE_TIMEOUT_SECONDS
+for an in-flight slot is refused the same way. Limits are per provider:
+class attributes on the provider, overridable with
+TTS_<NAME>_MAX_IN_FLIGHT / TTS_<NAME>_RATE_PER_SECOND / TTS_<NAME>_BURST
+(e.g. TTS_EDGE_TTS_MAX_IN_FLIGHT). Counters — queue depth, waits,
+breaker state, refusals, fallbacks — are served on GET /admin/metrics/tts.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+logger = logging.getLogger(__name__)
+
+TTS_BREAKER_FAILURES = int(os.getenv("TTS_BREAKER_FAILURES", "5"))
+TTS_BREAKER_COOLDOWN_SECONDS = float(os.getenv("TTS_BREAKER_COOLDOWN_SECONDS", "30"))
+TTS_QUEUE_TIMEOUT_SECONDS = float(os.getenv("TTS_QUEUE_TIMEOUT_SECONDS", "60"))
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class ProviderUnavailable(RuntimeError):
+    """The provider's breaker is open or its queue is too long; no call was made."""
+
+
+class TokenBucket:
+    """`rate` tokens per second, up to `burst` banked. rate <= 0 = unlimited."""
+
+    def __init__(self, rate: float, burst: float) -> None:
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token; returns how many seconds until it may be used.
+        The balance can go negative — later callers queue behind earlier
+        reservations."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    def refund(self) -> None:
+        """Give back a reservation that won't be used."""
+        if self.rate <= 0:
+            return
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + 1)
+
+
+class InFlightLimit:
+    """At most `limit` calls at once across every thread and event loop of
+    the process. limit <= 0 = unlimited."""
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self._slots = threading.BoundedSemaphore(limit) if limit > 0 else None
+
+    async def acquire(self, timeout: float) -> bool:
+        """Take a slot, waiting up to `timeout` seconds on a worker thread so
+        the caller's event loop keeps running its other turns. False if none
+        freed up in time."""
+        if self._slots is None or self._slots.acquire(blocking=False):
+            return True
+        lock = threading.Lock()
+        state = {"taken": False, "abandoned": False}
+
+        def wait() -> bool:
+            taken = self._slots.acquire(timeout=timeout)
+            with lock:
+                if taken and state["abandoned"]:
+                    self._slots.release()
+                    return False
+                state["taken"] = taken
+            return taken
+
+        try:
+            return await asyncio.to_thread(wait)
+        except BaseException:
+            # Cancelled while the thread waits on: whichever side finishes
+            # second hands the slot back.
+            with lock:
+                state["abandoned"] = True
+                if state["taken"]:
+                    self._slots.release()
+            raise
+
+    def release(self) -> None:
+        if self._slots is not None:
+            self._slots.release()
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int, cooldown_seconds: float) -> None:
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown_seconds = cooldown_seconds
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self.opens = 0
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.cooldown_seconds:
+                self.state = HALF_OPEN
+                self._probing = False
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self) -> bool:
+        """Count a failed call; True if that opened the breaker."""
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self.state == HALF_OPEN or (self.state == CLOSED and self._failures >= self.failure_threshold):
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+                self.opens += 1
+                return True
+            return False
+
+    def release(self) -> None:
+        """An admitted call ended without a verdict (cancelled, bad input)."""
+        with self._lock:
+            self._probing = False
+
+
+class ProviderGuard:
+    def __init__(
+        self,
+        name: str,
+        rate_per_second: float,
+        burst: float,
+        max_in_flight: int = 0,
+        failure_threshold: int = TTS_BREAKER_FAILURES,
+        cooldown_seconds: float = TTS_BREAKER_COOLDOWN_SECONDS,
+        queue_timeout: float = TTS_QUEUE_TIMEOUT_SECONDS,
+    ) -> None:
+        self.name = name
+        self.bucket = TokenBucket(rate_per_second, burst)
+        self.slots = InFlightLimit(max_in_flight)
+        self.breaker = CircuitBreaker(failure_threshold, cooldown_seconds)
+        self.queue_timeout = queue_timeout
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._in_flight = 0
+        self._counts = {
+            "calls": 0, "failures": 0, "throttled": 0, "slot_waits": 0, "refused_open": 0,
+            "refused_queue": 0, "refused_slots": 0, "fallbacks": 0, "max_waiting": 0,
+        }
+        self._waited_seconds = 0.0
+
+    def _bump(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self._counts[key] += n
+
+    async def _take_slot(self) -> None:
+        """Wait for one of the provider's in-flight slots; ProviderUnavailable
+        if none frees up within the queue timeout."""
+        if self.slots.limit <= 0:
+            return
+        with self._lock:
+            self._waiting += 1
+            self._counts["max_waiting"] = max(self._counts["max_waiting"], self._waiting)
+        started = time.monotonic()
+        try:
+            acquired = await self.slots.acquire(self.queue_timeout)
+        finally:
+            with self._lock:
+                self._waiting -= 1
+        if not acquired:
+            self._bump("refused_slots")
+            raise ProviderUnavailable(
+                f"{self.name}: {self.slots.limit} calls in flight for {self.queue_timeout:.0f}s"
+            )
+        waited = time.monotonic() - started
+        if waited >= 0.001:
+            with self._lock:
+                self._counts["slot_waits"] += 1
+                self._waited_seconds += waited
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        """Wait for an in-flight slot and the provider's rate limit, then run
+        the caller's one attempt; its outcome feeds the breaker. Raises
+        ProviderUnavailable instead if the breaker is open or either wait
+        would be too long."""
+        if not self.breaker.allow():
+            self._bump("refused_open")
+            raise ProviderUnavailable(f"{self.name}: circuit open after repeated failures")
+        try:
+            await self._take_slot()
+        except BaseException:
+            self.breaker.release()
+            raise
+
+        try:
+            wait = self.bucket.reserve()
+            if wait > self.queue_timeout:
+                self.bucket.refund()
+                self.breaker.release()
+                self._bump("refused_queue")
+                raise ProviderUnavailable(f"{self.name}: rate-limit queue is {wait:.0f}s deep")
+
+            if wait > 0:
+                with self._lock:
+                    self._waiting += 1
+                    self._counts["throttled"] += 1
+                    self._counts["max_waiting"] = max(self._counts["max_waiting"], self._waiting)
+                    self._waited_seconds += wait
+                try:
+                    await asyncio.sleep(wait)
+                except BaseException:
+                    self.bucket.refund()
+                    self.breaker.release()
+                    raise
+                finally:
+                    with self._lock:
+                        self._waiting -= 1
+
+            with self._lock:
+                self._in_flight += 1
+                self._counts["calls"] += 1
+            try:
+                yield
+            except ValueError:
+                self.breaker.release()  # bad input says nothing about the provider
+                raise
+            except Exception:
+                self._bump("failures")
+                if self.breaker.record_failure():
+                    logger.warning(
+                        "TTS provider %s: circuit opened after %d consecutive failures; refusing calls for %.0fs",
+                        self.name, self.breaker.failure_threshold, self.breaker.cooldown_seconds,
+                    )
+                raise
+            except BaseException:
+                self.breaker.release()
+                raise
+            else:
+                self.breaker.record_success()
+            finally:
+                with self._lock:
+                    self._in_flight -= 1
+        finally:
+            self.slots.release()
+
+    def record_fallback(self) -> None:
+        self._bump("fallbacks")
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "state": self.breaker.state,
+                "opens": self.breaker.opens,
+                "rate_per_second": self.bucket.rate,
+                "burst": self.bucket.burst,
+                "max_in_flight": self.slots.limit,
+                "waiting": self._waiting,
+                "in_flight": self._in_flight,
+                "waited_seconds": round(self._waited_seconds, 3),
+                **self._counts,
+            }
+
+
+_guards: dict[str, ProviderGuard] = {}
+_guards_lock = threading.Lock()
+
+
+def _setting(name: str, key: str, default: float) -> float:
+    return float(os.getenv(f"TTS_{name.upper()}_{key}", default))
+
+
+def guard_for(provider) -> ProviderGuard:
+    """The process-wide guard for `provider`'s backend (by name)."""
+    guard = _guards.get(provider.name)
+    if guard is None:
+        with _guards_lock:
+            guard = _guards.get(provider.name)
+            if guard is None:
+                guard = ProviderGuard(
+                    provider.name,
+                    rate_per_second=_setting(provider.name, "RATE_PER_SECOND", provider.rate_per_second),
+                    burst=_setting(provider.name, "BURST", provider.burst),
+                    max_in_flight=int(_setting(provider.name, "MAX_IN_FLIGHT", provider.max_in_flight)),
+                )
+                _guards[provider.name] = guard
+    return guard
+
+
+def snapshot() -> dict:
+    with _guards_lock:
+        guards = list(_guards.values())
+    return {guard.name: guard.snapshot() for guard in guards}
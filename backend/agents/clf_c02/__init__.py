@@ -6,21 +6,23 @@ knowledge-base helpers (chapter lookup, corpus text). Routers import from this
 package via `agents/__init__.py`'s registry.
 """
 
-from pathlib import Path
-
 from .config import (
     CLF_C02_SUBJECT_COLOR,
     CLF_C02_SUBJECT_ICON,
     CLF_C02_SUBJECT_NAME,
 )
-from .knowledge_base.chapters import (
-    CLF_C02_CHAPTERS,
-    build_corpus_text,
-    get_chapter_by_name,
-    get_chapter_by_slug,
-)
+from agents._lazy import lazy_exports
 
-INSTRUCTIONS = (Path(__file__).parent / "instructions.md").read_text(encoding="utf-8")
+# Knowledge base and instructions.md load on first access (see agents/_lazy.py),
+# so importing the registry at boot only costs the config module.
+__getattr__ = lazy_exports(__name__, {
+    ".knowledge_base.chapters": (
+        "CLF_C02_CHAPTERS",
+        "build_corpus_text",
+        "get_chapter_by_name",
+        "get_chapter_by_slug",
+    ),
+})
 
 __all__ = [
     "INSTRUCTIONS",
@@ -229,12 +229,16 @@ CLF_C02_CHAPTERS = [
 ]
 
 
+_CHAPTERS_BY_SLUG = {c["slug"]: c for c in CLF_C02_CHAPTERS}
+_CHAPTERS_BY_NAME = {c["name"]: c for c in CLF_C02_CHAPTERS}
+
+
 def get_chapter_by_slug(slug: str):
-    return next((c for c in CLF_C02_CHAPTERS if c["slug"] == slug), None)
+    return _CHAPTERS_BY_SLUG.get(slug)
 
 
 def get_chapter_by_name(name: str):
-    return next((c for c in CLF_C02_CHAPTERS if c["name"] == name), None)
+    return _CHAPTERS_BY_NAME.get(name)
 
 
 def build_corpus_text(focus_chapter_slugs: list[str] | None = None) -> str:
@@ -9,21 +9,23 @@ Note: this subject ships WITHOUT a seed exam bank. Questions are generated
 on-demand from the chapter corpus + instructions.md style guide alone.
 """
 
-from pathlib import Path
-
 from .config import (
     DEUTSCH_A1_SUBJECT_COLOR,
     DEUTSCH_A1_SUBJECT_ICON,
     DEUTSCH_A1_SUBJECT_NAME,
 )
-from .knowledge_base.chapters import (
-    DEUTSCH_A1_CHAPTERS,
-    build_corpus_text,
-    get_chapter_by_name,
-    get_chapter_by_slug,
-)
+from agents._lazy import lazy_exports
 
-INSTRUCTIONS = (Path(__file__).parent / "instructions.md").read_text(encoding="utf-8")
+# Knowledge base and instructions.md load on first access (see agents/_lazy.py),
+# so importing the registry at boot only costs the config module.
+__getattr__ = lazy_exports(__name__, {
+    ".knowledge_base.chapters": (
+        "DEUTSCH_A1_CHAPTERS",
+        "build_corpus_text",
+        "get_chapter_by_name",
+        "get_chapter_by_slug",
+    ),
+})
 
 __all__ = [
     "INSTRUCTIONS",
@@ -10,21 +10,23 @@ Like A1, this subject ships WITHOUT a seed exam bank. Questions are generated
 on-demand from the chapter corpus + instructions.md style guide.
 """
 
-from pathlib import Path
-
 from .config import (
     DEUTSCH_A2_SUBJECT_COLOR,
     DEUTSCH_A2_SUBJECT_ICON,
     DEUTSCH_A2_SUBJECT_NAME,
 )
-from .knowledge_base.chapters import (
-    DEUTSCH_A2_CHAPTERS,
-    build_corpus_text,
-    get_chapter_by_name,
-    get_chapter_by_slug,
-)
+from agents._lazy import lazy_exports
 
-INSTRUCTIONS = (Path(__file__).parent / "instructions.md").read_text(encoding="utf-8")
+# Knowledge base and instructions.md load on first access (see agents/_lazy.py),
+# so importing the registry at boot only costs the config module.
+__getattr__ = lazy_exports(__name__, {
+    ".knowledge_base.chapters": (
+        "DEUTSCH_A2_CHAPTERS",
+        "build_corpus_text",
+        "get_chapter_by_name",
+        "get_chapter_by_slug",
+    ),
+})
 
 __all__ = [
     "INSTRUCTIONS",
@@ -7,22 +7,24 @@ pipeline to A2 vocabulary range: shorter scripts, simpler sentence structures,
 everyday topics, and fewer comprehension items per Teil than B1.
 """
 
-from pathlib import Path
-
 from .config import (
     DEUTSCH_A2_HOREN_SUBJECT_COLOR,
     DEUTSCH_A2_HOREN_SUBJECT_ICON,
     DEUTSCH_A2_HOREN_SUBJECT_NAME,
 )
-from .knowledge_base.chapters import (
-    DEUTSCH_A2_HOREN_CHAPTERS,
-    build_corpus_text,
-    get_chapter_by_name,
-    get_chapter_by_slug,
-    topics_for_teil,
-)
+from agents._lazy import lazy_exports
 
-INSTRUCTIONS = (Path(__file__).parent / "instructions.md").read_text(encoding="utf-8")
+# Knowledge base and instructions.md load on first access (see agents/_lazy.py),
+# so importing the registry at boot only costs the config module.
+__getattr__ = lazy_exports(__name__, {
+    ".knowledge_base.chapters": (
+        "DEUTSCH_A2_HOREN_CHAPTERS",
+        "build_corpus_text",
+        "get_chapter_by_name",
+        "get_chapter_by_slug",
+        "topics_for_teil",
+    ),
+})
 
 __all__ = [
     "INSTRUCTIONS",
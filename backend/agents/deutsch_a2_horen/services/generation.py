@@ -23,15 +23,16 @@ from __future__ import annotations
 import json
 import logging
 import os
-import random
 import re
 import uuid
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 
 logger = logging.getLogger(__name__)
 
+from agents._tools import topic_rotation
+from agents._tools.exam_progress import MergedProgress
 from agents.deutsch_a2_horen import (
     DEUTSCH_A2_HOREN_CHAPTERS,
     INSTRUCTIONS,
@@ -91,11 +92,12 @@ def teil_name(teil: int) -> str:
 
 
 def pick_topic_for_teil(teil: int) -> str:
-    """Return a random topic from the catalog for this Teil. Empty string if no
+    """Return a random topic from the catalog for this Teil, skipping the ones
+    picked most recently (agents/_tools/topic_rotation.py). Empty string if no
     catalog is defined (in which case the model falls back to picking from the
     topic hints inside the format spec)."""
     pool = topics_for_teil(teil)
-    return random.choice(pool) if pool else ""
+    return topic_rotation.pick(("deutsch_a2_horen", teil), pool)
 
 
 def build_script_prompt(teil: int, chosen_topic: Optional[str] = None) -> str:
@@ -139,12 +141,12 @@ fence, no prose, no explanation outside the JSON.
 
 
 def _gemini_client():
-    """Lazy-construct a Gemini client. Raises if GEMINI_API_KEY is missing."""
-    api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key:
+    """The process-wide Gemini client (llm_gateway.get_client), built on first
+    use. Raises if GEMINI_API_KEY is missing."""
+    if not os.getenv("GEMINI_API_KEY"):
         raise RuntimeError("GEMINI_API_KEY not set in environment")
-    from google import genai
-    return genai.Client(api_key=api_key)
+    from llm_gateway import get_client
+    return get_client()
 
 
 def generate_one_script(teil: int, client=None, *, chosen_topic: Optional[str] = None) -> dict:
@@ -300,6 +302,13 @@ def generate_session(
 
     provider = get_provider(provider_name)
 
+    # Multi-speaker scripts are rendered turn by turn and then stitched with
+    # ffmpeg; that step is reported as its own "stitch" stage.
+    n_stitch = sum(1 for s in scripts if len(s.get("speakers") or []) > 1)
+    stitched = 0
+    if progress and n_stitch:
+        progress("stitch", 0, n_stitch)
+
     audio_segments: list[dict] = []
     flat_questions: list[dict] = []
     for i, script in enumerate(scripts):
@@ -307,7 +316,10 @@ def generate_session(
             progress("audio", i, n_items)
         audio_filename = f"{uuid.uuid4().hex}.mp3"
         audio_path = audio_dir / audio_filename
-        render_audio_for_script(provider, script, audio_path)
+        rendered = render_audio_for_script(provider, script, audio_path)
+        if progress and rendered.get("speakers", 0) > 1:
+            stitched += 1
+            progress("stitch", stitched, n_stitch)
         audio_url = f"{audio_url_prefix}/{audio_filename}"
 
         audio_segments.append({
@@ -349,6 +361,7 @@ def generate_full_exam(
     provider_name: str = "edge_tts",
     audio_url_prefix: str = "/static/horen",
     progress=None,
+    on_section: Optional[Callable[[int, dict], None]] = None,
 ) -> dict:
     """Generate a complete 4-Teil A2 Hören exam matching the real Goethe-Zertifikat
     A2 format. Returns a manifest with each Teil as a section AND a flat
@@ -364,8 +377,11 @@ def generate_full_exam(
         audio_dir: where to write the MP3s.
         provider_name: TTS provider key (default "edge_tts").
         audio_url_prefix: URL prefix for the StaticFiles mount.
-        progress: optional callable `progress(stage, current, total)` invoked
-                  once per Teil completion.
+        progress: optional callable `progress(stage, current, total)`. Per-Teil
+                  "scripts" / "audio" / "stitch" reports are merged into
+                  exam-wide counts, plus one "teil" report per Teil completion.
+        on_section: optional callable `on_section(teil, section)` invoked as
+                  soon as each Teil's section is ready.
 
     Returns:
         Manifest dict shaped as:
@@ -376,24 +392,34 @@ def generate_full_exam(
     """
     teile = (1, 2, 3, 4)
 
+    merged = MergedProgress(
+        progress,
+        expected={
+            "scripts": sum(ITEMS_PER_SESSION[t] for t in teile),
+            "audio": sum(ITEMS_PER_SESSION[t] for t in teile),
+        },
+    )
+
     def _gen_one(t: int) -> tuple[int, dict]:
         return t, generate_session(
             t,
             audio_dir,
             provider_name=provider_name,
             audio_url_prefix=audio_url_prefix,
+            progress=merged.for_section(t),
         )
 
     sections_by_teil: dict[int, dict] = {}
     completed = 0
     with ThreadPoolExecutor(max_workers=len(teile)) as pool:
         futures = [pool.submit(_gen_one, t) for t in teile]
-        for fut in futures:
+        for fut in as_completed(futures):
             t, section = fut.result()
             sections_by_teil[t] = section
             completed += 1
-            if progress:
-                progress("teil", completed, len(teile))
+            merged("teil", completed, len(teile))
+            if on_section:
+                on_section(t, section)
             logger.info("A2 Hören exam: Teil %d done (%d/%d)", t, completed, len(teile))
 
     teile_payloads: list[dict] = []
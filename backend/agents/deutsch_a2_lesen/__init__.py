@@ -3,22 +3,24 @@ German A2 Lesen (Reading) agent package. Mirrors the B1 Lesen package
 structure. Models the four Teile of the Goethe-Zertifikat A2 reading section.
 """
 
-from pathlib import Path
-
 from .config import (
     DEUTSCH_A2_LESEN_SUBJECT_COLOR,
     DEUTSCH_A2_LESEN_SUBJECT_ICON,
     DEUTSCH_A2_LESEN_SUBJECT_NAME,
 )
-from .knowledge_base.chapters import (
-    DEUTSCH_A2_LESEN_CHAPTERS,
-    build_corpus_text,
-    get_chapter_by_name,
-    get_chapter_by_slug,
-    topics_for_teil,
-)
+from agents._lazy import lazy_exports
 
-INSTRUCTIONS = (Path(__file__).parent / "instructions.md").read_text(encoding="utf-8")
+# Knowledge base and instructions.md load on first access (see agents/_lazy.py),
+# so importing the registry at boot only costs the config module.
+__getattr__ = lazy_exports(__name__, {
+    ".knowledge_base.chapters": (
+        "DEUTSCH_A2_LESEN_CHAPTERS",
+        "build_corpus_text",
+        "get_chapter_by_name",
+        "get_chapter_by_slug",
+        "topics_for_teil",
+    ),
+})
 
 __all__ = [
     "INSTRUCTIONS",
@@ -156,12 +156,16 @@ DEUTSCH_A2_LESEN_CHAPTERS = [
 ]
 
 
+_CHAPTERS_BY_SLUG = {c["slug"]: c for c in DEUTSCH_A2_LESEN_CHAPTERS}
+_CHAPTERS_BY_NAME = {c["name"]: c for c in DEUTSCH_A2_LESEN_CHAPTERS}
+
+
 def get_chapter_by_slug(slug: str):
-    return next((c for c in DEUTSCH_A2_LESEN_CHAPTERS if c["slug"] == slug), None)
+    return _CHAPTERS_BY_SLUG.get(slug)
 
 
 def get_chapter_by_name(name: str):
-    return next((c for c in DEUTSCH_A2_LESEN_CHAPTERS if c["name"] == name), None)
+    return _CHAPTERS_BY_NAME.get(name)
 
 
 # ── Topic catalogs per Teil ───────────────────────────────────────────────────
@@ -8,22 +8,24 @@ serving to the candidate. See agents/_tools/horen_script_generator.py for
 offline script generation; the audio pipeline is Phase 1b.
 """
 
-from pathlib import Path
-
 from .config import (
     DEUTSCH_B1_HOREN_SUBJECT_COLOR,
     DEUTSCH_B1_HOREN_SUBJECT_ICON,
     DEUTSCH_B1_HOREN_SUBJECT_NAME,
 )
-from .knowledge_base.chapters import (
-    DEUTSCH_B1_HOREN_CHAPTERS,
-    build_corpus_text,
-    get_chapter_by_name,
-    get_chapter_by_slug,
-    topics_for_teil,
-)
+from agents._lazy import lazy_exports
 
-INSTRUCTIONS = (Path(__file__).parent / "instructions.md").read_text(encoding="utf-8")
+# Knowledge base and instructions.md load on first access (see agents/_lazy.py),
+# so importing the registry at boot only costs the config module.
+__getattr__ = lazy_exports(__name__, {
+    ".knowledge_base.chapters": (
+        "DEUTSCH_B1_HOREN_CHAPTERS",
+        "build_corpus_text",
+        "get_chapter_by_name",
+        "get_chapter_by_slug",
+        "topics_for_teil",
+    ),
+})
 
 __all__ = [
     "INSTRUCTIONS",
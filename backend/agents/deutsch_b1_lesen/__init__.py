@@ -7,22 +7,24 @@ items in JSON. No TTS — Lesen is a pure-text feature; the cost driver
 is just Gemini, an order of magnitude cheaper than Hören.
 """
 
-from pathlib import Path
-
 from .config import (
     DEUTSCH_B1_LESEN_SUBJECT_COLOR,
     DEUTSCH_B1_LESEN_SUBJECT_ICON,
     DEUTSCH_B1_LESEN_SUBJECT_NAME,
 )
-from .knowledge_base.chapters import (
-    DEUTSCH_B1_LESEN_CHAPTERS,
-    build_corpus_text,
-    get_chapter_by_name,
-    get_chapter_by_slug,
-    topics_for_teil,
-)
+from agents._lazy import lazy_exports
 
-INSTRUCTIONS = (Path(__file__).parent / "instructions.md").read_text(encoding="utf-8")
+# Knowledge base and instructions.md load on first access (see agents/_lazy.py),
+# so importing the registry at boot only costs the config module.
+__getattr__ = lazy_exports(__name__, {
+    ".knowledge_base.chapters": (
+        "DEUTSCH_B1_LESEN_CHAPTERS",
+        "build_corpus_text",
+        "get_chapter_by_name",
+        "get_chapter_by_slug",
+        "topics_for_teil",
+    ),
+})
 
 __all__ = [
     "INSTRUCTIONS",
@@ -29,13 +29,13 @@ from __future__ import annotations
 import json
 import logging
 import os
-import random
 import re
-from concurrent.futures import ThreadPoolExecutor
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Optional
 
 logger = logging.getLogger(__name__)
 
+from agents._tools import topic_rotation
 from agents.deutsch_b1_lesen import (
     DEUTSCH_B1_LESEN_CHAPTERS,
     INSTRUCTIONS,
@@ -44,7 +44,7 @@ from agents.deutsch_b1_lesen import (
 )
 
 # Bumped above the default for prosody/wording variety within an assigned
-# topic. Topic variety itself comes from random selection from TOPICS_BY_TEIL.
+# topic. Topic variety itself comes from rotating through TOPICS_BY_TEIL.
 GEMINI_TEMPERATURE = 1.1
 
 # Real Goethe-Zertifikat B1 Lesen item counts per Teil. The scorer counts
@@ -89,7 +89,7 @@ def teil_name(teil: int) -> str:
 
 def pick_topic_for_teil(teil: int) -> str:
     pool = topics_for_teil(teil)
-    return random.choice(pool) if pool else ""
+    return topic_rotation.pick(("deutsch_b1_lesen", teil), pool)
 
 
 def build_script_prompt(teil: int, chosen_topic: Optional[str] = None) -> str:
@@ -133,11 +133,10 @@ fence, no prose, no explanation outside the JSON.
 
 
 def _gemini_client():
-    api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key:
+    if not os.getenv("GEMINI_API_KEY"):
         raise RuntimeError("GEMINI_API_KEY not set in environment")
-    from google import genai
-    return genai.Client(api_key=api_key)
+    from llm_gateway import get_client
+    return get_client()
 
 
 def generate_one_teil(teil: int, client=None, *, chosen_topic: Optional[str] = None) -> dict:
@@ -361,7 +360,11 @@ def full_exam_title() -> str:
     return "German B1 Lesen — Vollständige Prüfung"
 
 
-def generate_full_exam(*, progress=None) -> dict:
+def generate_full_exam(
+    *,
+    progress=None,
+    on_section: Optional[Callable[[int, dict], None]] = None,
+) -> dict:
     """Generate a complete 5-Teil B1 Lesen exam. All 5 Teile run in parallel
     via a thread pool — Gemini HTTP releases the GIL during waits so threads
     give us the full speedup. End-to-end ~10–20s on Gemini 2.5 Flash.
@@ -369,6 +372,8 @@ def generate_full_exam(*, progress=None) -> dict:
     Args:
         progress: optional callable `progress(stage, current, total)` invoked
                   once per Teil completion (order is non-deterministic).
+        on_section: optional callable `on_section(teil, section)` invoked as
+                  soon as each Teil's section is ready.
 
     Returns:
         Manifest dict shaped as:
@@ -384,26 +389,28 @@ def generate_full_exam(*, progress=None) -> dict:
             return t, _generate_teil3_with_validation(client)
         return t, generate_one_teil(t, client)
 
-    payloads_by_teil: dict[int, dict] = {}
+    # Sections are built as each Teil lands (not after the pool drains) so
+    # `on_section` can hand them to the client while the rest still generate.
+    sections_by_teil: dict[int, dict] = {}
     completed = 0
     with ThreadPoolExecutor(max_workers=len(teile)) as pool:
         futures = [pool.submit(_gen_one, t) for t in teile]
-        for fut in futures:
+        for fut in as_completed(futures):
             t, payload = fut.result()
-            payloads_by_teil[t] = payload
+            sections_by_teil[t] = _section_payload(payload, t, _flatten_questions(payload, t))
             completed += 1
             if progress:
                 progress("teil", completed, len(teile))
+            if on_section:
+                on_section(t, sections_by_teil[t])
             logger.info("Lesen exam: Teil %d done (%d/%d)", t, completed, len(teile))
 
     teile_payloads: list[dict] = []
     flat_questions: list[dict] = []
     for t in teile:
-        payload = payloads_by_teil[t]
-        per_teil_questions = _flatten_questions(payload, t)
-        section = _section_payload(payload, t, per_teil_questions)
+        section = sections_by_teil[t]
         teile_payloads.append(section)
-        for q in per_teil_questions:
+        for q in section["questions"]:
             flat_questions.append({**q, "teil": t})
 
     return {
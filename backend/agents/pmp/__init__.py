@@ -7,18 +7,23 @@ text). Routers import from this package; nothing imports from internal
 submodules directly.
 """
 
-from pathlib import Path
-
 from .config import PMP_SUBJECT_COLOR, PMP_SUBJECT_ICON, PMP_SUBJECT_NAME
-from .knowledge_base.chapters import (
-    PMP_CHAPTERS,
-    build_corpus_text,
-    get_chapter_by_name,
-    get_chapter_by_slug,
-)
-from .knowledge_base.retrieval import format_exemplars, get_exemplars
+from agents._lazy import lazy_exports
 
-INSTRUCTIONS = (Path(__file__).parent / "instructions.md").read_text(encoding="utf-8")
+# Knowledge base and instructions.md load on first access (see agents/_lazy.py),
+# so importing the registry at boot only costs the config module.
+__getattr__ = lazy_exports(__name__, {
+    ".knowledge_base.chapters": (
+        "PMP_CHAPTERS",
+        "build_corpus_text",
+        "get_chapter_by_name",
+        "get_chapter_by_slug",
+    ),
+    ".knowledge_base.retrieval": (
+        "format_exemplars",
+        "get_exemplars",
+    ),
+})
 
 __all__ = [
     "INSTRUCTIONS",
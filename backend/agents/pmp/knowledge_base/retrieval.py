@@ -4,15 +4,172 @@ Exam-bank retrieval helpers.
 Generic over `subject_slug` so adding new predefined subjects (CFA, AWS, etc.)
 doesn't require a new module — the same get_exemplars/format_exemplars work
 for every subject.
+
+Sampling doesn't touch the table's rows: `ORDER BY random() LIMIT k` scanned
+and sorted every matching row on each call, and chunked generation makes one
+call per chapter. Instead each process keeps an `ExemplarIndex` of
+(subject_slug, chapter_slug) → question ids (numpy arrays), loaded at startup
+(main.py) and reloaded when the bank changes — an ingest in this process
+calls `exemplar_index.invalidate()`; otherwise a probe at most every
+EXEMPLAR_INDEX_REFRESH_SECONDS notices ingests run elsewhere. `get_exemplars` draws k ids in O(k) and loads them with one
+primary-key query.
 """
 
 from __future__ import annotations
 
-from sqlalchemy import func
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Optional
+
+from sqlalchemy import func, literal
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlalchemy.orm import Session
 
+from db.database import SessionLocal
 from db.models import PredefinedExamQuestion
 
+if TYPE_CHECKING:
+    import numpy as np
+
+EXEMPLAR_INDEX_REFRESH_SECONDS = float(os.getenv("EXEMPLAR_INDEX_REFRESH_SECONDS", "300"))
+
+
+class ExemplarIndex:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # (subject_slug, chapter_slug) -> object array of question ids
+        self._ids: Optional[dict[tuple[str, str], np.ndarray]] = None
+        self._signature: Optional[tuple] = None
+        self._checked_at = 0.0
+        self._rng = None
+        self._rng_lock = threading.Lock()  # numpy Generators aren't thread-safe
+
+    @staticmethod
+    def _bank_signature(db: Session) -> tuple:
+        # A digest of exactly what the index holds — every (id, subject,
+        # chapter) — so a reseed that updates rows in place (moving them to
+        # another chapter, say) changes it, not only inserts and deletes.
+        # Edits to the rest of a row don't matter: sampled rows are loaded
+        # fresh by id.
+        entry = func.concat_ws(
+            ":",
+            PredefinedExamQuestion.id,
+            PredefinedExamQuestion.subject_slug,
+            PredefinedExamQuestion.chapter_slug,
+        )
+        digest = func.md5(
+            func.string_agg(entry, aggregate_order_by(literal(","), PredefinedExamQuestion.id))
+        )
+        return tuple(db.query(func.count(PredefinedExamQuestion.id), digest).one())
+
+    def _load(self, db: Session) -> None:
+        signature = self._bank_signature(db)
+        grouped: dict[tuple[str, str], list] = {}
+        rows = db.query(
+            PredefinedExamQuestion.subject_slug,
+            PredefinedExamQuestion.chapter_slug,
+            PredefinedExamQuestion.id,
+        )
+        for subject_slug, chapter_slug, qid in rows.yield_per(10_000):
+            grouped.setdefault((subject_slug, chapter_slug), []).append(qid)
+        self._install(grouped, signature)
+
+    def _install(self, grouped: dict[tuple[str, str], list], signature: Optional[tuple]) -> None:
+        # numpy is only needed once the first quiz is generated; keep it off
+        # the import path (scripts/bench_import_time.py).
+        import numpy as np
+
+        ids = {}
+        for key, values in grouped.items():
+            arr = np.empty(len(values), dtype=object)
+            arr[:] = values
+            ids[key] = arr
+        if self._rng is None:
+            self._rng = np.random.default_rng()
+        self._ids = ids
+        self._signature = signature
+        self._checked_at = time.monotonic()
+
+    def _current(self, db: Session) -> dict[tuple[str, str], np.ndarray]:
+        ids = self._ids
+        if ids is None:
+            with self._lock:
+                if self._ids is None:
+                    self._load(db)
+                return self._ids
+        if time.monotonic() - self._checked_at < EXEMPLAR_INDEX_REFRESH_SECONDS:
+            return ids
+        # One thread probes/reloads; the rest sample from the current arrays.
+        if self._lock.acquire(blocking=False):
+            try:
+                if self._bank_signature(db) != self._signature:
+                    self._load(db)
+                else:
+                    self._checked_at = time.monotonic()
+            finally:
+                self._lock.release()
+        current = self._ids
+        return current if current is not None else ids
+
+    def load(self, db: Session) -> None:
+        """(Re)build the index now (startup hook)."""
+        with self._lock:
+            self._load(db)
+
+    def invalidate(self) -> None:
+        """Drop the index; the next sample reloads it."""
+        with self._lock:
+            self._ids = None
+
+    def sample(
+        self,
+        db: Session,
+        subject_slug: str,
+        chapter_slugs: list[str] | None,
+        k: int,
+    ) -> list:
+        """Up to k distinct question ids, uniformly over the matching rows."""
+        import numpy as np
+
+        ids = self._current(db)
+        if chapter_slugs:
+            arrays = [ids[key] for key in ((subject_slug, c) for c in dict.fromkeys(chapter_slugs)) if key in ids]
+        else:
+            arrays = [arr for (subject, _), arr in ids.items() if subject == subject_slug]
+        sizes = np.fromiter((len(a) for a in arrays), dtype=np.int64, count=len(arrays))
+        total = int(sizes.sum())
+        if total == 0:
+            return []
+        # Generator.choice without replacement is O(k) for k << total; the
+        # draws are positions in the virtual concatenation of `arrays`.
+        with self._rng_lock:
+            positions = self._rng.choice(total, size=min(k, total), replace=False)
+        bounds = np.cumsum(sizes)
+        which = np.searchsorted(bounds, positions, side="right")
+        offsets = positions - (bounds[which] - sizes[which])
+        return [arrays[a][o] for a, o in zip(which.tolist(), offsets.tolist())]
+
+    def stats(self) -> dict:
+        ids = self._ids
+        return {
+            "loaded": ids is not None,
+            "groups": len(ids) if ids else 0,
+            "questions": sum(len(a) for a in ids.values()) if ids else 0,
+        }
+
+
+exemplar_index = ExemplarIndex()
+
+
+def warm_exemplar_index() -> None:
+    """Startup hook: load the index with a short-lived session."""
+    db = SessionLocal()
+    try:
+        exemplar_index.load(db)
+    finally:
+        db.close()
+
 
 def get_exemplars(
     db: Session,
@@ -23,12 +180,14 @@ def get_exemplars(
     """Return up to k random exam questions, optionally filtered by chapter_slug."""
     if k <= 0:
         return []
-    query = db.query(PredefinedExamQuestion).filter(
-        PredefinedExamQuestion.subject_slug == subject_slug
-    )
-    if chapter_slugs:
-        query = query.filter(PredefinedExamQuestion.chapter_slug.in_(chapter_slugs))
-    return query.order_by(func.random()).limit(k).all()
+    ids = exemplar_index.sample(db, subject_slug, chapter_slugs, k)
+    if not ids:
+        return []
+    rows = db.query(PredefinedExamQuestion).filter(PredefinedExamQuestion.id.in_(ids)).all()
+    # Keep the sampled (random) order; a row deleted since the index was
+    # loaded is simply missing.
+    by_id = {q.id: q for q in rows}
+    return [by_id[i] for i in ids if i in by_id]
 
 
 def format_exemplars(exemplars: list[PredefinedExamQuestion]) -> str:
@@ -0,0 +1,47 @@
+"""add composite indexes for quota and subject lookups
+
+  - quizzes (user_id, quiz_type, generation_date): Hören / Lesen quota
+    windows and their session listings;
+  - subjects (user_id, name): `_get_or_create_subject` on every predefined
+    generation;
+  - generation_jobs (user_id, kind) WHERE status IN ('queued', 'running'):
+    the active-job count added to every quota check.
+
+Results by (quiz_id, user_id) ordered by attempt_date are already covered by
+ix_quiz_results_user_id_quiz_id_attempt_date (f0a1b2c3d4e5).
+scripts/check_query_plans.py checks each of these shapes against EXPLAIN.
+
+Revision ID: 0a1b2c3d4e5f
+Revises: f0a1b2c3d4e5
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0a1b2c3d4e5f'
+down_revision: Union[str, Sequence[str], None] = 'f0a1b2c3d4e5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_quizzes_user_id_quiz_type_generation_date', 'quizzes',
+        ['user_id', 'quiz_type', 'generation_date'], unique=False,
+    )
+    op.create_index('ix_subjects_user_id_name', 'subjects', ['user_id', 'name'], unique=False)
+    op.create_index(
+        'ix_generation_jobs_active_user_id_kind', 'generation_jobs',
+        ['user_id', 'kind'], unique=False,
+        postgresql_where=sa.text("status IN ('queued', 'running')"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_generation_jobs_active_user_id_kind', table_name='generation_jobs')
+    op.drop_index('ix_subjects_user_id_name', table_name='subjects')
+    op.drop_index('ix_quizzes_user_id_quiz_type_generation_date', table_name='quizzes')
@@ -0,0 +1,44 @@
+"""add exam_inventory table
+
+Pre-generated Hören / Lesen exams waiting to be handed out: the refill
+worker in exam_inventory.py inserts rows, POST /horen|lesen/{slug}/quiz
+deletes the oldest one for its slug and persists it as the user's Quiz.
+
+Revision ID: 1b2c3d4e5f6a
+Revises: 0a1b2c3d4e5f
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+
+revision: str = '1b2c3d4e5f6a'
+down_revision: Union[str, Sequence[str], None] = '0a1b2c3d4e5f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'exam_inventory',
+        sa.Column('id', UUID(as_uuid=True), nullable=False),
+        sa.Column('kind', sa.String(length=32), nullable=False),
+        sa.Column('subject_slug', sa.String(length=64), nullable=False),
+        sa.Column('tts_provider', sa.String(length=32), nullable=True),
+        sa.Column('content', JSONB(), nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_exam_inventory_subject_slug_created_at', 'exam_inventory',
+        ['subject_slug', 'created_at'], unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_exam_inventory_subject_slug_created_at', table_name='exam_inventory')
+    op.drop_table('exam_inventory')
@@ -0,0 +1,29 @@
+"""add heartbeat_at to generation_jobs
+
+The process that owns a queued/running job stamps it every minute;
+generation_jobs.sweep_jobs fails active jobs whose owner went silent (it
+died in a restart or crash) or that are older than JOB_STALE_AFTER.
+
+Revision ID: 2c3d4e5f6a7b
+Revises: 1b2c3d4e5f6a
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '2c3d4e5f6a7b'
+down_revision: Union[str, Sequence[str], None] = '1b2c3d4e5f6a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('generation_jobs', sa.Column('heartbeat_at', sa.TIMESTAMP(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('generation_jobs', 'heartbeat_at')
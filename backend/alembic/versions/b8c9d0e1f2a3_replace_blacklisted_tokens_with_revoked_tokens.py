@@ -0,0 +1,81 @@
+"""replace blacklisted_tokens with revoked_tokens
+
+blacklisted_tokens stored whole JWTs with no expiry and was never pruned.
+revoked_tokens keys on the token's jti (or sha256 of the token for tokens
+issued before jti existed) and carries expires_at so expired rows can be
+deleted. Still-valid rows are carried over; expired ones are dropped.
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2026-10-18
+
+"""
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import jwt
+import sqlalchemy as sa
+
+
+revision: str = 'b8c9d0e1f2a3'
+down_revision: Union[str, Sequence[str], None] = 'a7b8c9d0e1f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Matches security.ACCESS_TOKEN_EXPIRE_MINUTES; used for rows whose token
+# has no readable exp claim.
+_FALLBACK_LIFETIME = timedelta(days=90)
+
+
+def upgrade() -> None:
+    revoked_tokens = op.create_table(
+        'revoked_tokens',
+        sa.Column('token_id', sa.String(length=64), nullable=False),
+        sa.Column('expires_at', sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column('revoked_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('token_id'),
+    )
+    op.create_index(op.f('ix_revoked_tokens_expires_at'), 'revoked_tokens', ['expires_at'], unique=False)
+    op.create_index(op.f('ix_revoked_tokens_revoked_at'), 'revoked_tokens', ['revoked_at'], unique=False)
+
+    now = datetime.now(timezone.utc)
+    rows = {}
+    for token, blacklisted_at in op.get_bind().execute(
+        sa.text('SELECT token, blacklisted_at FROM blacklisted_tokens')
+    ):
+        # Only the claims are needed here; the signature was checked when
+        # the token was issued and again at logout.
+        try:
+            payload = jwt.decode(token, options={'verify_signature': False})
+        except jwt.PyJWTError:
+            continue
+        if payload.get('exp') is not None:
+            expires_at = datetime.fromtimestamp(payload['exp'], tz=timezone.utc)
+        else:
+            expires_at = (blacklisted_at or now).replace(tzinfo=timezone.utc) + _FALLBACK_LIFETIME
+        if expires_at <= now:
+            continue
+        token_id = str(payload.get('jti') or hashlib.sha256(token.encode()).hexdigest())
+        rows[token_id] = {'token_id': token_id, 'expires_at': expires_at}
+    if rows:
+        op.bulk_insert(revoked_tokens, list(rows.values()))
+
+    op.drop_index(op.f('ix_blacklisted_tokens_token'), table_name='blacklisted_tokens')
+    op.drop_table('blacklisted_tokens')
+
+
+def downgrade() -> None:
+    # The raw tokens aren't recoverable from their ids, so revocations are
+    # lost on downgrade.
+    op.create_table(
+        'blacklisted_tokens',
+        sa.Column('token', sa.String(), nullable=False),
+        sa.Column('blacklisted_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('token'),
+    )
+    op.create_index(op.f('ix_blacklisted_tokens_token'), 'blacklisted_tokens', ['token'], unique=False)
+    op.drop_index(op.f('ix_revoked_tokens_revoked_at'), table_name='revoked_tokens')
+    op.drop_index(op.f('ix_revoked_tokens_expires_at'), table_name='revoked_tokens')
+    op.drop_table('revoked_tokens')
@@ -0,0 +1,90 @@
+"""add extraction cache and deduplicated source texts
+
+document_extractions / document_pages: per-page text of uploaded files keyed
+by sha256 of the file bytes, so re-uploads and other page ranges of the same
+file skip parsing.
+
+source_texts: QuizSource text stored once per (user, sha256(text));
+quiz_sources.extracted_text is replaced by text_hash. Existing texts are
+moved over and deduplicated in SQL.
+
+Revision ID: c9d0e1f2a3b4
+Revises: b8c9d0e1f2a3
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+
+revision: str = 'c9d0e1f2a3b4'
+down_revision: Union[str, Sequence[str], None] = 'b8c9d0e1f2a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_TEXT_SHA256 = "encode(sha256(convert_to(extracted_text, 'UTF8')), 'hex')"
+
+
+def upgrade() -> None:
+    op.create_table(
+        'document_extractions',
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('file_ext', sa.String(length=8), nullable=False),
+        sa.Column('page_count', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('last_used_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('content_hash'),
+    )
+    op.create_index(op.f('ix_document_extractions_last_used_at'), 'document_extractions', ['last_used_at'], unique=False)
+    op.create_table(
+        'document_pages',
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('page_number', sa.Integer(), nullable=False),
+        sa.Column('text', sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(['content_hash'], ['document_extractions.content_hash'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('content_hash', 'page_number'),
+    )
+
+    op.create_table(
+        'source_texts',
+        sa.Column('user_id', UUID(as_uuid=True), nullable=False),
+        sa.Column('text_hash', sa.String(length=64), nullable=False),
+        sa.Column('text', sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'text_hash'),
+    )
+    op.add_column('quiz_sources', sa.Column('text_hash', sa.String(length=64), nullable=True))
+    op.execute(
+        f"""
+        INSERT INTO source_texts (user_id, text_hash, text)
+        SELECT DISTINCT ON (user_id, {_TEXT_SHA256}) user_id, {_TEXT_SHA256}, extracted_text
+        FROM quiz_sources
+        WHERE extracted_text IS NOT NULL
+        """
+    )
+    op.execute(f"UPDATE quiz_sources SET text_hash = {_TEXT_SHA256} WHERE extracted_text IS NOT NULL")
+    op.create_foreign_key(
+        'quiz_sources_user_id_text_hash_fkey', 'quiz_sources', 'source_texts',
+        ['user_id', 'text_hash'], ['user_id', 'text_hash'],
+    )
+    op.drop_column('quiz_sources', 'extracted_text')
+
+
+def downgrade() -> None:
+    op.add_column('quiz_sources', sa.Column('extracted_text', sa.String(), nullable=True))
+    op.execute(
+        """
+        UPDATE quiz_sources qs SET extracted_text = st.text
+        FROM source_texts st
+        WHERE st.user_id = qs.user_id AND st.text_hash = qs.text_hash
+        """
+    )
+    op.drop_constraint('quiz_sources_user_id_text_hash_fkey', 'quiz_sources', type_='foreignkey')
+    op.drop_column('quiz_sources', 'text_hash')
+    op.drop_table('source_texts')
+    op.drop_table('document_pages')
+    op.drop_index(op.f('ix_document_extractions_last_used_at'), table_name='document_extractions')
+    op.drop_table('document_extractions')
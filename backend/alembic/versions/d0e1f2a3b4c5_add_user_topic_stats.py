@@ -0,0 +1,62 @@
+"""add user_topic_stats
+
+Per-user, per-topic answer totals maintained on quiz submit / deletion
+(db/topic_stats.py), so the by-topic performance and weak-topic endpoints
+stop rescanning every QuizResult. Filled from existing quiz_results here;
+`python -m db.topic_stats` recomputes it the same way.
+
+Revision ID: d0e1f2a3b4c5
+Revises: c9d0e1f2a3b4
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+
+revision: str = 'd0e1f2a3b4c5'
+down_revision: Union[str, Sequence[str], None] = 'c9d0e1f2a3b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'user_topic_stats',
+        sa.Column('user_id', UUID(as_uuid=True), nullable=False),
+        sa.Column('topic', sa.String(), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=False),
+        sa.Column('correct', sa.Integer(), nullable=False),
+        sa.Column('last_seen_at', sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.Column('quiz_ids', JSONB(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'topic'),
+    )
+    # Same aggregation as db/topic_stats.py::_REBUILD_SQL.
+    op.execute(
+        """
+        INSERT INTO user_topic_stats (user_id, topic, total, correct, last_seen_at, quiz_ids)
+        SELECT r.user_id,
+               t.topic,
+               count(*),
+               count(*) FILTER (WHERE a.answer -> 'is_correct' = 'true'::jsonb),
+               max(r.attempt_date),
+               jsonb_agg(DISTINCT r.quiz_id::text)
+        FROM quiz_results r
+        CROSS JOIN LATERAL jsonb_array_elements(
+            CASE WHEN jsonb_typeof(r.user_answers) = 'array' THEN r.user_answers ELSE '[]'::jsonb END
+        ) AS a(answer)
+        CROSS JOIN LATERAL (
+            SELECT btrim(coalesce(nullif(a.answer ->> 'topic', ''), 'Unknown'), E' \\t\\r\\n') AS topic
+        ) AS t
+        WHERE t.topic <> ''
+        GROUP BY r.user_id, t.topic
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('user_topic_stats')
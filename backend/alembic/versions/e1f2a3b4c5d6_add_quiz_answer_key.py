@@ -0,0 +1,30 @@
+"""add quizzes.answer_key
+
+Compiled answer key per quiz (db/scoring.py), so submit doesn't load the
+full `content`. Written whenever a quiz's content is; existing quizzes are
+filled in on their first submit, so no backfill here.
+
+Revision ID: e1f2a3b4c5d6
+Revises: d0e1f2a3b4c5
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+
+revision: str = 'e1f2a3b4c5d6'
+down_revision: Union[str, Sequence[str], None] = 'd0e1f2a3b4c5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('quizzes', sa.Column('answer_key', JSONB(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('quizzes', 'answer_key')
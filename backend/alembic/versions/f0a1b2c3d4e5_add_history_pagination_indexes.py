@@ -0,0 +1,42 @@
+"""add history pagination indexes
+
+Composite indexes behind the keyset-paginated history listings
+(db/routers/pagination.py): a user's quizzes by (generation_date, id), a
+user's results by (attempt_date, id), and a user's results per quiz by
+attempt_date (GET /quizzes/results/{quiz_id}, latest result per quiz).
+
+Revision ID: f0a1b2c3d4e5
+Revises: e1f2a3b4c5d6
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = 'f0a1b2c3d4e5'
+down_revision: Union[str, Sequence[str], None] = 'e1f2a3b4c5d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_quizzes_user_id_generation_date_id', 'quizzes',
+        ['user_id', 'generation_date', 'id'], unique=False,
+    )
+    op.create_index(
+        'ix_quiz_results_user_id_attempt_date_id', 'quiz_results',
+        ['user_id', 'attempt_date', 'id'], unique=False,
+    )
+    op.create_index(
+        'ix_quiz_results_user_id_quiz_id_attempt_date', 'quiz_results',
+        ['user_id', 'quiz_id', 'attempt_date'], unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_quiz_results_user_id_quiz_id_attempt_date', table_name='quiz_results')
+    op.drop_index('ix_quiz_results_user_id_attempt_date_id', table_name='quiz_results')
+    op.drop_index('ix_quizzes_user_id_generation_date_id', table_name='quizzes')
@@ -0,0 +1,119 @@
+"""
+In-process cache for `get_current_user`.
+
+Without it every authenticated request pays a JWT decode, a revocation check
+and a user lookup by email before the handler runs.
+Entries are keyed by sha256(token) — the raw token never sits in memory as a
+dict key — and hold either a "revoked" verdict or the token's `exp` plus a
+snapshot of the user's column values.
+
+On a hit the snapshot is re-attached to the request's session with
+`merge(load=False)`, which issues no SQL: handlers get a normal persistent
+`User` they can read, modify and commit, and relationships (e.g.
+`user.subscription`) still lazy-load through the session.
+
+Invalidation:
+  - any ORM update/delete of a User row drops that user's entries (mapper
+    events below), which covers /users/me, the Stripe webhook, admin
+    deletes, password changes, ...;
+  - the routes that change auth state also call `invalidate_user` /
+    `revoke_token` explicitly, so intent is visible at the call site and
+    bulk `query().update()` paths can't slip through;
+  - entries expire after AUTH_CACHE_TTL_SECONDS. The cache is per process,
+    so a logout / upgrade handled by another worker is seen here within
+    that window.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import uuid
+from dataclasses import dataclass
+from typing import Optional
+
+from cachetools import TTLCache
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from db.models import User
+
+AUTH_CACHE_TTL_SECONDS = int(os.getenv("AUTH_CACHE_TTL_SECONDS", "30"))
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+
+
+@dataclass(frozen=True)
+class CachedAuth:
+    revoked: bool
+    exp: Optional[float] = None
+    user_id: Optional[uuid.UUID] = None
+    columns: Optional[dict] = None
+
+
+def token_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class AuthCache:
+    def __init__(self, ttl: int, maxsize: int) -> None:
+        self._enabled = ttl > 0 and maxsize > 0
+        self._entries: TTLCache = TTLCache(maxsize=max(maxsize, 1), ttl=max(ttl, 1))
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedAuth]:
+        if not self._enabled:
+            return None
+        with self._lock:
+            return self._entries.get(key)
+
+    def put_user(self, key: str, exp: Optional[float], user: User) -> None:
+        if not self._enabled:
+            return
+        columns = {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+        with self._lock:
+            self._entries[key] = CachedAuth(revoked=False, exp=exp, user_id=user.id, columns=columns)
+
+    def put_revoked(self, key: str) -> None:
+        if not self._enabled:
+            return
+        with self._lock:
+            self._entries[key] = CachedAuth(revoked=True)
+
+    def invalidate_user(self, user_id: uuid.UUID) -> None:
+        # A scan, not a secondary index: invalidations are rare (profile
+        # edits, webhooks, admin actions) and the cache is bounded.
+        with self._lock:
+            stale = [k for k, v in self._entries.items() if v.user_id == user_id]
+            for k in stale:
+                self._entries.pop(k, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+auth_cache = AuthCache(AUTH_CACHE_TTL_SECONDS, AUTH_CACHE_MAX_ENTRIES)
+
+
+def attach_user(entry: CachedAuth, db: Session) -> User:
+    """Rebuild the cached user and attach it to `db` without a SELECT."""
+    user = User(**entry.columns)
+    make_transient_to_detached(user)
+    return db.merge(user, load=False)
+
+
+def revoke_token(token: str) -> None:
+    """Logout: remember the verdict so this process rejects the token
+    without a revocation check."""
+    auth_cache.put_revoked(token_key(token))
+
+
+def invalidate_user(user_id: uuid.UUID) -> None:
+    auth_cache.invalidate_user(user_id)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _drop_cached_user(mapper, connection, target: User) -> None:
+    auth_cache.invalidate_user(target.id)
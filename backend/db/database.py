@@ -1,5 +1,6 @@
 import os
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from dotenv import load_dotenv
 
@@ -11,7 +12,66 @@ if DATABASE_URL is None:
     # This exception should catch the failure before SQLAlchemy does
     raise Exception("DATABASE_URL environment variable is missing!")
 
-engine = create_engine(DATABASE_URL, echo=True)
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if value is None or value == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# Engine settings. Defaults are sized for one uvicorn process that also runs
+# the generation worker pool (GENERATION_WORKERS threads, each opening its own
+# short-lived sessions) next to the request threadpool.
+DB_ECHO = _env_bool("DB_ECHO", False)
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = int(os.environ.get("DB_POOL_TIMEOUT", "30"))
+# Validate a pooled connection before handing it out — cheap, and it stops a
+# connection killed by the DB / a proxy from surfacing as a 500.
+DB_POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", True)
+# Recycle connections before managed Postgres / PgBouncer idle limits cut them.
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", "1800"))
+# Server-side cap per statement, in ms. 0 = no limit.
+DB_STATEMENT_TIMEOUT_MS = int(os.environ.get("DB_STATEMENT_TIMEOUT_MS", "0"))
+# Shows up in pg_stat_activity, so our connections are easy to pick out.
+DB_APPLICATION_NAME = os.environ.get("DB_APPLICATION_NAME", "quizify-backend")
+# Per-statement latency histogram (db/metrics.py), served on
+# GET /admin/metrics/db.
+DB_STATEMENT_METRICS = _env_bool("DB_STATEMENT_METRICS", False)
+
+
+def create_db_engine(url: str = DATABASE_URL, **overrides) -> Engine:
+    """Build the SQLAlchemy engine from the DB_* settings above. Keyword
+    `overrides` are passed to `create_engine` as-is (scripts and tests use
+    this to get e.g. a NullPool engine)."""
+    options = {
+        "echo": DB_ECHO,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "pool_recycle": DB_POOL_RECYCLE,
+    }
+    if url.startswith("postgresql"):
+        options.update(
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+        )
+        # libpq connection parameters, applied once per new connection rather
+        # than with a SET on every checkout.
+        connect_args = {"application_name": DB_APPLICATION_NAME}
+        if DB_STATEMENT_TIMEOUT_MS > 0:
+            connect_args["options"] = f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+        options["connect_args"] = connect_args
+    options.update(overrides)
+
+    new_engine = create_engine(url, **options)
+    if DB_STATEMENT_METRICS:
+        from db.metrics import instrument
+        instrument(new_engine)
+    return new_engine
+
+
+engine = create_db_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
@@ -1,12 +1,15 @@
 from typing import Generator, Optional
 import os
+import time
 from fastapi import Depends, HTTPException, Request
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from fastapi import status
-from db.models import BlacklistedToken, User
+from db.models import User
 import jwt
 from .database import SessionLocal
+from .auth_cache import attach_user, auth_cache, token_key
+from .revocation import is_revoked
 SECRET_KEY = os.getenv("JWT_SECRET_KEY")
 ALGORITHM = "HS256"
 
@@ -39,14 +42,25 @@ def get_token(request: Request, bearer: Optional[str] = Depends(oauth2_scheme))
 def get_current_user(token: str = Depends(get_token), db: Session = Depends(get_db)) -> User:
     """
     Decodes the token, validates it, and fetches the user from the DB.
+
+    Verdicts are memoized per token in `db.auth_cache`, so a repeat request
+    with the same token skips the JWT decode, the revocation check and the
+    user lookup.
     """
+    logged_out_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Token has been logged out. Please log in again."
+    )
 
-    blacklisted = db.query(BlacklistedToken).filter(BlacklistedToken.token == token).first()
-    if blacklisted:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token has been logged out. Please log in again."
-        )
+    cache_key = token_key(token)
+    cached = auth_cache.get(cache_key)
+    if cached is not None:
+        if cached.revoked:
+            raise logged_out_exception
+        # An entry can outlive its token's exp; past it, fall through so the
+        # decode below rejects the token the usual way.
+        if cached.exp is None or cached.exp > time.time():
+            return attach_user(cached, db)
 
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -63,11 +77,18 @@ def get_current_user(token: str = Depends(get_token), db: Session = Depends(get_
     except jwt.PyJWTError:
         raise credentials_exception
 
+    # Decoded first so revocation can key on the jti. Usually answered by the
+    # in-process Bloom filter without a query.
+    if is_revoked(db, token, payload):
+        auth_cache.put_revoked(cache_key)
+        raise logged_out_exception
+
     # Fetch user from DB to ensure they still exist and token is valid
     user = db.query(User).filter(User.email == email).first()
     if user is None:
         raise credentials_exception
-        
+
+    auth_cache.put_user(cache_key, payload.get("exp"), user)
     return user
 
 def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
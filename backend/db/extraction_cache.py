@@ -0,0 +1,122 @@
+"""
+Postgres-backed page cache for `document_extraction.extract_upload`.
+
+Uploads are identified by sha256 of their bytes. `load` returns the pages of
+a requested range that some earlier upload of the same file already
+extracted; `store` saves newly extracted pages. Page text is stored raw
+(before compress_text), so any later page range can be served.
+
+Both run on the extraction thread with their own short-lived session — never
+the request's. A cache failure is logged and treated as a miss: the upload
+then just gets parsed as before.
+
+Entries unused for EXTRACTION_CACHE_TTL_DAYS are deleted by `prune_stale`,
+which main.py runs daily.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from db.database import SessionLocal
+from db.models import DocumentExtraction, DocumentPage
+
+logger = logging.getLogger(__name__)
+
+EXTRACTION_CACHE_TTL_DAYS = int(os.getenv("EXTRACTION_CACHE_TTL_DAYS", "30"))
+
+
+class ExtractionCache:
+    def load(self, content_hash: str, first: int, last: int) -> tuple[Optional[int], dict[int, str]]:
+        """(page_count, {page_number: text}) for pages first..last (1-based,
+        inclusive) already cached; (None, {}) for an unknown file."""
+        db = SessionLocal()
+        try:
+            doc = db.get(DocumentExtraction, content_hash)
+            if doc is None:
+                return None, {}
+            rows = (
+                db.query(DocumentPage.page_number, DocumentPage.text)
+                .filter(
+                    DocumentPage.content_hash == content_hash,
+                    DocumentPage.page_number >= first,
+                    DocumentPage.page_number <= last,
+                )
+                .all()
+            )
+            doc.last_used_at = datetime.now(timezone.utc)
+            db.commit()
+            return doc.page_count, dict(rows)
+        except Exception:
+            db.rollback()
+            logger.warning("Extraction cache read failed for %s", content_hash, exc_info=True)
+            return None, {}
+        finally:
+            db.close()
+
+    def store(self, content_hash: str, file_ext: str, page_count: int, pages: dict[int, str]) -> None:
+        if not pages:
+            return
+        db = SessionLocal()
+        try:
+            db.execute(
+                pg_insert(DocumentExtraction)
+                .values(content_hash=content_hash, file_ext=file_ext, page_count=page_count)
+                .on_conflict_do_nothing(index_elements=["content_hash"])
+            )
+            # Two uploads of the same file can race to fill the same pages;
+            # their text is identical, so the loser's insert is simply dropped.
+            db.execute(
+                pg_insert(DocumentPage)
+                .values([
+                    {"content_hash": content_hash, "page_number": n, "text": text}
+                    for n, text in pages.items()
+                ])
+                .on_conflict_do_nothing(index_elements=["content_hash", "page_number"])
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.warning("Extraction cache write failed for %s", content_hash, exc_info=True)
+        finally:
+            db.close()
+
+
+extraction_cache = ExtractionCache()
+
+
+def prune_stale() -> int:
+    """Delete cached documents (and their pages) unused for the TTL."""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=EXTRACTION_CACHE_TTL_DAYS)
+    db = SessionLocal()
+    try:
+        deleted = (
+            db.query(DocumentExtraction)
+            .filter(DocumentExtraction.last_used_at < cutoff)
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+        return deleted
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+async def prune_periodically(interval_seconds: int = 24 * 60 * 60) -> None:
+    """Startup task: `prune_stale` once a day until cancelled."""
+    while True:
+        try:
+            deleted = await asyncio.to_thread(prune_stale)
+            if deleted:
+                logger.info("Pruned %d cached document extraction(s)", deleted)
+        except Exception:
+            logger.exception("Extraction cache pruning failed")
+        await asyncio.sleep(interval_seconds)
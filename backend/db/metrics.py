@@ -0,0 +1,103 @@
+"""
+Per-statement latency histogram for the SQLAlchemy engine.
+
+Opt-in via DB_STATEMENT_METRICS=true (see db/database.py). When enabled,
+`instrument(engine)` hooks before/after_cursor_execute and records the wall
+time of every statement into cumulative buckets, split by verb (SELECT,
+INSERT, ...). The admin-only GET /admin/metrics/db endpoint serves
+`snapshot()`.
+
+Recording is two perf_counter calls and a locked integer bump per statement;
+nothing is logged, so it's cheap enough to leave on in production while
+investigating slow endpoints.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Upper bounds in milliseconds; the last bucket is everything slower.
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+_VERBS = ("SELECT", "INSERT", "UPDATE", "DELETE")
+
+
+class StatementHistogram:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series: dict[str, dict] = {}
+            self._started_at = time.time()
+
+    def observe(self, verb: str, elapsed_ms: float) -> None:
+        with self._lock:
+            series = self._series.get(verb)
+            if series is None:
+                series = {"counts": [0] * (len(BUCKETS_MS) + 1), "count": 0, "sum_ms": 0.0, "max_ms": 0.0}
+                self._series[verb] = series
+            series["counts"][bisect_left(BUCKETS_MS, elapsed_ms)] += 1
+            series["count"] += 1
+            series["sum_ms"] += elapsed_ms
+            if elapsed_ms > series["max_ms"]:
+                series["max_ms"] = elapsed_ms
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            statements = {}
+            for verb, s in sorted(self._series.items()):
+                labels = [f"le_{b}ms" for b in BUCKETS_MS] + ["le_inf"]
+                statements[verb] = {
+                    "count": s["count"],
+                    "avg_ms": round(s["sum_ms"] / s["count"], 3) if s["count"] else 0.0,
+                    "max_ms": round(s["max_ms"], 3),
+                    "buckets": dict(zip(labels, s["counts"])),
+                }
+            return {
+                "since": self._started_at,
+                "buckets_ms": list(BUCKETS_MS),
+                "statements": statements,
+            }
+
+
+histogram = StatementHistogram()
+
+
+def _verb(statement: str) -> str:
+    head = statement.lstrip()[:6].upper()
+    for verb in _VERBS:
+        if head.startswith(verb):
+            return verb
+    return "OTHER"
+
+
+def instrument(engine: Engine) -> None:
+    """Record every statement executed on `engine` into `histogram`."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _stop(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["_query_start"].pop()
+        histogram.observe(_verb(statement), (time.perf_counter() - started) * 1000.0)
+
+    @event.listens_for(engine, "handle_error")
+    def _failed(exception_context):
+        # The after hook doesn't fire for a failed statement; drop its start
+        # time so the stack stays aligned for the next one.
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("_query_start"):
+            conn.info["_query_start"].pop()
+
+
+def snapshot() -> dict:
+    return histogram.snapshot()
@@ -2,12 +2,13 @@
 
 import uuid
 from datetime import datetime, timezone
+from typing import Optional
 from sqlalchemy import (
-    Column, DateTime, String, Integer, ForeignKey,
-    TIMESTAMP, Numeric, Boolean, func
+    Column, DateTime, String, Integer, ForeignKey, ForeignKeyConstraint,
+    Index, TIMESTAMP, Numeric, Boolean, func, text
 )
 from sqlalchemy.dialects.postgresql import UUID, JSONB
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from db.database import Base
 
 
@@ -31,6 +32,11 @@ class Subject(Base):
     sources = relationship("QuizSource", back_populates="subject")
     quizzes = relationship("Quiz", back_populates="subject", foreign_keys="Quiz.subject_id")
 
+    __table_args__ = (
+        # Predefined subjects are looked up by (user, name) on every generation.
+        Index("ix_subjects_user_id_name", "user_id", "name"),
+    )
+
 
 # -------------------------
 # 1. Authentication Models
@@ -83,10 +89,14 @@ class User(Base):
     # model thin and avoids loading every quiz row at delete time.
 
 
-class BlacklistedToken(Base):
-    __tablename__ = "blacklisted_tokens"
-    token = Column(String, primary_key=True, index=True)
-    blacklisted_at = Column(DateTime, default=datetime.utcnow)
+class RevokedToken(Base):
+    """A logged-out access token, kept until its own expiry (see db/revocation.py)."""
+    __tablename__ = "revoked_tokens"
+    # jti claim, or sha256(token) for tokens issued without one.
+    token_id = Column(String(64), primary_key=True)
+    expires_at = Column(TIMESTAMP(timezone=True), nullable=False, index=True)
+    # Set by the database so every worker's incremental refresh reads one clock.
+    revoked_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False, index=True)
 
 
 class RefreshToken(Base):
@@ -150,13 +160,60 @@ class QuizSource(Base):
     name = Column(String(255), nullable=True)   # User-defined display name e.g. "Chapter 1"
     topics = Column(JSONB, nullable=True)        # AI-identified topics, set on first quiz generation
     file_name = Column(String(255), nullable=False)
-    extracted_text = Column(String)
+    # sha256 of the extracted text; the text itself lives once per user in
+    # source_texts, so re-uploading the same material doesn't store it again.
+    text_hash = Column(String(64), nullable=True)
     upload_date = Column(TIMESTAMP(timezone=True), default=datetime.utcnow, nullable=False)
     start_page = Column(Integer, nullable=True)
     end_page = Column(Integer, nullable=True)
     owner = relationship("User", back_populates="quiz_sources")
     subject = relationship("Subject", back_populates="sources")
     quizzes = relationship("Quiz", back_populates="source", cascade="all, delete-orphan", foreign_keys="Quiz.source_id", passive_deletes=True)
+    stored_text = relationship("SourceText", viewonly=True)
+
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["user_id", "text_hash"],
+            ["source_texts.user_id", "source_texts.text_hash"],
+        ),
+    )
+
+    @property
+    def extracted_text(self) -> Optional[str]:
+        return self.stored_text.text if self.stored_text is not None else None
+
+
+class SourceText(Base):
+    """Extracted text of a QuizSource, stored once per (user, text)."""
+    __tablename__ = "source_texts"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    text_hash = Column(String(64), primary_key=True)
+    text = Column(String, nullable=False)
+
+
+class DocumentExtraction(Base):
+    """Content-addressed cache of per-page upload text (document_extraction.py).
+
+    Keyed by sha256 of the uploaded file's bytes, so a re-upload of the same
+    file — by anyone, with any page range — reuses the pages already
+    extracted. Only pages someone asked for are stored.
+    """
+    __tablename__ = "document_extractions"
+
+    content_hash = Column(String(64), primary_key=True)
+    file_ext = Column(String(8), nullable=False)
+    page_count = Column(Integer, nullable=False)
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
+    last_used_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False, index=True)
+
+
+class DocumentPage(Base):
+    __tablename__ = "document_pages"
+
+    content_hash = Column(String(64), ForeignKey("document_extractions.content_hash", ondelete="CASCADE"), primary_key=True)
+    page_number = Column(Integer, primary_key=True)  # 1-based
+    text = Column(String, nullable=False)
 
 
 class Quiz(Base):
@@ -171,6 +228,8 @@ class Quiz(Base):
     time_limit = Column(Integer, nullable=True)
     num_questions = Column(Integer, nullable=False)
     content = Column(JSONB, nullable=False)
+    # Compiled from `content` on write (db/scoring.py); read by submit only.
+    answer_key = deferred(Column(JSONB, nullable=True))
     topics = Column(JSONB, nullable=True)
     generation_date = Column(TIMESTAMP(timezone=True), default=datetime.utcnow)
 
@@ -179,6 +238,13 @@ class Quiz(Base):
     owner = relationship("User")
     quiz_results = relationship("QuizResult", back_populates="quiz", cascade="all, delete-orphan", passive_deletes=True)
 
+    __table_args__ = (
+        # Keyset pagination of a user's quizzes, newest first (db/routers/pagination.py).
+        Index("ix_quizzes_user_id_generation_date_id", "user_id", "generation_date", "id"),
+        # Hören / Lesen quota windows: a user's quizzes of one type since a date.
+        Index("ix_quizzes_user_id_quiz_type_generation_date", "user_id", "quiz_type", "generation_date"),
+    )
+
 # -------------------------------
 # 3. Assessment / Results Models
 # -------------------------------
@@ -200,6 +266,92 @@ class QuizResult(Base):
     quiz = relationship("Quiz", back_populates="quiz_results")
     user = relationship("User", back_populates="quiz_results")
 
+    __table_args__ = (
+        # Keyset pagination of a user's results, overall and per quiz, and
+        # the latest result per quiz (DISTINCT ON quiz_id).
+        Index("ix_quiz_results_user_id_attempt_date_id", "user_id", "attempt_date", "id"),
+        Index("ix_quiz_results_user_id_quiz_id_attempt_date", "user_id", "quiz_id", "attempt_date"),
+    )
+
+
+class UserTopicStat(Base):
+    """
+    Per-user, per-topic answer totals across all QuizResults, maintained by
+    db/topic_stats.py on submit / quiz deletion so the performance and
+    recommendation endpoints don't rescan every result's user_answers.
+    """
+    __tablename__ = "user_topic_stats"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    topic = Column(String, primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+    correct = Column(Integer, nullable=False, default=0)
+    last_seen_at = Column(TIMESTAMP(timezone=True), nullable=True)
+    quiz_ids = Column(JSONB, nullable=False, default=list)  # quiz ids (str) the topic was answered in
+
+
+# -----------------------------------
+# 3b. Background Generation Jobs
+# -----------------------------------
+class GenerationJob(Base):
+    """
+    One long-running exam generation (Hören or Lesen) handed off to the worker
+    pool in `generation_jobs.py`. The POST endpoint inserts the row and
+    returns its id immediately; the worker updates `status` / `stage` /
+    `progress_*` as it goes and links the persisted Quiz on success.
+    """
+    __tablename__ = "generation_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=generate_uuid)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    kind = Column(String(32), nullable=False)              # "horen"
+    subject_slug = Column(String(64), nullable=False)
+    status = Column(String(16), nullable=False, default="queued", index=True)  # queued | running | succeeded | failed
+    stage = Column(String(32), nullable=True)              # last `progress(stage, ...)` stage seen
+    progress_current = Column(Integer, nullable=False, default=0)
+    progress_total = Column(Integer, nullable=False, default=0)
+    params = Column(JSONB, nullable=True)
+    quiz_id = Column(UUID(as_uuid=True), ForeignKey("quizzes.id", ondelete="SET NULL"), nullable=True)
+    error = Column(String, nullable=True)
+    created_at = Column(TIMESTAMP(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+    started_at = Column(TIMESTAMP(timezone=True), nullable=True)
+    finished_at = Column(TIMESTAMP(timezone=True), nullable=True)
+    heartbeat_at = Column(TIMESTAMP(timezone=True), nullable=True)  # last sign of life from the owning process
+
+    __table_args__ = (
+        # Quota checks count a user's queued/running jobs of one kind; only
+        # a handful of rows are ever active, so the index stays tiny.
+        Index(
+            "ix_generation_jobs_active_user_id_kind",
+            "user_id",
+            "kind",
+            postgresql_where=text("status IN ('queued', 'running')"),
+        ),
+    )
+
+
+class ExamInventoryItem(Base):
+    """
+    A pre-generated full exam (Hören or Lesen) waiting on the shelf. The
+    refill worker in `exam_inventory.py` keeps EXAM_INVENTORY_DEPTH of these
+    per subject slug; POST /horen|lesen/{slug}/quiz deletes one and persists
+    its manifest as the user's Quiz in the same transaction. Audio referenced
+    by a Hören manifest already sits in uploads/horen/.
+    """
+    __tablename__ = "exam_inventory"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=generate_uuid)
+    kind = Column(String(32), nullable=False)              # GenerationJob.kind: "horen" | "lesen"
+    subject_slug = Column(String(64), nullable=False)
+    tts_provider = Column(String(32), nullable=True)       # Hören only: the voices the audio was rendered with
+    content = Column(JSONB, nullable=False)                # the generate_full_exam manifest
+    created_at = Column(TIMESTAMP(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+
+    __table_args__ = (
+        # Claims take the oldest exam for a slug; refills count the stock.
+        Index("ix_exam_inventory_subject_slug_created_at", "subject_slug", "created_at"),
+    )
+
 
 # -----------------------------------
 # 4. Predefined-Subject Exam Banks
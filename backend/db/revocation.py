@@ -0,0 +1,223 @@
+"""
+Access-token revocation (logout).
+
+Revoked tokens live in `revoked_tokens` as (token_id, expires_at):
+`token_id` is the token's `jti` claim, or sha256(token) for tokens minted
+before jti was added. Rows are only needed until the token would have expired
+anyway, so `prune_expired` deletes them on a schedule (see main.py) and the
+table stays bounded by "logouts in the last ACCESS_TOKEN_EXPIRE_MINUTES".
+
+Each process keeps a Bloom filter of the revoked ids. A miss means "not
+revoked" with certainty and costs no SQL — that's almost every request. A hit
+may be a false positive (REVOCATION_BLOOM_ERROR_RATE), so it is confirmed
+with a primary-key probe. The filter is topped up incrementally from rows
+with `revoked_at` newer than the last refresh (at most every
+REVOCATION_REFRESH_SECONDS), and rebuilt from scratch after pruning since
+Bloom filters can't delete. A logout on another worker is therefore seen
+here within REVOCATION_REFRESH_SECONDS; logouts on this worker immediately.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import math
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional
+
+import jwt
+from sqlalchemy.orm import Session
+
+from db.database import SessionLocal
+from db.models import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+REVOCATION_BLOOM_CAPACITY = int(os.getenv("REVOCATION_BLOOM_CAPACITY", "100000"))
+REVOCATION_BLOOM_ERROR_RATE = float(os.getenv("REVOCATION_BLOOM_ERROR_RATE", "0.001"))
+REVOCATION_REFRESH_SECONDS = float(os.getenv("REVOCATION_REFRESH_SECONDS", "5"))
+REVOCATION_PRUNE_INTERVAL_SECONDS = int(os.getenv("REVOCATION_PRUNE_INTERVAL_SECONDS", "3600"))
+
+# Incremental refreshes re-read this much history, so a row committed with a
+# slightly older `revoked_at` than one we've already seen isn't missed.
+# Re-adding an id is a no-op.
+_REFRESH_OVERLAP = timedelta(seconds=60)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (double hashing on blake2b)."""
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        capacity = max(capacity, 1)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str) -> Iterable[int]:
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key: str) -> None:
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class RevocationIndex:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._bloom: Optional[BloomFilter] = None
+        self._watermark: Optional[datetime] = None
+        self._refreshed_at = 0.0
+
+    def _rebuild(self, db: Session) -> None:
+        rows = (
+            db.query(RevokedToken.token_id, RevokedToken.revoked_at)
+            .filter(RevokedToken.expires_at > datetime.now(timezone.utc))
+            .all()
+        )
+        # Leave headroom so incremental adds don't push the false-positive
+        # rate past target before the next rebuild.
+        bloom = BloomFilter(max(REVOCATION_BLOOM_CAPACITY, 2 * len(rows)), REVOCATION_BLOOM_ERROR_RATE)
+        for token_id, _ in rows:
+            bloom.add(token_id)
+        self._bloom = bloom
+        self._watermark = max((r for _, r in rows), default=datetime.now(timezone.utc))
+        self._refreshed_at = time.monotonic()
+
+    def _top_up(self, db: Session) -> None:
+        rows = (
+            db.query(RevokedToken.token_id, RevokedToken.revoked_at)
+            .filter(RevokedToken.revoked_at > self._watermark - _REFRESH_OVERLAP)
+            .all()
+        )
+        for token_id, revoked_at in rows:
+            self._bloom.add(token_id)
+            if revoked_at > self._watermark:
+                self._watermark = revoked_at
+        self._refreshed_at = time.monotonic()
+
+    def _ensure_fresh(self, db: Session) -> None:
+        if self._bloom is None:
+            with self._lock:
+                if self._bloom is None:
+                    self._rebuild(db)
+            return
+        if time.monotonic() - self._refreshed_at < REVOCATION_REFRESH_SECONDS:
+            return
+        # One thread refreshes; the rest answer from the current filter
+        # rather than queueing behind it.
+        if self._lock.acquire(blocking=False):
+            try:
+                self._top_up(db)
+            finally:
+                self._lock.release()
+
+    def is_revoked(self, db: Session, token_id: str) -> bool:
+        self._ensure_fresh(db)
+        if token_id not in self._bloom:
+            return False
+        return db.query(RevokedToken.token_id).filter(RevokedToken.token_id == token_id).first() is not None
+
+    def add(self, token_id: str) -> None:
+        with self._lock:
+            if self._bloom is not None:
+                self._bloom.add(token_id)
+
+    def rebuild(self, db: Session) -> None:
+        with self._lock:
+            self._rebuild(db)
+
+    def stats(self) -> dict:
+        bloom = self._bloom
+        return {
+            "loaded": bloom is not None,
+            "entries": bloom.count if bloom else 0,
+            "bits": bloom.size if bloom else 0,
+            "hashes": bloom.hashes if bloom else 0,
+        }
+
+
+revocations = RevocationIndex()
+
+
+def token_id(token: str, payload: Optional[dict] = None) -> str:
+    """Stable id for `token`: its jti claim when present, else sha256(token)."""
+    jti = (payload or {}).get("jti")
+    if jti:
+        return str(jti)
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def is_revoked(db: Session, token: str, payload: dict) -> bool:
+    return revocations.is_revoked(db, token_id(token, payload))
+
+
+def revoke(db: Session, token: str) -> bool:
+    """Stage a revocation of `token` on `db` (the caller commits). Tokens that
+    don't verify are ignored — they can't authenticate anyway. Returns
+    whether a row was staged."""
+    from db.dependency import ALGORITHM, SECRET_KEY
+    import security
+
+    try:
+        # Expired-but-signed tokens still get revoked: it's harmless and
+        # keeps logout idempotent around the expiry boundary.
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM], options={"verify_exp": False})
+    except jwt.PyJWTError:
+        return False
+
+    exp = payload.get("exp")
+    if exp is not None:
+        expires_at = datetime.fromtimestamp(exp, tz=timezone.utc)
+    else:
+        expires_at = datetime.now(timezone.utc) + timedelta(minutes=security.ACCESS_TOKEN_EXPIRE_MINUTES)
+
+    tid = token_id(token, payload)
+    # merge, not add: logging out twice with the same token is not an error.
+    db.merge(RevokedToken(token_id=tid, expires_at=expires_at))
+    # Adding before commit is safe: a filter hit is always confirmed in SQL.
+    revocations.add(tid)
+    return True
+
+
+def prune_expired() -> int:
+    """Delete rows for tokens past their exp and rebuild this process's filter."""
+    db = SessionLocal()
+    try:
+        deleted = (
+            db.query(RevokedToken)
+            .filter(RevokedToken.expires_at <= datetime.now(timezone.utc))
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+        revocations.rebuild(db)
+        return deleted
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+async def prune_periodically() -> None:
+    """Startup task: prune on REVOCATION_PRUNE_INTERVAL_SECONDS until cancelled.
+    Every worker runs it; the DELETE is idempotent."""
+    while True:
+        try:
+            deleted = await asyncio.to_thread(prune_expired)
+            if deleted:
+                logger.info("Pruned %d expired revoked token(s)", deleted)
+        except Exception:
+            logger.exception("Revoked-token pruning failed")
+        await asyncio.sleep(REVOCATION_PRUNE_INTERVAL_SECONDS)
@@ -1,14 +1,25 @@
+import base64
+import json
 import logging
+import re
 from datetime import datetime
-from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Annotated, Iterable, Iterator, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, literal, or_, select, tuple_
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session, joinedload
 from agents import PREDEFINED_AGENTS
+from agents._tools import tts_cache, tts_guard
+from db.routers.pagination import DEFAULT_PAGE_SIZE
 from db.routers.util import build_user_response
 from schemas import UserAdminResponse, UserDetailResponse, QuizSourceResponse, QuizResponse
 from db.dependency import get_current_admin, get_db
-from db import models
+from db import metrics, models, topic_stats
+from db.auth_cache import invalidate_user
+from db.database import DB_STATEMENT_METRICS, engine
+from db.source_texts import delete_source_text_if_unused
+import exam_inventory
 from uuid import UUID
 
 # Subject names registered as predefined agents. Any Quiz whose subject_id
@@ -31,13 +42,113 @@ db_dep = Annotated[Session, Depends(get_db)]
 DBSession = Annotated[Session, Depends(get_db)]
 CurrentAdmin = Annotated[models.User, Depends(get_current_admin)]
 
+# ── user listing ─────────────────────────────────────────────────────────────
+#
+# One statement per page. The page of users is picked first (search, keyset
+# filter on (sort column, id), LIMIT) in a subquery; only those rows then
+# get their quiz / source counts, as correlated subqueries on the user_id
+# indexes, and their subscription. Grouping all of `quizzes` and
+# `quiz_sources` and joining that instead would cost a scan of both tables
+# per page, however small the page. The opaque cursor for the next page
+# comes back in the X-Next-Cursor header so the body stays a plain array;
+# there is no unpaged mode — `limit` defaults to DEFAULT_PAGE_SIZE.
+
+_USER_SORT_COLUMNS = {
+    "created_at": models.User.created_at,
+    "email": models.User.email,
+    # Keyset comparisons need a non-null key.
+    "name": func.coalesce(models.User.name, ""),
+}
+
+
+def _encode_user_cursor(sort: str, value, user_id: UUID) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([sort, value, str(user_id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_user_cursor(cursor: str, sort: str) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, value, user_id = json.loads(raw)
+        if cursor_sort != sort:
+            raise ValueError("cursor was issued for a different sort")
+        if sort == "created_at":
+            value = datetime.fromisoformat(value)
+        return value, UUID(user_id)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+
+
+def _admin_users_query(
+    db: Session, search: Optional[str], sort: str, order: str, after: Optional[str], limit: int
+):
+    """(User, quizzes_count, sources_count, sort key) rows for one page,
+    `limit` users long."""
+    sort_key = _USER_SORT_COLUMNS[sort]
+    page = db.query(models.User.id.label("id"), sort_key.label("sort_key"))
+    if search:
+        pattern = "%" + re.sub(r"([\\%_])", r"\\\1", search.strip()) + "%"
+        page = page.filter(or_(models.User.email.ilike(pattern), models.User.name.ilike(pattern)))
+    if after:
+        value, user_id = _decode_user_cursor(after, sort)
+        position = tuple_(sort_key, models.User.id)
+        bound = tuple_(literal(value), literal(user_id))
+        page = page.filter(position > bound if order == "asc" else position < bound)
+    if order == "asc":
+        page = page.order_by(sort_key.asc(), models.User.id.asc())
+    else:
+        page = page.order_by(sort_key.desc(), models.User.id.desc())
+    page = page.limit(limit).subquery()
+
+    quizzes_count = (
+        select(func.count(models.Quiz.id))
+        .where(models.Quiz.user_id == models.User.id)
+        .scalar_subquery()
+    )
+    sources_count = (
+        select(func.count(models.QuizSource.id))
+        .where(models.QuizSource.user_id == models.User.id)
+        .scalar_subquery()
+    )
+    query = (
+        db.query(models.User, quizzes_count, sources_count, page.c.sort_key)
+        .join(page, page.c.id == models.User.id)
+        .options(joinedload(models.User.subscription))
+    )
+    if order == "asc":
+        return query.order_by(page.c.sort_key.asc(), models.User.id.asc())
+    return query.order_by(page.c.sort_key.desc(), models.User.id.desc())
+
+
+def _users_json(rows: Iterable) -> Iterator[bytes]:
+    yield b"["
+    for i, (user, quizzes_count, sources_count, _) in enumerate(rows):
+        item = UserAdminResponse(**build_user_response(
+            user, quizzes_count=quizzes_count, sources_count=sources_count
+        ))
+        yield (b"," if i else b"") + item.model_dump_json().encode()
+    yield b"]"
+
+
 @router.get("/allusers", response_model=list[UserAdminResponse])
 async def get_all_users(
     db: db_dep,
-    _: CurrentAdmin
+    _: CurrentAdmin,
+    q: Optional[str] = Query(None, description="Case-insensitive match on email or name."),
+    sort: Literal["created_at", "email", "name"] = Query("created_at"),
+    order: Literal["asc", "desc"] = Query("desc"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=1000, description="Page size."),
+    after: Optional[str] = Query(None, description="X-Next-Cursor from the previous page."),
 ):
-    users = db.query(models.User).options(joinedload(models.User.subscription)).all()
-    return [build_user_response(user, db_session=db) for user in users] 
+    rows = _admin_users_query(db, q, sort, order, after, limit + 1).all()
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_user, _, _, last_key = rows[-1]
+        headers["X-Next-Cursor"] = _encode_user_cursor(sort, last_key, last_user.id)
+    return StreamingResponse(_users_json(rows), media_type="application/json", headers=headers)
 
 
 @router.delete("/user/email/{email}", status_code=status.HTTP_204_NO_CONTENT)
@@ -50,6 +161,7 @@ async def delete_user_by_email(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
+    user_id = user.id
     try:
         db.delete(user)
         db.commit()
@@ -62,6 +174,9 @@ async def delete_user_by_email(
             status_code=500,
             detail=f"Could not delete user: {type(e).__name__}: {e}",
         )
+    # The deleted user's cached sessions must stop authenticating now, not
+    # when their cache entries expire.
+    invalidate_user(user_id)
 
 
 @router.get("/user/{user_id}", response_model=UserDetailResponse)
@@ -222,7 +337,10 @@ async def delete_quiz_source(
         raise HTTPException(status_code=404, detail="Quiz source not found")
 
     try:
+        topic_stats.forget_quizzes(db, source_id=source.id)
         db.delete(source)
+        db.flush()
+        delete_source_text_if_unused(db, source.user_id, source.text_hash)
         db.commit()
     except SQLAlchemyError as e:
         db.rollback()
@@ -259,6 +377,7 @@ async def reset_user_quota(
             status_code=500,
             detail=f"Could not reset quota: {type(e).__name__}: {e}",
         )
+    invalidate_user(user.id)
 
     return {
         "user_id": str(user.id),
@@ -279,6 +398,7 @@ async def delete_quiz(
         raise HTTPException(status_code=404, detail="Quiz not found")
 
     try:
+        topic_stats.forget_quizzes(db, [quiz.id])
         db.delete(quiz)
         db.commit()
     except SQLAlchemyError as e:
@@ -288,3 +408,45 @@ async def delete_quiz(
             status_code=500,
             detail=f"Could not delete quiz: {type(e).__name__}: {e}",
         )
+
+
+@router.get("/metrics/db")
+async def get_db_metrics(_: CurrentAdmin):
+    """Connection-pool state plus the per-statement latency histogram.
+
+    The histogram is only populated when DB_STATEMENT_METRICS is on;
+    `enabled` tells the admin UI whether empty buckets mean "no traffic" or
+    "not recording". POST /admin/metrics/db/reset starts a fresh window
+    (e.g. right before a load test).
+    """
+    return {
+        "enabled": DB_STATEMENT_METRICS,
+        "pool": {
+            "size": engine.pool.size(),
+            "checked_out": engine.pool.checkedout(),
+            "overflow": engine.pool.overflow(),
+            "checked_in": engine.pool.checkedin(),
+        },
+        **metrics.snapshot(),
+    }
+
+
+@router.post("/metrics/db/reset", status_code=status.HTTP_204_NO_CONTENT)
+async def reset_db_metrics(_: CurrentAdmin):
+    """Clear the statement histogram."""
+    metrics.histogram.reset()
+
+
+@router.get("/metrics/tts")
+def get_tts_metrics(_: CurrentAdmin):
+    """Hören TTS on this worker since it started: segment cache size and
+    hit/miss counts, and per provider the rate-limit queue, circuit-breaker
+    state and fallbacks (only providers used so far are listed)."""
+    return {"cache": tts_cache.cache.stats(), "providers": tts_guard.snapshot()}
+
+
+@router.get("/metrics/exam-inventory")
+def get_exam_inventory_metrics(_: CurrentAdmin):
+    """Pre-generated exams on the shelf per slug (all workers), and this
+    worker's claims, misses and refills since it started."""
+    return exam_inventory.snapshot()
@@ -4,8 +4,9 @@ from fastapi.responses import RedirectResponse
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from typing import Annotated
+from db.auth_cache import revoke_token
 from db.dependency import get_db, get_current_user, get_token
-from db import models
+from db import models, revocation
 from db.routers.util import build_user_response
 
 import schemas, security
@@ -561,8 +562,8 @@ def change_password(
 
 @router.post("/logout")
 def logout(request: Request, response: Response, token: str = Depends(get_token), db: Session = Depends(get_db)):
-    # Blacklist access token
-    db.add(models.BlacklistedToken(token=token))
+    # Revoke the access token until it would have expired anyway
+    revocation.revoke(db, token)
 
     # Revoke refresh token if present
     raw_refresh = request.cookies.get("refresh_token")
@@ -575,6 +576,7 @@ def logout(request: Request, response: Response, token: str = Depends(get_token)
             record.revoked = True
 
     db.commit()
+    revoke_token(token)
     response.delete_cookie(key="auth_token", path="/", domain=COOKIE_DOMAIN)
     response.delete_cookie(key="refresh_token", path="/auth/refresh", domain=COOKIE_DOMAIN)
     return {"message": "Logged out successfully"}
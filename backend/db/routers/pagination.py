@@ -0,0 +1,106 @@
+"""
+Keyset pagination for history listings (quizzes, results, Hören/Lesen
+sessions).
+
+Listings are ordered newest first on (timestamp, id) and paged by position,
+not OFFSET: the cursor for the next page encodes the last row's key, and the
+next page is `WHERE (timestamp, id) < cursor`, which the composite
+(user_id, timestamp, id) indexes answer without reading the skipped rows —
+page 50 costs what page 1 does.
+
+Endpoints take `page: Page` (query params `limit`, `after`, `include_total`)
+and return `paginate(query, page, response, ...)`. The body stays a plain
+list, as before; the cursor for the next page comes back in the
+X-Next-Cursor header (absent on the last page), like GET /admin/allusers,
+and X-Total-Count only when `include_total=true` — counting costs a scan of
+everything the listing matches, so it isn't done by default. Without `limit`
+a listing returns its first DEFAULT_PAGE_SIZE rows; there is no "everything"
+mode. Pages that need totals over a whole history (dashboard stats, a
+subject's averages) read an aggregate endpoint instead of walking a listing.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Annotated, Optional
+from uuid import UUID
+
+from fastapi import Depends, HTTPException, Query, Response
+from sqlalchemy import and_, or_, tuple_
+from sqlalchemy.orm import Query as OrmQuery
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+@dataclass(frozen=True)
+class PageParams:
+    limit: int
+    after: Optional[str]
+    include_total: bool
+
+
+def _page_params(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size."),
+    after: Optional[str] = Query(None, description="X-Next-Cursor from the previous page."),
+    include_total: bool = Query(False, description="Also count all matching rows (X-Total-Count)."),
+) -> PageParams:
+    return PageParams(limit=limit, after=after, include_total=include_total)
+
+
+Page = Annotated[PageParams, Depends(_page_params)]
+
+
+def encode_cursor(scope: str, timestamp: Optional[datetime], row_id: UUID) -> str:
+    raw = json.dumps([scope, timestamp.isoformat() if timestamp else None, str(row_id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, scope: str) -> tuple[Optional[datetime], UUID]:
+    """(timestamp, id) from a cursor issued for `scope`; 400 if it's malformed
+    or belongs to another listing."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_scope, timestamp, row_id = json.loads(raw)
+        if cursor_scope != scope:
+            raise ValueError("cursor was issued for a different listing")
+        return (datetime.fromisoformat(timestamp) if timestamp is not None else None), UUID(row_id)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+
+
+def paginate(
+    query: OrmQuery,
+    page: PageParams,
+    response: Response,
+    *,
+    timestamp,
+    id_column,
+    scope: str,
+) -> list:
+    """One page of `query`'s rows, newest first by (timestamp, id_column),
+    setting X-Next-Cursor when there are more. Each row must expose both columns as
+    attributes (an entity, or a row that selects them)."""
+    if page.include_total:
+        response.headers["X-Total-Count"] = str(query.order_by(None).count())
+
+    if page.after:
+        after_ts, after_id = decode_cursor(page.after, scope)
+        # Timestamps are nullable; NULLs sort first in this (DESC) order.
+        if after_ts is None:
+            query = query.filter(or_(timestamp.isnot(None), and_(timestamp.is_(None), id_column < after_id)))
+        else:
+            query = query.filter(tuple_(timestamp, id_column) < tuple_(after_ts, after_id))
+    query = query.order_by(timestamp.desc().nulls_first(), id_column.desc())
+
+    rows = query.limit(page.limit + 1).all()
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        last = rows[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(
+            scope, getattr(last, timestamp.key), getattr(last, id_column.key)
+        )
+    return rows
@@ -3,11 +3,17 @@ Hören (German Listening) endpoints. Supports both A2 and B1 levels via the
 `slug` path parameter.
 
 POST /horen/{slug}/quiz
-    Generates a complete 4-Teil Goethe-Zertifikat Hören exam (scripts +
-    audio + manifest), provisions or reuses the user's matching Subject row,
-    and persists the exam as a `Quiz` row with `quiz_type='audio_listening'`.
-    Audio files are written to backend/uploads/horen/ with UUID names and
-    served via the /static/horen/ StaticFiles mount.
+    Queues a complete 4-Teil Goethe-Zertifikat Hören exam (scripts + audio +
+    manifest) on the generation worker pool (see `generation_jobs.py`) and
+    returns the job id immediately with 202. The worker provisions or reuses
+    the user's matching Subject row and persists the exam as a `Quiz` row
+    with `quiz_type='audio_listening'`. Audio files are written to
+    backend/uploads/horen/ with UUID names and served via the /static/horen/
+    StaticFiles mount.
+
+    If the exam inventory (`exam_inventory.py`) has a pre-generated exam for
+    the slug, that one is persisted on the spot instead, and the response
+    already carries its `quiz_id`.
 
     The Quiz.content shape is `{kind: "full_exam", teile: [...×4],
     questions: [...flat across all Teile]}`. The flat `questions` list (each
@@ -18,9 +24,20 @@ POST /horen/{slug}/quiz
     `deutsch_b1_horen` each have their own services/generation.py with
     level-specific instruction text, play limits, and topic catalogs.
 
+GET /horen/jobs/{job_id}
+    Poll a generation job: status (queued / running / succeeded / failed),
+    the last `progress(stage, current, total)` seen, and the `quiz_id` once
+    the exam has been persisted.
+
+GET /horen/jobs/{job_id}/events
+    The same job as a Server-Sent Events stream: progress through
+    scripts → audio → stitch → persist with an overall percent, a `partial`
+    event as each Teil finishes, then `done` (with quiz_id) or `failed`.
+
 GET /horen/{slug}/sessions
     Returns the user's existing Hören Quiz rows (most recent first), with
-    their score if they've taken them. Drives the library page.
+    their score if they've taken them. Drives the library page. Pages with
+    `limit` / `after` like the other history listings (db/routers/pagination.py).
 
 GET /horen/{slug}/quota
     Current user's Hören usage and remaining quota. The quota is shared
@@ -32,14 +49,14 @@ GET /horen/{slug}/quota
 
 from __future__ import annotations
 
-import asyncio
+import functools
 import logging
 import uuid
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Annotated, Callable, Optional
 
-from fastapi import APIRouter, Body, Depends, HTTPException, Path as PathParam
+from fastapi import APIRouter, Body, Depends, HTTPException, Path as PathParam, Response
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
@@ -54,8 +71,22 @@ from agents.deutsch_b1_horen.services.generation import (
     full_exam_title as b1_full_exam_title,
     generate_full_exam as b1_generate_full_exam,
 )
+from db.database import SessionLocal
 from db.dependency import get_current_user, get_db
-from db.models import Quiz, QuizResult, Subject, User
+from db.models import Quiz, Subject, User
+from db.routers.pagination import Page, paginate
+from db.routers.util import json_array_length, latest_results
+import exam_inventory
+from generation_jobs import (
+    count_active_jobs,
+    get_job,
+    job_status_payload,
+    record_completed_job,
+    register_job_kind,
+    sse_response,
+    stream_job_events,
+    submit_job,
+)
 
 # Per-slug dispatch table for the level-specific generation pipelines. Each
 # entry exposes the same callable shape so the route handler stays generic.
@@ -86,6 +117,16 @@ HOREN_QUOTA_PRO_PER_WEEK = 5
 HOREN_QUOTA_TRIAL_LIFETIME = 1
 HOREN_QUOTA_PRO_WINDOW = timedelta(days=7)
 
+# GenerationJob.kind for Hören exams. Shared across levels, like the quota.
+HOREN_JOB_KIND = "horen"
+
+# Share of the progress bar per stage. Audio dominates: 8 TTS renders (the
+# multi-speaker ones turn by turn) against 4 parallel Gemini script calls.
+register_job_kind(
+    HOREN_JOB_KIND,
+    (("scripts", 20), ("audio", 60), ("stitch", 10), ("persist", 10)),
+)
+
 DBSession = Annotated[Session, Depends(get_db)]
 CurrentUser = Annotated[User, Depends(get_current_user)]
 
@@ -97,6 +138,24 @@ HOREN_AUDIO_DIR = Path(__file__).parent.parent.parent.parent / "uploads" / "hore
 AUDIO_URL_PREFIX = "/static/horen"
 
 
+# Inventory exams are rendered with the default voices; a request for any
+# other provider always generates fresh.
+INVENTORY_TTS_PROVIDER = "edge_tts"
+
+for _slug, _generators in HOREN_GENERATORS.items():
+    exam_inventory.register_stock(
+        _slug,
+        kind=HOREN_JOB_KIND,
+        produce=functools.partial(
+            _generators["generate_full_exam"],
+            HOREN_AUDIO_DIR,
+            provider_name=INVENTORY_TTS_PROVIDER,
+            audio_url_prefix=AUDIO_URL_PREFIX,
+        ),
+        tts_provider=INVENTORY_TTS_PROVIDER,
+    )
+
+
 class GenerateHorenRequest(BaseModel):
     provider: Optional[str] = "edge_tts"
 
@@ -160,7 +219,9 @@ def _horen_quota_status(user: User, db: Session) -> dict:
             .order_by(Quiz.generation_date.asc())
             .all()
         )
-        used = len(recent)
+        # Exams still being generated count too — otherwise a user could
+        # queue several jobs before the first one lands as a Quiz row.
+        used = len(recent) + count_active_jobs(user.id, HOREN_JOB_KIND)
         period = "week"
         reason = None if used < limit else "weekly_limit_reached"
 
@@ -196,7 +257,7 @@ def _horen_quota_status(user: User, db: Session) -> dict:
         )
         if user.quota_reset_at is not None:
             trial_q = trial_q.filter(Quiz.generation_date >= user.quota_reset_at)
-        used = trial_q.count()
+        used = trial_q.count() + count_active_jobs(user.id, HOREN_JOB_KIND)
         period = "trial"
         reason = None if used < limit else "trial_limit_reached"
         return {
@@ -239,28 +300,99 @@ def _get_or_create_subject(user: User, db: Session, agent: dict) -> Subject:
         color=agent["color"],
     )
     db.add(subject)
-    db.commit()
-    db.refresh(subject)
+    # Flushed, not committed: the caller's commit lands the subject with the
+    # Quiz — and, on the inventory path, with the claim's DELETE, which must
+    # not become permanent before the Quiz insert does.
+    db.flush()
     return subject
 
 
-@router.post("/{slug}/quiz", status_code=201)
+def _save_horen_quiz(db: Session, user: User, slug: str, manifest: dict) -> Quiz:
+    """Persist a full-exam manifest as the user's Quiz row and commit."""
+    agent = get_agent(slug)
+    subject = _get_or_create_subject(user, db, agent)
+    new_quiz = Quiz(
+        id=uuid.uuid4(),
+        user_id=user.id,
+        source_id=None,
+        subject_id=subject.id,
+        quiz_type="audio_listening",
+        title=HOREN_GENERATORS[slug]["full_exam_title"](),
+        num_questions=len(manifest["questions"]),
+        time_limit=None,  # Hören exams are self-paced; per-Teil play_limit gates pacing
+        content=manifest,
+        topics={
+            "primary_subject": agent["name"],
+            "topics": [t.get("teil_name", f"Teil {t.get('teil')}") for t in manifest.get("teile", [])],
+        },
+        generation_date=datetime.utcnow(),
+    )
+    db.add(new_quiz)
+    db.commit()
+    return new_quiz
+
+
+def _run_horen_generation(
+    progress,
+    *,
+    user_id: uuid.UUID,
+    slug: str,
+    provider_name: str,
+) -> dict:
+    """Job body executed on the generation worker pool: run the level-specific
+    pipeline, then persist the manifest as a Quiz row. Uses its own DB session
+    — the request that queued the job has long since returned."""
+    generators = HOREN_GENERATORS[slug]
+
+    def on_section(teil: int, section: dict) -> None:
+        progress.partial({
+            "teil": teil,
+            "teil_name": section.get("teil_name"),
+            "num_questions": len(section.get("questions") or []),
+            "num_audio_segments": len(section.get("audio_segments") or []),
+        })
+
+    manifest = generators["generate_full_exam"](
+        HOREN_AUDIO_DIR,
+        provider_name=provider_name,
+        audio_url_prefix=AUDIO_URL_PREFIX,
+        progress=progress,
+        on_section=on_section,
+    )
+    if not manifest.get("questions"):
+        raise RuntimeError("generation produced 0 questions — the model output may be malformed; try again")
+
+    progress("persist", 0, 1)
+    with SessionLocal() as db:
+        user = db.query(User).filter(User.id == user_id).first()
+        if user is None:
+            raise RuntimeError("user was deleted while the exam was generating")
+        new_quiz = _save_horen_quiz(db, user, slug, manifest)
+        progress("persist", 1, 1)
+        return {"quiz_id": new_quiz.id}
+
+
+@router.post("/{slug}/quiz", status_code=202)
 async def create_horen_quiz(
     db: DBSession,
     current_user: CurrentUser,
     payload: GenerateHorenRequest = Body(default_factory=GenerateHorenRequest),
     slug: str = PathParam(...),
 ):
-    """Generate a fresh full Hören exam (all 4 Teile) and persist it as a Quiz row.
+    """Queue a fresh full Hören exam (all 4 Teile) for generation.
+
+    Returns immediately with the job id. Scripts + audio for the 4 Teile take
+    ~2 minutes on the worker pool; the frontend follows
+    GET /horen/jobs/{id}/events (or polls GET /horen/jobs/{id}) and navigates
+    to the player once the job links a quiz_id.
 
-    Synchronous: the caller waits ~2 minutes while scripts are generated and
-    audio is rendered for each of the 4 Teile. The frontend shows a progress
-    overlay explaining the wait — it's the cost of producing exam-realistic
-    listening material on demand.
+    When the exam inventory has a stocked exam for the slug (and provider),
+    it's persisted right here instead: the response already carries the
+    `quiz_id`, with status "succeeded", and the job's stream ends in `done`.
     """
-    agent = _resolve_horen_agent(slug)
+    _resolve_horen_agent(slug)
 
-    # Quota check BEFORE generation — don't burn Gemini calls and audio render
+    # Quota check BEFORE queueing — don't burn Gemini calls and audio render
     # time on a request we're going to reject anyway.
     quota = _horen_quota_status(current_user, db)
     if not quota["can_generate"]:
@@ -282,63 +414,76 @@ async def create_horen_quiz(
             status_code = 402
         raise HTTPException(status_code=status_code, detail=detail)
 
-    # Dispatch to the level-specific generator (A2 or B1).
-    generators = HOREN_GENERATORS[slug]
-    generate_full_exam = generators["generate_full_exam"]
-    full_exam_title = generators["full_exam_title"]
-
-    # Run the (slow, blocking) generation pipeline off the event loop so other
-    # requests aren't starved while Gemini + TTS + ffmpeg do their work.
-    try:
-        manifest = await asyncio.to_thread(
-            generate_full_exam,
-            HOREN_AUDIO_DIR,
-            provider_name=payload.provider or "edge_tts",
-            audio_url_prefix=AUDIO_URL_PREFIX,
-        )
-    except Exception as e:
-        # Log the full traceback so it's visible in the uvicorn terminal —
-        # otherwise the exception gets buried in the 502 response body and
-        # is invisible unless the caller inspects the network response.
-        logger.exception("Hören full-exam generation failed for user %s slug=%s", current_user.id, slug)
-        raise HTTPException(status_code=502, detail=f"generation failed: {type(e).__name__}: {e}")
-
-    if not manifest.get("questions"):
-        raise HTTPException(
-            status_code=502,
-            detail="generation produced 0 questions — the model output may be malformed; try again",
+    provider_name = payload.provider or "edge_tts"
+    user_id = current_user.id
+
+    # A pre-generated exam turns the whole generation into this insert.
+    manifest = exam_inventory.claim(db, slug, tts_provider=provider_name)
+    if manifest is not None:
+        new_quiz = _save_horen_quiz(db, current_user, slug, manifest)
+        exam_inventory.request_refill(slug)
+        job_id = record_completed_job(
+            user_id=user_id,
+            kind=HOREN_JOB_KIND,
+            subject_slug=slug,
+            quiz_id=new_quiz.id,
+            params={"provider": provider_name, "inventory": True},
         )
+        return {
+            "job_id": str(job_id),
+            "status": "succeeded",
+            "quiz_id": str(new_quiz.id),
+            "poll_url": f"/horen/jobs/{job_id}",
+            "events_url": f"/horen/jobs/{job_id}/events",
+        }
 
-    subject = _get_or_create_subject(current_user, db, agent)
+    def body(progress):
+        return _run_horen_generation(progress, user_id=user_id, slug=slug, provider_name=provider_name)
 
-    new_quiz = Quiz(
-        id=uuid.uuid4(),
-        user_id=current_user.id,
-        source_id=None,
-        subject_id=subject.id,
-        quiz_type="audio_listening",
-        title=full_exam_title(),
-        num_questions=len(manifest["questions"]),
-        time_limit=None,  # Hören exams are self-paced; per-Teil play_limit gates pacing
-        content=manifest,
-        topics={
-            "primary_subject": agent["name"],
-            "topics": [t.get("teil_name", f"Teil {t.get('teil')}") for t in manifest.get("teile", [])],
-        },
-        generation_date=datetime.utcnow(),
+    job_id = submit_job(
+        user_id=user_id,
+        kind=HOREN_JOB_KIND,
+        subject_slug=slug,
+        body=body,
+        params={"provider": provider_name},
     )
-    db.add(new_quiz)
-    db.commit()
-    db.refresh(new_quiz)
-
     return {
-        "id": str(new_quiz.id),
-        "title": new_quiz.title,
-        "num_questions": new_quiz.num_questions,
-        "num_teile": len(manifest.get("teile", [])),
+        "job_id": str(job_id),
+        "status": "queued",
+        "poll_url": f"/horen/jobs/{job_id}",
+        "events_url": f"/horen/jobs/{job_id}/events",
     }
 
 
+def _get_owned_job(user: User, job_id: uuid.UUID) -> dict:
+    """Only the owner can see a job — anyone else gets the same 404 as an
+    unknown id."""
+    job = get_job(job_id)
+    if job is None or job["user_id"] != user.id or job["kind"] != HOREN_JOB_KIND:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/jobs/{job_id}")
+async def get_horen_job(
+    current_user: CurrentUser,
+    job_id: uuid.UUID = PathParam(...),
+):
+    """Status of a queued Hören generation job."""
+    return job_status_payload(_get_owned_job(current_user, job_id))
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_horen_job(
+    current_user: CurrentUser,
+    job_id: uuid.UUID = PathParam(...),
+):
+    """Server-Sent Events stream of a Hören generation job. Replays what
+    already happened, then follows the job until `done` or `failed`."""
+    _get_owned_job(current_user, job_id)
+    return sse_response(stream_job_events(job_id))
+
+
 @router.get("/{slug}/quota")
 async def get_horen_quota(
     db: DBSession,
@@ -356,6 +501,8 @@ async def get_horen_quota(
 async def list_user_sessions(
     db: DBSession,
     current_user: CurrentUser,
+    page: Page,
+    response: Response,
     slug: str = PathParam(...),
 ):
     """User's previous Hören sessions, most recent first, with score if taken.
@@ -370,44 +517,44 @@ async def list_user_sessions(
     if not subject:
         return {"subject_slug": slug, "sessions": []}
 
-    quizzes = (
-        db.query(Quiz)
+    # Only the manifest fields the listing shows, not the whole `content`
+    # (scripts, per-segment audio URLs, every question).
+    query = (
+        db.query(
+            Quiz.id,
+            Quiz.title,
+            Quiz.num_questions,
+            Quiz.generation_date,
+            Quiz.content["kind"].label("kind"),
+            json_array_length(Quiz.content["teile"]).label("num_teile"),
+            (json_array_length(Quiz.content["questions"]) > 0).label("has_questions"),
+            Quiz.content["teil_name"].label("teil_name"),
+            Quiz.content["teil"].label("teil"),
+        )
         .filter(
             Quiz.user_id == current_user.id,
             Quiz.subject_id == subject.id,
             Quiz.quiz_type == "audio_listening",
         )
-        .order_by(Quiz.generation_date.desc())
-        .all()
+    )
+    quizzes = paginate(
+        query, page, response, timestamp=Quiz.generation_date, id_column=Quiz.id, scope=f"sessions:{slug}"
     )
 
     # Most recent QuizResult per quiz (some quizzes may have none).
-    quiz_ids = [q.id for q in quizzes]
-    latest_results: dict[uuid.UUID, QuizResult] = {}
-    if quiz_ids:
-        all_results = (
-            db.query(QuizResult)
-            .filter(QuizResult.quiz_id.in_(quiz_ids), QuizResult.user_id == current_user.id)
-            .order_by(QuizResult.attempt_date.desc())
-            .all()
-        )
-        for r in all_results:
-            if r.quiz_id not in latest_results:
-                latest_results[r.quiz_id] = r
+    latest = latest_results(db, current_user.id, (q.id for q in quizzes))
 
     sessions = []
     for q in quizzes:
-        content = q.content or {}
-        kind = content.get("kind")
-        teile = content.get("teile") or []
+        kind = q.kind
         # Full-exam shape: report counts; legacy single-Teil shape: report the Teil.
         if kind == "full_exam":
-            num_teile = len(teile)
+            num_teile = q.num_teile
             teil_label = None
         else:
-            num_teile = 1 if content.get("questions") else 0
-            teil_label = content.get("teil_name") or content.get("teil")
-        result = latest_results.get(q.id)
+            num_teile = 1 if q.has_questions else 0
+            teil_label = q.teil_name or q.teil
+        result = latest.get(q.id)
         sessions.append({
             "quiz_id": str(q.id),
             "title": q.title,
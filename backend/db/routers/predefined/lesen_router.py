@@ -3,9 +3,11 @@ Lesen (German Reading) endpoints. Currently scoped to B1, mirrors the Hören
 router structure so adding A2/A1 Lesen later is mechanical.
 
 POST /lesen/{slug}/quiz
-    Generates a complete 5-Teil Goethe-Zertifikat B1 Lesen exam (passages +
-    questions across all 5 Teile), provisions or reuses the user's Subject
-    row, and persists as a `Quiz` row with `quiz_type='reading'`.
+    Queues a complete 5-Teil Goethe-Zertifikat B1 Lesen exam (passages +
+    questions across all 5 Teile) on the generation worker pool (see
+    `generation_jobs.py`) and returns the job id with 202. The worker
+    provisions or reuses the user's Subject row and persists the exam as a
+    `Quiz` row with `quiz_type='reading'`.
 
     The Quiz.content shape is `{kind: "full_lesen_exam", teile: [...×5],
     questions: [...flat across all Teile]}`. Question objects carry a
@@ -14,10 +16,20 @@ POST /lesen/{slug}/quiz
     these to pick the right comparison.
 
     Faster than Hören (no audio render): typical end-to-end ~10–20s on
-    Gemini 2.5 Flash with all 5 Teile parallelized.
+    Gemini 2.5 Flash with all 5 Teile parallelized. A pre-generated exam
+    from the inventory (`exam_inventory.py`) skips even that: it's persisted
+    on the spot and the response already carries its `quiz_id`.
+
+GET /lesen/jobs/{job_id}
+GET /lesen/jobs/{job_id}/events
+    Poll a generation job, or follow it as a Server-Sent Events stream:
+    per-Teil progress with an overall percent, a `partial` event as each
+    Teil lands, then `done` (with quiz_id) or `failed`. Same shapes as the
+    Hören job endpoints.
 
 GET /lesen/{slug}/sessions
     User's existing Lesen Quiz rows, most recent first, with score if taken.
+    Paged with `limit` / `after` (db/routers/pagination.py).
 
 GET /lesen/{slug}/quota
     User's Lesen usage and remaining quota. SEPARATE from the Hören quota
@@ -30,13 +42,12 @@ GET /lesen/{slug}/quota
 
 from __future__ import annotations
 
-import asyncio
 import logging
 import uuid
 from datetime import datetime, timedelta, timezone
 from typing import Annotated, Callable, Optional
 
-from fastapi import APIRouter, Body, Depends, HTTPException, Path as PathParam
+from fastapi import APIRouter, Body, Depends, HTTPException, Path as PathParam, Response
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
@@ -51,8 +62,22 @@ from agents.deutsch_b1_lesen.services.generation import (
     full_exam_title as b1_lesen_full_exam_title,
     generate_full_exam as b1_lesen_generate_full_exam,
 )
+from db.database import SessionLocal
 from db.dependency import get_current_user, get_db
-from db.models import Quiz, QuizResult, Subject, User
+from db.models import Quiz, Subject, User
+from db.routers.pagination import Page, paginate
+from db.routers.util import json_array_length, latest_results
+import exam_inventory
+from generation_jobs import (
+    count_active_jobs,
+    get_job,
+    job_status_payload,
+    record_completed_job,
+    register_job_kind,
+    sse_response,
+    stream_job_events,
+    submit_job,
+)
 
 # Per-slug dispatch table — same pattern as Hören. Adding new levels here
 # is the only backend change needed; the route handlers stay generic.
@@ -83,6 +108,14 @@ LESEN_QUOTA_PRO_WINDOW = timedelta(days=7)
 # library page.
 LESEN_QUIZ_TYPE = "reading"
 
+# GenerationJob.kind for Lesen exams. One Gemini call per Teil, so the bar
+# moves per Teil; persisting is the short tail.
+LESEN_JOB_KIND = "lesen"
+register_job_kind(LESEN_JOB_KIND, (("teil", 90), ("persist", 10)))
+
+for _slug, _generators in LESEN_GENERATORS.items():
+    exam_inventory.register_stock(_slug, kind=LESEN_JOB_KIND, produce=_generators["generate_full_exam"])
+
 
 DBSession = Annotated[Session, Depends(get_db)]
 CurrentUser = Annotated[User, Depends(get_current_user)]
@@ -143,7 +176,8 @@ def _lesen_quota_status(user: User, db: Session) -> dict:
             .order_by(Quiz.generation_date.asc())
             .all()
         )
-        used = len(recent)
+        # Queued / running jobs count too, same as Hören.
+        used = len(recent) + count_active_jobs(user.id, LESEN_JOB_KIND)
         period = "week"
         reason = None if used < limit else "weekly_limit_reached"
 
@@ -173,7 +207,7 @@ def _lesen_quota_status(user: User, db: Session) -> dict:
         )
         if user.quota_reset_at is not None:
             trial_q = trial_q.filter(Quiz.generation_date >= user.quota_reset_at)
-        used = trial_q.count()
+        used = trial_q.count() + count_active_jobs(user.id, LESEN_JOB_KIND)
         period = "trial"
         reason = None if used < limit else "trial_limit_reached"
         return {
@@ -215,20 +249,76 @@ def _get_or_create_subject(user: User, db: Session, agent: dict) -> Subject:
         color=agent["color"],
     )
     db.add(subject)
-    db.commit()
-    db.refresh(subject)
+    # Flushed, not committed: the caller's commit lands the subject with the
+    # Quiz — and, on the inventory path, with the claim's DELETE, which must
+    # not become permanent before the Quiz insert does.
+    db.flush()
     return subject
 
 
-@router.post("/{slug}/quiz", status_code=201)
+def _save_lesen_quiz(db: Session, user: User, slug: str, manifest: dict) -> Quiz:
+    """Persist a full-exam manifest as the user's Quiz row and commit."""
+    generators = LESEN_GENERATORS[slug]
+    agent = get_agent(slug)
+    subject = _get_or_create_subject(user, db, agent)
+    new_quiz = Quiz(
+        id=uuid.uuid4(),
+        user_id=user.id,
+        source_id=None,
+        subject_id=subject.id,
+        quiz_type=LESEN_QUIZ_TYPE,
+        title=generators["full_exam_title"](),
+        num_questions=len(manifest["questions"]),
+        time_limit=generators.get("time_limit_minutes"),
+        content=manifest,
+        topics={
+            "primary_subject": agent["name"],
+            "topics": [t.get("teil_name", f"Teil {t.get('teil')}") for t in manifest.get("teile", [])],
+        },
+        generation_date=datetime.utcnow(),
+    )
+    db.add(new_quiz)
+    db.commit()
+    return new_quiz
+
+
+def _run_lesen_generation(progress, *, user_id: uuid.UUID, slug: str) -> dict:
+    """Job body executed on the generation worker pool: generate all Teile,
+    then persist the manifest as a Quiz row with its own DB session."""
+    generators = LESEN_GENERATORS[slug]
+
+    def on_section(teil: int, section: dict) -> None:
+        progress.partial({
+            "teil": teil,
+            "teil_name": section.get("teil_name"),
+            "num_questions": len(section.get("questions") or []),
+        })
+
+    manifest = generators["generate_full_exam"](progress=progress, on_section=on_section)
+    if not manifest.get("questions"):
+        raise RuntimeError("generation produced 0 questions — the model output may be malformed; try again")
+
+    progress("persist", 0, 1)
+    with SessionLocal() as db:
+        user = db.query(User).filter(User.id == user_id).first()
+        if user is None:
+            raise RuntimeError("user was deleted while the exam was generating")
+        new_quiz = _save_lesen_quiz(db, user, slug, manifest)
+        progress("persist", 1, 1)
+        return {"quiz_id": new_quiz.id}
+
+
+@router.post("/{slug}/quiz", status_code=202)
 async def create_lesen_quiz(
     db: DBSession,
     current_user: CurrentUser,
     payload: GenerateLesenRequest = Body(default_factory=GenerateLesenRequest),
     slug: str = PathParam(...),
 ):
-    """Generate a fresh full Lesen exam (all 5 Teile) and persist as a Quiz row."""
-    agent = _resolve_lesen_agent(slug)
+    """Queue a fresh full Lesen exam (all Teile) for generation. Returns the
+    job id; the frontend follows GET /lesen/jobs/{id}/events. A stocked exam
+    from the inventory is persisted right away instead (see create_horen_quiz)."""
+    _resolve_lesen_agent(slug)
 
     quota = _lesen_quota_status(current_user, db)
     if not quota["can_generate"]:
@@ -250,58 +340,67 @@ async def create_lesen_quiz(
             status_code = 402
         raise HTTPException(status_code=status_code, detail=detail)
 
-    generators = LESEN_GENERATORS[slug]
-    generate_full_exam = generators["generate_full_exam"]
-    full_exam_title = generators["full_exam_title"]
-    time_limit_minutes = generators.get("time_limit_minutes")
-
-    try:
-        # Off-thread the (still-blocking) generation so other requests aren't
-        # starved while Gemini round-trips. ~10–20s typical with parallelization.
-        manifest = await asyncio.to_thread(generate_full_exam)
-    except Exception as e:
-        logger.exception(
-            "Lesen full-exam generation failed for user %s slug=%s",
-            current_user.id, slug,
-        )
-        raise HTTPException(status_code=502, detail=f"generation failed: {type(e).__name__}: {e}")
-
-    if not manifest.get("questions"):
-        raise HTTPException(
-            status_code=502,
-            detail="generation produced 0 questions — the model output may be malformed; try again",
+    user_id = current_user.id
+
+    # A pre-generated exam turns the whole generation into this insert.
+    manifest = exam_inventory.claim(db, slug)
+    if manifest is not None:
+        new_quiz = _save_lesen_quiz(db, current_user, slug, manifest)
+        exam_inventory.request_refill(slug)
+        job_id = record_completed_job(
+            user_id=user_id,
+            kind=LESEN_JOB_KIND,
+            subject_slug=slug,
+            quiz_id=new_quiz.id,
+            params={"inventory": True},
         )
+        return {
+            "job_id": str(job_id),
+            "status": "succeeded",
+            "quiz_id": str(new_quiz.id),
+            "poll_url": f"/lesen/jobs/{job_id}",
+            "events_url": f"/lesen/jobs/{job_id}/events",
+        }
 
-    subject = _get_or_create_subject(current_user, db, agent)
-
-    new_quiz = Quiz(
-        id=uuid.uuid4(),
-        user_id=current_user.id,
-        source_id=None,
-        subject_id=subject.id,
-        quiz_type=LESEN_QUIZ_TYPE,
-        title=full_exam_title(),
-        num_questions=len(manifest["questions"]),
-        time_limit=time_limit_minutes,
-        content=manifest,
-        topics={
-            "primary_subject": agent["name"],
-            "topics": [t.get("teil_name", f"Teil {t.get('teil')}") for t in manifest.get("teile", [])],
-        },
-        generation_date=datetime.utcnow(),
-    )
-    db.add(new_quiz)
-    db.commit()
-    db.refresh(new_quiz)
+    def body(progress):
+        return _run_lesen_generation(progress, user_id=user_id, slug=slug)
 
+    job_id = submit_job(user_id=user_id, kind=LESEN_JOB_KIND, subject_slug=slug, body=body)
     return {
-        "id": str(new_quiz.id),
-        "title": new_quiz.title,
-        "num_questions": new_quiz.num_questions,
-        "num_teile": len(manifest.get("teile", [])),
+        "job_id": str(job_id),
+        "status": "queued",
+        "poll_url": f"/lesen/jobs/{job_id}",
+        "events_url": f"/lesen/jobs/{job_id}/events",
     }
 
 
+def _get_owned_job(user: User, job_id: uuid.UUID) -> dict:
+    """Same ownership rule as Hören: not yours → 404."""
+    job = get_job(job_id)
+    if job is None or job["user_id"] != user.id or job["kind"] != LESEN_JOB_KIND:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/jobs/{job_id}")
+async def get_lesen_job(
+    current_user: CurrentUser,
+    job_id: uuid.UUID = PathParam(...),
+):
+    """Status of a queued Lesen generation job."""
+    return job_status_payload(_get_owned_job(current_user, job_id))
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_lesen_job(
+    current_user: CurrentUser,
+    job_id: uuid.UUID = PathParam(...),
+):
+    """Server-Sent Events stream of a Lesen generation job."""
+    _get_owned_job(current_user, job_id)
+    return sse_response(stream_job_events(job_id))
+
+
 @router.get("/{slug}/quota")
 async def get_lesen_quota(
     db: DBSession,
@@ -317,6 +416,8 @@ async def get_lesen_quota(
 async def list_user_sessions(
     db: DBSession,
     current_user: CurrentUser,
+    page: Page,
+    response: Response,
     slug: str = PathParam(...),
 ):
     """User's previous Lesen sessions, most recent first, with score if taken."""
@@ -330,39 +431,35 @@ async def list_user_sessions(
     if not subject:
         return {"subject_slug": slug, "sessions": []}
 
-    quizzes = (
-        db.query(Quiz)
+    # Teile are counted in SQL; the passages in `content` aren't loaded.
+    query = (
+        db.query(
+            Quiz.id,
+            Quiz.title,
+            Quiz.num_questions,
+            Quiz.generation_date,
+            json_array_length(Quiz.content["teile"]).label("num_teile"),
+        )
         .filter(
             Quiz.user_id == current_user.id,
             Quiz.subject_id == subject.id,
             Quiz.quiz_type == LESEN_QUIZ_TYPE,
         )
-        .order_by(Quiz.generation_date.desc())
-        .all()
+    )
+    quizzes = paginate(
+        query, page, response, timestamp=Quiz.generation_date, id_column=Quiz.id, scope=f"sessions:{slug}"
     )
 
-    quiz_ids = [q.id for q in quizzes]
-    latest_results: dict[uuid.UUID, QuizResult] = {}
-    if quiz_ids:
-        all_results = (
-            db.query(QuizResult)
-            .filter(QuizResult.quiz_id.in_(quiz_ids), QuizResult.user_id == current_user.id)
-            .order_by(QuizResult.attempt_date.desc())
-            .all()
-        )
-        for r in all_results:
-            if r.quiz_id not in latest_results:
-                latest_results[r.quiz_id] = r
+    # Most recent QuizResult per quiz (some quizzes may have none).
+    latest = latest_results(db, current_user.id, (q.id for q in quizzes))
 
     sessions = []
     for q in quizzes:
-        content = q.content or {}
-        teile = content.get("teile") or []
-        result = latest_results.get(q.id)
+        result = latest.get(q.id)
         sessions.append({
             "quiz_id": str(q.id),
             "title": q.title,
-            "num_teile": len(teile),
+            "num_teile": q.num_teile,
             "num_questions": q.num_questions,
             "generated_at": q.generation_date.isoformat() if q.generation_date else None,
             "latest_score": float(result.score_percentage) if result else None,
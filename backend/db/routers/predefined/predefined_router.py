@@ -11,32 +11,35 @@ Generation strategy:
 - Full mode (no focus): chunked per-chapter calls run concurrently. Each call
   emits a few questions for one chapter, with chapter-matched exemplars,
   staying well under the output cap and improving per-chapter style anchoring.
+
+POST /predefined/{slug}/quiz/stream takes the same body as /quiz but answers
+with a Server-Sent Events stream: a `progress` event per finished chapter
+(or the single focused call), a `partial` event carrying each chapter's
+question count, a `persist` step, then `done` with the new quiz id — or
+`failed`. Event shapes match the Hören / Lesen job streams.
 """
 
 import asyncio
-import json
-import os
 import random
-import re
 import uuid
 from datetime import datetime
-from typing import Annotated, Optional
+from typing import Annotated, Awaitable, Callable, Optional
 
 from dotenv import load_dotenv
 from fastapi import APIRouter, Body, Depends, HTTPException, Path
-from google import genai
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
-from agents import PREDEFINED_AGENTS, get_agent, list_agents
+from agents import PREDEFINED_AGENTS, get_agent, get_chapter, get_corpus_text, list_agents
 from agents.pmp.knowledge_base.retrieval import format_exemplars, get_exemplars
 from db.dependency import get_current_user, get_db
 from db.models import Quiz, Subject, User
 from db.routers.subscription.subscription_router import verify_pro_access
+from generation_jobs import sse_event, sse_response
+from llm_gateway import generate_json
 from schemas import QuizResponse, SubjectResponse
 
 load_dotenv()
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
 
 DBSession = Annotated[Session, Depends(get_db)]
 CurrentUser = Annotated[User, Depends(get_current_user)]
@@ -58,18 +61,6 @@ def _resolve_agent(slug: str) -> dict:
     return agent
 
 
-def _extract_json(text: str) -> dict:
-    match = re.search(r"(\{.*\})", text, re.DOTALL)
-    clean = match.group(1) if match else text.strip()
-    if clean.startswith("```"):
-        clean = re.sub(r"^```(?:json)?\s*", "", clean)
-        clean = re.sub(r"\s*```$", "", clean)
-    try:
-        return json.loads(clean)
-    except json.JSONDecodeError as e:
-        raise ValueError(f"AI returned invalid JSON: {e}")
-
-
 def _get_or_create_subject(user: User, db: Session, agent: dict) -> Subject:
     """Find the user's predefined subject; create it if missing. Idempotent per user+slug."""
     subject = (
@@ -177,14 +168,8 @@ def _shuffle_quiz_options(quiz_content: dict, quiz_type: str) -> dict:
 
 
 async def _call_gemini(prompt: str) -> dict:
-    """Run a Gemini Flash-Lite call off the event loop and parse the JSON body."""
-    response = await asyncio.to_thread(
-        client.models.generate_content,
-        model="gemini-2.5-flash-lite",
-        contents=prompt,
-        config={"thinking_config": {"thinking_budget": 0}},
-    )
-    return _extract_json(response.text)
+    """One Gemini Flash-Lite call through the shared gateway, JSON-parsed."""
+    return await generate_json(prompt)
 
 
 async def _generate_single(
@@ -198,7 +183,7 @@ async def _generate_single(
 ) -> dict:
     """One Gemini call with the full focused prompt."""
     question_format, type_instruction = _build_type_strings(quiz_type, num_questions)
-    corpus_text = agent["build_corpus_text"](focus_chapters)
+    corpus_text = get_corpus_text(agent["slug"], focus_chapters)
     exemplars = get_exemplars(db, agent["slug"], focus_chapters, k=3)
     style_block = _build_style_block(exemplars)
 
@@ -251,6 +236,7 @@ async def _generate_chunked(
     agent: dict,
     quiz_type: str,
     num_questions: int,
+    on_chunk: Optional[Callable[[dict, list[dict]], Awaitable[None]]] = None,
 ) -> dict:
     """
     Generate per-chapter and merge, fanned out concurrently.
@@ -258,6 +244,9 @@ async def _generate_chunked(
     Each chapter's prompt is small (one chapter + 2 chapter-matched exemplars),
     so output token usage stays comfortably under Flash-Lite's cap regardless
     of total quiz size.
+
+    `on_chunk(chapter, questions)` is awaited as each chapter finishes, in
+    completion order; the merged result keeps chapter order.
     """
     chapters = agent["chapters"]
     n_ch = len(chapters)
@@ -269,7 +258,7 @@ async def _generate_chunked(
         if chunk_n == 0:
             return []
         question_format, type_instruction = _build_type_strings(quiz_type, chunk_n)
-        chunk_corpus = agent["build_corpus_text"]([chapter["slug"]])
+        chunk_corpus = get_corpus_text(agent["slug"], [chapter["slug"]])
         chunk_exemplars = get_exemplars(db, agent["slug"], [chapter["slug"]], k=2)
         chunk_style = _build_style_block(chunk_exemplars)
         chapter_name = chapter["name"]
@@ -309,6 +298,8 @@ Return this JSON — the "questions" array MUST have EXACTLY {chunk_n} objects:
                 f"Chapter '{chapter_name}': AI returned "
                 f"{len(chunk_questions)} questions instead of {chunk_n}."
             )
+        if on_chunk:
+            await on_chunk(chapter, chunk_questions)
         return chunk_questions
 
     results = await asyncio.gather(
@@ -388,16 +379,18 @@ class PredefinedQuizRequest(BaseModel):
     focus_chapters: Optional[list[str]] = None  # chapter slugs
 
 
-@router.post("/{slug}/quiz", response_model=QuizResponse, status_code=201)
-async def create_quiz(
-    db: DBSession,
-    current_user: CurrentUser,
-    payload: PredefinedQuizRequest = Body(...),
-    slug: str = Path(...),
-    _pro=Depends(verify_pro_access),
-):
-    """Generate a quiz grounded in the predefined corpus + exam-bank exemplars."""
-    agent = _resolve_agent(slug)
+ProgressEvent = Callable[[str, dict], Awaitable[None]]
+
+
+async def _generate_and_save_quiz(
+    db: Session,
+    user: User,
+    agent: dict,
+    payload: PredefinedQuizRequest,
+    emit: Optional[ProgressEvent] = None,
+) -> Quiz:
+    """Shared body of the plain and streaming quiz endpoints. `emit(event,
+    data)` receives progress / partial events as chapters finish."""
     quiz_type = payload.quiz_type or "single_choice"
 
     if payload.focus_chapters:
@@ -408,56 +401,149 @@ async def create_quiz(
     focus_names: list[str] = []
     if payload.focus_chapters:
         for ch_slug in payload.focus_chapters:
-            ch = agent["get_chapter_by_slug"](ch_slug)
+            ch = get_chapter(agent["slug"], ch_slug)
             if ch:
                 focus_names.append(ch["name"])
     allowed_topics = focus_names if focus_names else [c["name"] for c in agent["chapters"]]
 
-    subject = _get_or_create_subject(current_user, db, agent)
-
-    try:
-        if payload.focus_chapters:
-            quiz_content = await _generate_single(
-                db,
-                agent,
-                quiz_type,
-                num_questions,
-                allowed_topics,
-                focus_names,
-                payload.focus_chapters,
-            )
-        else:
-            quiz_content = await _generate_chunked(db, agent, quiz_type, num_questions)
-
-        quiz_content = _shuffle_quiz_options(quiz_content, quiz_type)
+    subject = _get_or_create_subject(user, db, agent)
 
-        default_title = (
-            f"{agent['name']} — {', '.join(focus_names[:2])}"
-            if focus_names
-            else f"{agent['name']} — Full Practice Quiz"
+    # Generation is ~90% of the bar; the DB write is the rest.
+    if payload.focus_chapters:
+        if emit:
+            await emit("progress", {"stage": "generate", "current": 0, "total": 1, "percent": 0})
+        quiz_content = await _generate_single(
+            db,
+            agent,
+            quiz_type,
+            num_questions,
+            allowed_topics,
+            focus_names,
+            payload.focus_chapters,
         )
+        if emit:
+            await emit("progress", {"stage": "generate", "current": 1, "total": 1, "percent": 90})
+    else:
+        on_chunk = None
+        if emit:
+            n_chapters = len(agent["chapters"])
+            finished = 0
+            await emit("progress", {"stage": "chapters", "current": 0, "total": n_chapters, "percent": 0})
+
+            async def report_chunk(chapter: dict, questions: list[dict]) -> None:
+                nonlocal finished
+                finished += 1
+                await emit("partial", {
+                    "chapter": chapter["slug"],
+                    "chapter_name": chapter["name"],
+                    "num_questions": len(questions),
+                })
+                await emit("progress", {
+                    "stage": "chapters",
+                    "current": finished,
+                    "total": n_chapters,
+                    "percent": 90 * finished // n_chapters,
+                })
+
+            on_chunk = report_chunk
+
+        quiz_content = await _generate_chunked(db, agent, quiz_type, num_questions, on_chunk)
+
+    quiz_content = _shuffle_quiz_options(quiz_content, quiz_type)
+
+    default_title = (
+        f"{agent['name']} — {', '.join(focus_names[:2])}"
+        if focus_names
+        else f"{agent['name']} — Full Practice Quiz"
+    )
+
+    if emit:
+        await emit("progress", {"stage": "persist", "current": 0, "total": 1, "percent": 90})
+    new_quiz = Quiz(
+        id=uuid.uuid4(),
+        user_id=user.id,
+        source_id=None,
+        subject_id=subject.id,
+        quiz_type=quiz_type,
+        title=payload.quiz_name or default_title,
+        num_questions=len(quiz_content.get("questions", [])),
+        time_limit=payload.time_limit,
+        content=quiz_content,
+        topics={
+            "primary_subject": agent["name"],
+            "topics": allowed_topics,
+        },
+        generation_date=datetime.utcnow(),
+    )
+    db.add(new_quiz)
+    db.commit()
+    db.refresh(new_quiz)
+    return new_quiz
 
-        new_quiz = Quiz(
-            id=uuid.uuid4(),
-            user_id=current_user.id,
-            source_id=None,
-            subject_id=subject.id,
-            quiz_type=quiz_type,
-            title=payload.quiz_name or default_title,
-            num_questions=len(quiz_content.get("questions", [])),
-            time_limit=payload.time_limit,
-            content=quiz_content,
-            topics={
-                "primary_subject": agent["name"],
-                "topics": allowed_topics,
-            },
-            generation_date=datetime.utcnow(),
-        )
-        db.add(new_quiz)
-        db.commit()
-        db.refresh(new_quiz)
-        return new_quiz
 
+@router.post("/{slug}/quiz", response_model=QuizResponse, status_code=201)
+async def create_quiz(
+    db: DBSession,
+    current_user: CurrentUser,
+    payload: PredefinedQuizRequest = Body(...),
+    slug: str = Path(...),
+    _pro=Depends(verify_pro_access),
+):
+    """Generate a quiz grounded in the predefined corpus + exam-bank exemplars."""
+    agent = _resolve_agent(slug)
+    try:
+        return await _generate_and_save_quiz(db, current_user, agent, payload)
+    except HTTPException:
+        # Gateway 503/504 (and friends) keep their status.
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(500, f"Error generating {agent['name']} quiz: {str(e)}")
+
+
+@router.post("/{slug}/quiz/stream")
+async def create_quiz_stream(
+    db: DBSession,
+    current_user: CurrentUser,
+    payload: PredefinedQuizRequest = Body(...),
+    slug: str = Path(...),
+    _pro=Depends(verify_pro_access),
+):
+    """Same as POST /{slug}/quiz, streamed as Server-Sent Events.
+
+    Auth, Pro access and the slug are checked before the stream opens, so
+    those failures are still plain HTTP errors. Generation failures arrive
+    as a `failed` event. If the client disconnects, the generation task is
+    cancelled with the stream.
+    """
+    agent = _resolve_agent(slug)
+    events: asyncio.Queue = asyncio.Queue()
+
+    async def emit(event: str, data: dict) -> None:
+        await events.put(sse_event(event, data))
+
+    async def frames():
+        task = asyncio.create_task(_generate_and_save_quiz(db, current_user, agent, payload, emit))
+        try:
+            while not (task.done() and events.empty()):
+                getter = asyncio.create_task(events.get())
+                await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+                if getter.done():
+                    yield getter.result()
+                else:
+                    getter.cancel()
+            try:
+                quiz = task.result()
+            except Exception as e:
+                db.rollback()
+                yield sse_event("failed", {
+                    "status": "failed",
+                    "error": e.detail if isinstance(e, HTTPException) else f"Error generating {agent['name']} quiz: {str(e)}",
+                })
+                return
+            yield sse_event("done", {"status": "succeeded", "quiz_id": str(quiz.id), "percent": 100})
+        finally:
+            task.cancel()
+
+    return sse_response(frames())
@@ -1,36 +1,23 @@
-import re
 from typing import Annotated, Optional
+import os
 import uuid
-import streamlit as st
-import fitz  # PyMuPDF
-import io
-from docx import Document as DocxDocument
-from pptx import Presentation
 from datetime import datetime
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from fastapi import APIRouter, Depends, File, Form, UploadFile, HTTPException
 from dotenv import load_dotenv
-from google import genai
 
 from db.routers.subscription.subscription_router import verify_pro_access
-from schemas import QuizResponse
-1
-import os
-import json
-# --- 1. CONFIGURATION AND API SETUP (from Step 2) ---
-load_dotenv()
-API_KEY = os.getenv("GEMINI_API_KEY")
+from document_extraction import ExtractionError, compress_text, extract_upload
+from llm_gateway import generate_json
+from schemas import QuizResponse, QuizSourceDetailResponse, QuizSourceResponse
 
-st.set_page_config(page_title="PDF to Quiz Builder", layout="wide")
+load_dotenv()
 
-try:
-    # Initialize the Gemini Client
-    client = genai.Client(api_key=API_KEY)
-except Exception as e:
-    st.error("🚨 Error: Gemini API client could not be initialized. Please check your GEMINI_API_KEY in the .env file.")
-    st.stop()
 from db.dependency import get_current_user, get_db
+from db.extraction_cache import extraction_cache
+from db import topic_stats
 from db.models import Quiz, QuizSource, User
+from db.source_texts import delete_source_text_if_unused, save_source_text
 
 DBSession = Annotated[Session, Depends(get_db)]
 CurrentUser = Annotated[User, Depends(get_current_user)]
@@ -110,46 +97,22 @@ async def create_quiz_from_file(
         file_display_name = source_obj.file_name
 
     elif file:
-        SUPPORTED_EXTENSIONS = {".pdf", ".docx", ".pptx", ".txt"}
         filename = file.filename or ""
         ext = os.path.splitext(filename)[1].lower()
 
-        if ext not in SUPPORTED_EXTENSIONS:
-            raise HTTPException(400, f"Unsupported file type '{ext}'. Supported: PDF, DOCX, PPTX, TXT.")
+        try:
+            # Spooled to disk and parsed in the extraction pool, so a large
+            # PDF doesn't hold the event loop (see document_extraction.py).
+            # Pages of a file uploaded before come from the extraction cache.
+            extracted_text = await extract_upload(
+                file, ext, start_page, end_page, cache=extraction_cache
+            )
+        except ExtractionError as e:
+            raise HTTPException(e.status_code, str(e))
+        except Exception as e:
+            raise HTTPException(400, f"File processing error: {e}")
 
         try:
-            file_content = await file.read()
-            extracted_text = ""
-
-            if ext == ".pdf":
-                with fitz.open(stream=file_content, filetype="pdf") as doc:
-                    total_pages = len(doc)
-                    s = start_page if start_page is not None else 1
-                    e = end_page if end_page is not None else total_pages
-                    if s < 1 or e > total_pages or s > e:
-                        raise HTTPException(400, f"Invalid page range. PDF has {total_pages} pages.")
-                    for page_num in range(s - 1, e):
-                        page = doc.load_page(page_num)
-                        extracted_text += page.get_text()
-
-            elif ext == ".docx":
-                doc = DocxDocument(io.BytesIO(file_content))
-                extracted_text = "\n".join(p.text for p in doc.paragraphs if p.text.strip())
-
-            elif ext == ".pptx":
-                prs = Presentation(io.BytesIO(file_content))
-                for slide in prs.slides:
-                    for shape in slide.shapes:
-                        if shape.has_text_frame:
-                            for paragraph in shape.text_frame.paragraphs:
-                                text = paragraph.text.strip()
-                                if text:
-                                    extracted_text += text + "\n"
-
-            elif ext == ".txt":
-                extracted_text = file_content.decode("utf-8", errors="ignore")
-
-            extracted_text = compress_text(extracted_text)
             if len(extracted_text) < 200:
                 raise HTTPException(400, "The file contains insufficient text content to generate a quiz.")
 
@@ -159,8 +122,10 @@ async def create_quiz_from_file(
                 subject_id=subject_id,
                 name=source_name.strip() if source_name else None,
                 file_name=file.filename,
-                extracted_text=extracted_text,
-                upload_date=datetime.utcnow()
+                text_hash=save_source_text(db, currentUser.id, extracted_text),
+                upload_date=datetime.utcnow(),
+                start_page=start_page if ext == ".pdf" else None,
+                end_page=end_page if ext == ".pdf" else None,
             )
             db.add(new_source)
             db.flush()
@@ -222,14 +187,8 @@ Text to analyze:
 ---
 """
 
-        response = client.models.generate_content(
-            model="gemini-2.5-flash-lite",
-            contents=prompt,
-            config={"thinking_config": {"thinking_budget": 0}},
-        )
-
-        # 3. PARSE AI OUTPUT (Using your helper function)
-        quiz_content = extract_json_from_llm(response.text)
+        # 3. GENERATE + PARSE AI OUTPUT (off the event loop, see llm_gateway.py)
+        quiz_content = await generate_json(prompt)
 
         # 4. ENFORCE QUESTION COUNT
         questions = quiz_content.get("questions", [])
@@ -271,6 +230,9 @@ Text to analyze:
         db.refresh(new_quiz)
         return new_quiz
 
+    except HTTPException:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(500, f"Error generating or saving quiz: {str(e)}")
@@ -365,13 +327,7 @@ Text to use:
 """
 
     try:
-        response = client.models.generate_content(
-            model="gemini-2.5-flash-lite",
-            contents=prompt,
-            config={"thinking_config": {"thinking_budget": 0}},
-        )
-
-        quiz_content = extract_json_from_llm(response.text)
+        quiz_content = await generate_json(prompt)
 
         questions = quiz_content.get("questions", [])
         if len(questions) > num_questions:
@@ -400,13 +356,16 @@ Text to use:
         db.refresh(new_quiz)
         return new_quiz
 
+    except HTTPException:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(500, f"Error generating focused quiz: {str(e)}")
 
 
 
-@router.get("/sources")
+@router.get("/sources", response_model=list[QuizSourceResponse])
 async def get_quiz_sources(
     db: db_dep,
     current_user: CurrentUser,
@@ -418,7 +377,25 @@ async def get_quiz_sources(
         .all()
     )
     return sources
-    
+
+
+@router.get("/sources/{source_id}", response_model=QuizSourceDetailResponse)
+async def get_quiz_source(
+    db: db_dep,
+    current_user: CurrentUser,
+    source_id: uuid.UUID,
+):
+    """One source with its extracted text (listings leave the text out)."""
+    source = (
+        db.query(QuizSource)
+        .options(joinedload(QuizSource.stored_text))
+        .filter(QuizSource.id == source_id, QuizSource.user_id == current_user.id)
+        .first()
+    )
+    if not source:
+        raise HTTPException(status_code=404, detail="Quiz Source not found")
+    return source
+
 
 @router.delete("/sources/{source_id}", status_code=204)
 async def delete_quiz_source(
@@ -434,38 +411,12 @@ async def delete_quiz_source(
     if not source:
         raise HTTPException(status_code=404, detail="Quiz Source not found")
 
+    topic_stats.forget_quizzes(db, source_id=source.id)
     db.delete(source)
+    db.flush()
+    delete_source_text_if_unused(db, source.user_id, source.text_hash)
     db.commit()
     return {
         "status": "success",
         "message": f"Source {source_id} and all associated quizzes deleted."
     }
-
-
-def compress_text(text: str, max_chars: int = 40_000) -> str:
-    """Normalize whitespace and cap text length to reduce token usage."""
-    # Collapse runs of whitespace/newlines to at most 2 newlines
-    text = re.sub(r'\n{3,}', '\n\n', text)
-    text = re.sub(r'[ \t]{2,}', ' ', text)
-    text = text.strip()
-    if len(text) > max_chars:
-        text = text[:max_chars]
-    return text
-
-
-def extract_json_from_llm(text: str) -> dict:
-    # Use regex for more robust extraction in case Gemini adds text outside fences
-    match = re.search(r"(\{.*\})", text, re.DOTALL)
-    if match:
-        clean_text = match.group(1)
-    else:
-        # Fallback to standard cleaning
-        clean_text = text.strip()
-        if clean_text.startswith("```"):
-            clean_text = re.sub(r"^```(?:json)?\s*", "", clean_text)
-            clean_text = re.sub(r"\s*```$", "", clean_text)
-    
-    try:
-        return json.loads(clean_text)
-    except json.JSONDecodeError as e:
-        raise ValueError(f"AI returned invalid JSON: {e}")
\ No newline at end of file
@@ -1,20 +1,22 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Annotated
 import uuid
-import streamlit as st
-from sqlalchemy.orm import Session
-from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import func
+from sqlalchemy.orm import Session, defer, undefer
+from fastapi import APIRouter, Depends, HTTPException, Response
 from dotenv import load_dotenv
 
-from schemas import QuizResponse, QuizSubmission
+from schemas import QuizResponse, QuizSubmission, QuizSummaryResponse
 
 
 load_dotenv()
 
-st.set_page_config(page_title="PDF to Quiz Builder", layout="wide")
-
 from db.dependency import get_current_user, get_db
-from db.models import Quiz, QuizResult, User
+from db import topic_stats
+from db.scoring import quiz_answer_key, score_answer_key
+from db.models import Quiz, QuizResult, User, UserTopicStat
+from db.routers.pagination import Page, paginate
+from db.routers.util import quiz_summary_only
 
 DBSession = Annotated[Session, Depends(get_db)]
 CurrentUser = Annotated[User, Depends(get_current_user)]
@@ -27,30 +29,33 @@ router = APIRouter(
 
 # ── Static routes MUST come before /{quiz_id} ────────────────────────────────
 
-@router.get("/my_quizzes", response_model=list[QuizResponse])
+@router.get("/my_quizzes", response_model=list[QuizSummaryResponse])
 async def get_my_quizzes(
     db: db_dep,
     current_user: CurrentUser,
+    page: Page,
+    response: Response,
 ):
-    quizzes = (
-        db.query(Quiz)
-        .filter(Quiz.user_id == current_user.id)
-        .order_by(Quiz.generation_date.desc())
-        .all()
+    query = db.query(Quiz).options(quiz_summary_only()).filter(Quiz.user_id == current_user.id)
+    return paginate(
+        query, page, response, timestamp=Quiz.generation_date, id_column=Quiz.id, scope="my_quizzes"
     )
-    return quizzes
 
 
 @router.get("/my_results")
 async def get_my_results(
     db: db_dep,
-    currentUser: CurrentUser
+    currentUser: CurrentUser,
+    page: Page,
+    response: Response,
 ):
-    results = (
-        db.query(QuizResult)
-        .filter(QuizResult.user_id == currentUser.id)
-        .order_by(QuizResult.attempt_date.desc())
-        .all()
+    results = paginate(
+        db.query(QuizResult).filter(QuizResult.user_id == currentUser.id),
+        page,
+        response,
+        timestamp=QuizResult.attempt_date,
+        id_column=QuizResult.id,
+        scope="my_results",
     )
     return [
         {
@@ -66,45 +71,54 @@ async def get_my_results(
     ]
 
 
+@router.get("/stats")
+async def get_my_stats(
+    db: db_dep,
+    currentUser: CurrentUser,
+):
+    # Totals over the whole history for the dashboard cards; the listings
+    # above only ever return a page.
+    total_quizzes = db.query(func.count(Quiz.id)).filter(Quiz.user_id == currentUser.id).scalar()
+    total_results, average = (
+        db.query(func.count(QuizResult.id), func.avg(QuizResult.score_percentage))
+        .filter(QuizResult.user_id == currentUser.id)
+        .one()
+    )
+    return {
+        "total_quizzes": total_quizzes,
+        "total_results": total_results,
+        "average_score": round(float(average), 2) if average is not None else None,
+    }
+
+
 @router.get("/performance/by-topic")
 async def get_performance_by_topic(
     db: db_dep,
     currentUser: CurrentUser
 ):
-    results = (
-        db.query(QuizResult)
-        .join(Quiz)
-        .filter(QuizResult.user_id == currentUser.id)
+    rows = (
+        db.query(UserTopicStat.topic, UserTopicStat.total, UserTopicStat.correct)
+        .filter(UserTopicStat.user_id == currentUser.id)
         .all()
     )
 
-    topic_stats = {}
-
-    for result in results:
-        quiz = result.quiz
-        if not quiz.content.get("questions"):
-            continue
-
-        for answer in result.user_answers:
-            topic = answer.get("topic", "Unknown")
-            if topic not in topic_stats:
-                topic_stats[topic] = {"total": 0, "correct": 0, "accuracy": 0}
-            topic_stats[topic]["total"] += 1
-            if answer.get("is_correct"):
-                topic_stats[topic]["correct"] += 1
-
-    for topic, stats in topic_stats.items():
-        if stats["total"] > 0:
-            stats["accuracy"] = round((stats["correct"] / stats["total"]) * 100, 2)
+    stats_by_topic = {
+        topic: {
+            "total": total,
+            "correct": correct,
+            "accuracy": round((correct / total) * 100, 2) if total > 0 else 0,
+        }
+        for topic, total, correct in rows
+    }
 
     weak_topics = [
         {"topic": topic, **stats}
-        for topic, stats in topic_stats.items()
+        for topic, stats in stats_by_topic.items()
         if stats["accuracy"] < 70.0 and stats["total"] >= 3
     ]
 
     return {
-        "all_topics": topic_stats,
+        "all_topics": stats_by_topic,
         "weak_topics": sorted(weak_topics, key=lambda x: x["accuracy"])
     }
 
@@ -115,15 +129,18 @@ async def submit(
     db: db_dep,
     currentUser: CurrentUser
 ):
-    quiz = db.query(Quiz).filter(Quiz.id == submission.quiz_id).first()
+    # The compiled answer key is all scoring needs; `content` (passages,
+    # scripts, ...) is only loaded for quizzes that predate it.
+    quiz = (
+        db.query(Quiz)
+        .options(defer(Quiz.content), undefer(Quiz.answer_key))
+        .filter(Quiz.id == submission.quiz_id)
+        .first()
+    )
     if not quiz:
         raise HTTPException(status_code=404, detail="Quiz not found")
 
-    score_pct, breakdown = calculate_quiz_score(
-        quiz.content,
-        quiz.quiz_type,
-        submission.answers
-    )
+    score_pct, breakdown = score_answer_key(quiz_answer_key(quiz), submission.answers)
 
     ended_at = datetime.utcnow()
     started_at = submission.started_at.replace(tzinfo=None) if submission.started_at else None
@@ -148,6 +165,9 @@ async def submit(
     )
 
     db.add(new_result)
+    topic_stats.record_result(
+        db, currentUser.id, quiz.id, breakdown, ended_at.replace(tzinfo=timezone.utc)
+    )
     db.commit()
     db.refresh(new_result)
 
@@ -163,18 +183,22 @@ async def submit(
 async def get_quiz_results(
     quiz_id: uuid.UUID,
     db: db_dep,
-    currentUser: CurrentUser
+    currentUser: CurrentUser,
+    page: Page,
+    response: Response,
 ):
-    results = (
-        db.query(QuizResult)
-        .filter(
-            QuizResult.quiz_id == quiz_id,
-            QuizResult.user_id == currentUser.id
-        )
-        .order_by(QuizResult.attempt_date.desc())
-        .all()
+    query = db.query(QuizResult).filter(
+        QuizResult.quiz_id == quiz_id,
+        QuizResult.user_id == currentUser.id
+    )
+    return paginate(
+        query,
+        page,
+        response,
+        timestamp=QuizResult.attempt_date,
+        id_column=QuizResult.id,
+        scope=f"results:{quiz_id}",
     )
-    return results if results else []
 
 
 @router.get("/result/{result_id}/review")
@@ -247,73 +271,6 @@ async def delete_quiz(
     quiz = db.query(Quiz).filter(Quiz.id == quiz_id).first()
     if not quiz:
         raise HTTPException(status_code=404, detail="Quiz not found")
+    topic_stats.forget_quizzes(db, [quiz.id])
     db.delete(quiz)
     db.commit()
-
-
-# ── Scoring helper ────────────────────────────────────────────────────────────
-
-def calculate_quiz_score(quiz_content: dict, quiz_type: str, user_answers: list):
-    """Score a quiz attempt.
-
-    Dispatches per-question on `question_type` when present (mixed-type quizzes
-    like B1 Lesen, where Teil 3 uses letter_matching but other Teile use
-    single_choice / true_false). Falls back to the legacy `quiz_type` argument
-    for older quizzes that have no per-question type tag.
-    """
-    questions = quiz_content.get("questions", [])
-    total_questions = len(questions)
-    correct_count = 0
-    detailed_results = []
-
-    user_map = {a.question_index: a.selected_options for a in user_answers}
-
-    for i, q in enumerate(questions):
-        user_choice = user_map.get(i)
-        is_correct = False
-        # Per-question type wins over the quiz-level type so a mixed quiz
-        # (Lesen) can score each item with its own logic.
-        per_q_type = q.get("question_type") or quiz_type
-        correct_answer_for_review: object = None
-
-        if per_q_type == "multiple_select":
-            correct_indices = q.get("correct_option_indices", [])
-            if isinstance(user_choice, list):
-                if set(user_choice) == set(correct_indices):
-                    is_correct = True
-            correct_answer_for_review = correct_indices
-        elif per_q_type == "letter_matching":
-            # User submits a single character ('a'–'j' or '0'). Compare
-            # case-insensitively and trim — the input field is lenient about
-            # whitespace + case.
-            correct_letter = (q.get("correct_letter") or "").lower().strip()
-            user_letter = (user_choice or "")
-            if isinstance(user_letter, str):
-                user_letter = user_letter.lower().strip()
-            else:
-                user_letter = ""
-            if user_letter and user_letter == correct_letter:
-                is_correct = True
-            correct_answer_for_review = correct_letter
-        else:
-            # single_choice, true_false, true_false_ja_nein — index match
-            correct_index = q.get("correct_option_index")
-            if user_choice == correct_index:
-                is_correct = True
-            correct_answer_for_review = correct_index
-
-        if is_correct:
-            correct_count += 1
-
-        detailed_results.append({
-            "question_index": i,
-            "topic": q.get("topic", "Unknown"),
-            "question_type": per_q_type,
-            "is_correct": is_correct,
-            "user_choice": user_choice,
-            "correct_answer": correct_answer_for_review,
-            "explanation": q.get("explanation", "")
-        })
-
-    score_pct = (correct_count / total_questions * 100) if total_questions > 0 else 0
-    return round(score_pct, 2), detailed_results
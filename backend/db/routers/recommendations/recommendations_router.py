@@ -2,27 +2,28 @@
 Recommendation endpoints driven by the user's quiz history.
 
 Behavior signal: every QuizResult.user_answers item carries a `topic` and
-`is_correct` flag. We aggregate per-topic stats across all of a user's
-results and surface the topics with the lowest accuracy as practice targets.
+`is_correct` flag. Per-topic totals across all of a user's results are kept
+in `user_topic_stats` (db/topic_stats.py); the topics with the lowest
+accuracy are surfaced as practice targets.
 """
 
 from typing import Annotated
 
 from fastapi import APIRouter, Depends
+from sqlalchemy import Float, cast
 from sqlalchemy.orm import Session
 
-from agents import PREDEFINED_AGENTS
+from agents import find_chapter_by_name
 from db.dependency import get_current_user, get_db
-from db.models import Quiz, QuizResult, QuizSource, Subject, User
+from db.models import Quiz, QuizSource, Subject, User, UserTopicStat
 
 
 def _resolve_predefined_origin(topic: str) -> tuple[str | None, str | None]:
     """If `topic` matches a chapter name in any registered agent, return (slug, chapter_slug)."""
-    for agent in PREDEFINED_AGENTS.values():
-        for ch in agent["chapters"]:
-            if ch["name"] == topic:
-                return agent["slug"], ch["slug"]
-    return None, None
+    agent_slug, chapter = find_chapter_by_name(topic)
+    if chapter is None:
+        return None, None
+    return agent_slug, chapter["slug"]
 
 DBSession = Annotated[Session, Depends(get_db)]
 CurrentUser = Annotated[User, Depends(get_current_user)]
@@ -30,24 +31,6 @@ CurrentUser = Annotated[User, Depends(get_current_user)]
 router = APIRouter(prefix="/recommendations", tags=["recommendations"])
 
 
-def _aggregate_topic_stats(results: list[QuizResult]) -> dict:
-    """topic -> {total, correct, quiz_ids: set}"""
-    stats: dict[str, dict] = {}
-    for r in results:
-        for ans in (r.user_answers or []):
-            topic = (ans.get("topic") or "Unknown").strip()
-            if not topic:
-                continue
-            entry = stats.setdefault(
-                topic, {"total": 0, "correct": 0, "quiz_ids": set()}
-            )
-            entry["total"] += 1
-            if ans.get("is_correct"):
-                entry["correct"] += 1
-            entry["quiz_ids"].add(str(r.quiz_id))
-    return stats
-
-
 @router.get("/weak-topics")
 async def get_weak_topics(
     db: DBSession,
@@ -70,10 +53,25 @@ async def get_weak_topics(
       - source_id / source_name when the topic appears in a quiz tied to a source
       - chapter_slug for PMP topics (so the frontend can deep-link to a focused PMP quiz)
     """
-    results = (
-        db.query(QuizResult).filter(QuizResult.user_id == current_user.id).all()
+    # Worst `limit` topics straight from the per-topic totals (db/topic_stats.py).
+    rows = (
+        db.query(UserTopicStat)
+        .filter(
+            UserTopicStat.user_id == current_user.id,
+            UserTopicStat.total >= max(min_attempts, 1),
+            UserTopicStat.correct < accuracy_threshold * UserTopicStat.total,
+        )
+        .order_by(
+            (cast(UserTopicStat.correct, Float) / UserTopicStat.total).asc(),
+            UserTopicStat.topic,
+        )
+        .limit(limit)
+        .all()
     )
-    stats = _aggregate_topic_stats(results)
+    stats = {
+        r.topic: {"total": r.total, "correct": r.correct, "quiz_ids": set(r.quiz_ids or [])}
+        for r in rows
+    }
 
     # Pre-load quiz/source/subject lookups in two queries to avoid N+1
     all_quiz_ids = {qid for entry in stats.values() for qid in entry["quiz_ids"]}
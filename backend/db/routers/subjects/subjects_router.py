@@ -1,20 +1,23 @@
 import re
-import os
-import json
 import uuid
 from datetime import datetime
 from typing import Annotated, Optional
 
-from fastapi import APIRouter, Body, Depends, Form, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Body, Depends, Form, HTTPException, Response
+from sqlalchemy import and_, case, func, literal, or_, select, true
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Query, Session, joinedload
 from dotenv import load_dotenv
-from google import genai
 
 from db.dependency import get_current_user, get_db
 from db.models import Quiz, QuizResult, QuizSource, Subject, User
 from db.routers.subscription.subscription_router import verify_pro_access
+from db.routers.pagination import Page, paginate
+from db.routers.util import latest_results, quiz_summary_only
+from llm_gateway import generate_json
 from schemas import (
     QuizResponse,
+    QuizSourceResponse,
     SubjectCreate,
     SubjectDetailResponse,
     SubjectResponse,
@@ -22,7 +25,6 @@ from schemas import (
 )
 
 load_dotenv()
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
 
 DBSession = Annotated[Session, Depends(get_db)]
 CurrentUser = Annotated[User, Depends(get_current_user)]
@@ -43,16 +45,58 @@ def _get_subject_or_404(subject_id: uuid.UUID, user_id, db: Session) -> Subject:
     return subject
 
 
-def _extract_json(text: str) -> dict:
-    match = re.search(r"(\{.*\})", text, re.DOTALL)
-    clean = match.group(1) if match else text.strip()
-    if clean.startswith("```"):
-        clean = re.sub(r"^```(?:json)?\s*", "", clean)
-        clean = re.sub(r"\s*```$", "", clean)
-    try:
-        return json.loads(clean)
-    except json.JSONDecodeError as e:
-        raise ValueError(f"AI returned invalid JSON: {e}")
+def _subjects_with_counts(db: Session, user_id) -> Query:
+    """(Subject, source_count, quiz_count) rows for `user_id`'s subjects in one
+    statement. quiz_count is quizzes attached to the subject directly plus
+    quizzes generated from the subject's sources."""
+    source_count = (
+        select(func.count(QuizSource.id))
+        .where(QuizSource.subject_id == Subject.id)
+        .scalar_subquery()
+    )
+    direct_quizzes = (
+        select(func.count(Quiz.id))
+        .where(Quiz.subject_id == Subject.id)
+        .scalar_subquery()
+    )
+    source_quizzes = (
+        select(func.count(Quiz.id))
+        .join(QuizSource, Quiz.source_id == QuizSource.id)
+        .where(QuizSource.subject_id == Subject.id)
+        .scalar_subquery()
+    )
+    return db.query(
+        Subject,
+        source_count.label("source_count"),
+        (direct_quizzes + source_quizzes).label("quiz_count"),
+    ).filter(Subject.user_id == user_id)
+
+
+def _in_subject(subject_id: uuid.UUID, user_id):
+    """Filter for the subject's quizzes: subject-wide ones (source_id NULL)
+    and those generated from the subject's sources."""
+    subject_source_ids = select(QuizSource.id).where(
+        QuizSource.subject_id == subject_id,
+        QuizSource.user_id == user_id,
+    )
+    return and_(
+        Quiz.user_id == user_id,
+        or_(
+            and_(Quiz.subject_id == subject_id, Quiz.source_id.is_(None)),
+            Quiz.source_id.in_(subject_source_ids),
+        ),
+    )
+
+
+def _subject_detail(subject: Subject, source_count: int, quiz_count: int) -> SubjectDetailResponse:
+    return SubjectDetailResponse(
+        id=subject.id,
+        name=subject.name,
+        color=subject.color,
+        created_at=subject.created_at,
+        source_count=source_count,
+        quiz_count=quiz_count,
+    )
 
 
 # ── CRUD ─────────────────────────────────────────────────────────────────────
@@ -77,29 +121,12 @@ async def create_subject(
 
 @router.get("", response_model=list[SubjectDetailResponse])
 async def list_subjects(db: db_dep, current_user: CurrentUser):
-    subjects = (
-        db.query(Subject)
-        .filter(Subject.user_id == current_user.id)
+    rows = (
+        _subjects_with_counts(db, current_user.id)
         .order_by(Subject.created_at.desc())
         .all()
     )
-    result = []
-    for s in subjects:
-        source_count = db.query(QuizSource).filter(QuizSource.subject_id == s.id).count()
-        quiz_count = db.query(Quiz).filter(Quiz.subject_id == s.id).count()
-        # source-level quizzes
-        source_ids = [src.id for src in db.query(QuizSource.id).filter(QuizSource.subject_id == s.id)]
-        if source_ids:
-            quiz_count += db.query(Quiz).filter(Quiz.source_id.in_(source_ids)).count()
-        result.append(SubjectDetailResponse(
-            id=s.id,
-            name=s.name,
-            color=s.color,
-            created_at=s.created_at,
-            source_count=source_count,
-            quiz_count=quiz_count,
-        ))
-    return result
+    return [_subject_detail(*row) for row in rows]
 
 
 @router.get("/{subject_id}", response_model=SubjectDetailResponse)
@@ -108,20 +135,10 @@ async def get_subject(
     db: db_dep,
     current_user: CurrentUser,
 ):
-    s = _get_subject_or_404(subject_id, current_user.id, db)
-    source_count = db.query(QuizSource).filter(QuizSource.subject_id == s.id).count()
-    source_ids = [src.id for src in db.query(QuizSource.id).filter(QuizSource.subject_id == s.id)]
-    quiz_count = db.query(Quiz).filter(Quiz.subject_id == s.id).count()
-    if source_ids:
-        quiz_count += db.query(Quiz).filter(Quiz.source_id.in_(source_ids)).count()
-    return SubjectDetailResponse(
-        id=s.id,
-        name=s.name,
-        color=s.color,
-        created_at=s.created_at,
-        source_count=source_count,
-        quiz_count=quiz_count,
-    )
+    row = _subjects_with_counts(db, current_user.id).filter(Subject.id == subject_id).first()
+    if not row:
+        raise HTTPException(404, "Subject not found")
+    return _subject_detail(*row)
 
 
 @router.patch("/{subject_id}", response_model=SubjectResponse)
@@ -154,7 +171,7 @@ async def delete_subject(
 
 # ── Sources & Quizzes within a subject ───────────────────────────────────────
 
-@router.get("/{subject_id}/sources")
+@router.get("/{subject_id}/sources", response_model=list[QuizSourceResponse])
 async def list_subject_sources(
     subject_id: uuid.UUID,
     db: db_dep,
@@ -178,58 +195,24 @@ async def list_subject_quizzes(
     subject_id: uuid.UUID,
     db: db_dep,
     current_user: CurrentUser,
+    page: Page,
+    response: Response,
 ):
     _get_subject_or_404(subject_id, current_user.id, db)
 
-    # Subject-wide quizzes only (source_id must be NULL)
-    subject_quizzes = (
+    query = (
         db.query(Quiz)
-        .filter(
-            Quiz.subject_id == subject_id,
-            Quiz.source_id.is_(None),
-            Quiz.user_id == current_user.id,
-        )
-        .all()
+        .options(quiz_summary_only())
+        .filter(_in_subject(subject_id, current_user.id))
+    )
+    all_quizzes = paginate(
+        query, page, response, timestamp=Quiz.generation_date, id_column=Quiz.id, scope=f"subject:{subject_id}"
     )
 
-    # Source-level quizzes belonging to this subject's sources
-    source_ids = [
-        src.id
-        for src in db.query(QuizSource.id).filter(
-            QuizSource.subject_id == subject_id,
-            QuizSource.user_id == current_user.id,
-        )
-    ]
-    source_quizzes = []
-    if source_ids:
-        source_quizzes = (
-            db.query(Quiz)
-            .filter(Quiz.source_id.in_(source_ids), Quiz.user_id == current_user.id)
-            .order_by(Quiz.generation_date.desc())
-            .all()
-        )
-
-    all_quizzes = subject_quizzes + source_quizzes
-
-    # Fetch latest result (score + id) per quiz in one query
-    quiz_ids = [q.id for q in all_quizzes]
-    latest_scores: dict[str, float] = {}
-    latest_result_ids: dict[str, str] = {}
-    if quiz_ids:
-        results = (
-            db.query(QuizResult)
-            .filter(
-                QuizResult.quiz_id.in_(quiz_ids),
-                QuizResult.user_id == current_user.id,
-            )
-            .order_by(QuizResult.attempt_date.desc())
-            .all()
-        )
-        for r in results:
-            key = str(r.quiz_id)
-            if key not in latest_scores:
-                latest_scores[key] = float(r.score_percentage)
-                latest_result_ids[key] = str(r.id)
+    # Latest result (score + id) per quiz on this page, in one query
+    latest = latest_results(db, current_user.id, (q.id for q in all_quizzes))
+    latest_scores = {str(quiz_id): float(r.score_percentage) for quiz_id, r in latest.items()}
+    latest_result_ids = {str(quiz_id): str(r.id) for quiz_id, r in latest.items()}
 
     return [
         {
@@ -248,6 +231,89 @@ async def list_subject_quizzes(
     ]
 
 
+@router.get("/{subject_id}/performance")
+async def subject_performance(
+    subject_id: uuid.UUID,
+    db: db_dep,
+    current_user: CurrentUser,
+):
+    """Aggregates over all of the subject's quizzes, per source (source_id
+    null for the subject-wide quizzes): the quiz count, how many have been
+    taken and the mean of their latest scores, and answer totals per topic
+    across every attempt. The subject page reads its averages and weak
+    topics from here, since /quizzes only returns a page."""
+    _get_subject_or_404(subject_id, current_user.id, db)
+    in_subject = _in_subject(subject_id, current_user.id)
+
+    latest = (
+        select(QuizResult.quiz_id, QuizResult.score_percentage)
+        .join(Quiz, Quiz.id == QuizResult.quiz_id)
+        .where(QuizResult.user_id == current_user.id, in_subject)
+        .distinct(QuizResult.quiz_id)
+        .order_by(QuizResult.quiz_id, QuizResult.attempt_date.desc(), QuizResult.id.desc())
+        .subquery()
+    )
+    quiz_rows = (
+        db.query(
+            Quiz.source_id,
+            func.count(Quiz.id),
+            func.count(latest.c.quiz_id),
+            func.avg(latest.c.score_percentage),
+        )
+        .outerjoin(latest, latest.c.quiz_id == Quiz.id)
+        .filter(in_subject)
+        .group_by(Quiz.source_id)
+        .all()
+    )
+
+    # Topics normalised as in db/topic_stats.py.
+    answers = func.jsonb_array_elements(
+        case(
+            (func.jsonb_typeof(QuizResult.user_answers) == "array", QuizResult.user_answers),
+            else_=literal([], JSONB),
+        )
+    ).table_valued("value").lateral("answer")
+    topic = func.btrim(func.coalesce(func.nullif(answers.c.value.op("->>")("topic"), ""), "Unknown")).label("topic")
+    topic_rows = (
+        db.query(
+            Quiz.source_id,
+            topic,
+            func.count(),
+            func.count().filter(answers.c.value.op("->")("is_correct") == literal(True, JSONB)),
+        )
+        .select_from(QuizResult)
+        .join(Quiz, Quiz.id == QuizResult.quiz_id)
+        .join(answers, true())
+        .filter(QuizResult.user_id == current_user.id, in_subject)
+        .group_by(Quiz.source_id, topic)
+        .all()
+    )
+
+    sources: dict[Optional[str], dict] = {}
+
+    def entry(source_id) -> dict:
+        key = str(source_id) if source_id else None
+        return sources.setdefault(
+            key, {"quiz_count": 0, "taken_count": 0, "average_score": None, "topics": {}}
+        )
+
+    for source_id, quiz_count, taken_count, average in quiz_rows:
+        entry(source_id).update(
+            quiz_count=quiz_count,
+            taken_count=taken_count,
+            average_score=round(float(average), 2) if average is not None else None,
+        )
+    for source_id, name, total, correct in topic_rows:
+        if name:
+            entry(source_id)["topics"][name] = {
+                "total": total,
+                "correct": correct,
+                "accuracy": round((correct / total) * 100, 2) if total > 0 else 0,
+            }
+
+    return [{"source_id": key, **stats} for key, stats in sources.items()]
+
+
 # ── Subject-wide quiz generation ─────────────────────────────────────────────
 
 @router.post("/{subject_id}/quiz", response_model=QuizResponse, status_code=201)
@@ -266,6 +332,7 @@ async def create_subject_quiz(
 
     sources = (
         db.query(QuizSource)
+        .options(joinedload(QuizSource.stored_text))
         .filter(
             QuizSource.subject_id == subject_id,
             QuizSource.user_id == current_user.id,
@@ -348,12 +415,7 @@ Text to analyze:
 """
 
     try:
-        response = client.models.generate_content(
-            model="gemini-2.5-flash-lite",
-            contents=prompt,
-            config={"thinking_config": {"thinking_budget": 0}},
-        )
-        quiz_content = _extract_json(response.text)
+        quiz_content = await generate_json(prompt)
 
         questions = quiz_content.get("questions", [])
         if len(questions) > num_questions:
@@ -383,6 +445,9 @@ Text to analyze:
         db.refresh(new_quiz)
         return new_quiz
 
+    except HTTPException:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(500, f"Error generating subject quiz: {str(e)}")
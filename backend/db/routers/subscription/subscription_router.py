@@ -5,6 +5,7 @@ from sqlalchemy.orm import Session
 import stripe
 from db.database import SessionLocal
 from schemas import CheckoutRequest
+from db.auth_cache import invalidate_user
 from db.dependency import get_current_user, get_db
 from db.models import User, Subscription
 from datetime import datetime
@@ -219,6 +220,8 @@ async def handle_webhook(request: Request, stripe_signature: str = Header(None))
                     print(f"Error fetching Stripe subscription: {stripe_error}")
                 
                 db.commit()
+                # Drop any cached auth snapshot so the next request sees is_pro.
+                invalidate_user(user.id)
                 print(f"Database Updated: {customer_email} is now a Pro member. Subscription ends at {ends_at}.")
             else:
                 print(f"Webhook Error: User with email {customer_email} not found.")
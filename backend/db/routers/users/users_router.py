@@ -9,6 +9,7 @@ from dateutil.relativedelta import relativedelta
 from fastapi import Response
 from db.models import User, Subscription
 from schemas import UserAdminResponse, UserResponse, UserUpdate
+from db.auth_cache import invalidate_user
 from db.dependency import get_db, get_current_user
 from db.routers.util import build_user_response
 from security import hash_password
@@ -78,6 +79,7 @@ def get_my_profile(current_user: CurrentUser, db: DBSession, sync: bool = Query(
                         ))
                     db.commit()
                     db.refresh(current_user)
+                    invalidate_user(current_user.id)
         except Exception as e:
             import traceback
             print(f"Stripe sync failed: {e}")
@@ -99,6 +101,7 @@ def update_my_profile(
 
     db.commit()
     db.refresh(current_user)
+    invalidate_user(current_user.id)
     return current_user
 
 
@@ -127,8 +130,10 @@ def delete_my_account(
         except Exception as e:
             print(f"[delete_my_account] Stripe lookup failed: {e}")
 
+    user_id = current_user.id
     db.delete(current_user)
     db.commit()
+    invalidate_user(user_id)
 
     response.delete_cookie(key="auth_token", path="/", domain=COOKIE_DOMAIN)
     response.delete_cookie(key="refresh_token", path="/auth/refresh", domain=COOKIE_DOMAIN)
@@ -1,5 +1,9 @@
 from datetime import datetime, timedelta, timezone
-from db.models import User
+from typing import Iterable, Optional
+from uuid import UUID
+from sqlalchemy import case, func
+from sqlalchemy.orm import load_only
+from db.models import Quiz, QuizResult, User
 from db.routers.subscription.subscription_router import TRIAL_QUIZ_LIMIT
 
 def get_subscription_status(user: User) -> dict:
@@ -82,16 +86,24 @@ def get_subscription_status(user: User) -> dict:
         "trial_ends": trial_limit
     }
 
-def build_user_response(user: User, db_session=None) -> dict:
+def build_user_response(
+    user: User,
+    db_session=None,
+    *,
+    quizzes_count: Optional[int] = None,
+    sources_count: Optional[int] = None,
+) -> dict:
+    """Counts passed in (e.g. from the admin listing's aggregate query) are
+    used as-is; otherwise they're counted with `db_session`, or left at 0."""
     # Get the detailed subscription status
     sub_data = get_subscription_status(user)
     
-    quizzes_count = 0
-    sources_count = 0
-    if db_session:
-        from db.models import Quiz, QuizSource
-        quizzes_count = db_session.query(Quiz).filter(Quiz.user_id == user.id).count()
-        sources_count = db_session.query(QuizSource).filter(QuizSource.user_id == user.id).count()
+    if quizzes_count is None or sources_count is None:
+        quizzes_count = sources_count = 0
+        if db_session:
+            from db.models import Quiz, QuizSource
+            quizzes_count = db_session.query(Quiz).filter(Quiz.user_id == user.id).count()
+            sources_count = db_session.query(QuizSource).filter(QuizSource.user_id == user.id).count()
     
     # Create subscription info object with trial_ends_at and status_label moved inside
     subscription_info = {
@@ -116,4 +128,44 @@ def build_user_response(user: User, db_session=None) -> dict:
         "quizzes_count": quizzes_count,
         "sources_count": sources_count,
         "subscription": subscription_info
-    }
\ No newline at end of file
+    }
+
+
+def quiz_summary_only():
+    """Loader option for quiz listings: the columns of QuizSummaryResponse,
+    leaving `content` (passages, scripts, every question) unloaded."""
+    return load_only(
+        Quiz.id,
+        Quiz.user_id,
+        Quiz.source_id,
+        Quiz.subject_id,
+        Quiz.quiz_type,
+        Quiz.title,
+        Quiz.time_limit,
+        Quiz.num_questions,
+        Quiz.topics,
+        Quiz.generation_date,
+    )
+
+
+def json_array_length(expr):
+    """Length of a JSONB value that should be an array; 0 if it's missing or
+    isn't one. Lets listings count e.g. a quiz's Teile without loading
+    `content`."""
+    return case((func.jsonb_typeof(expr) == "array", func.jsonb_array_length(expr)), else_=0)
+
+
+def latest_results(db_session, user_id: UUID, quiz_ids: Iterable[UUID]) -> dict[UUID, QuizResult]:
+    """The user's most recent result per quiz, one row each (DISTINCT ON)
+    rather than every attempt; only id / score / date are loaded."""
+    quiz_ids = list(quiz_ids)
+    if not quiz_ids:
+        return {}
+    rows = (
+        db_session.query(QuizResult)
+        .options(load_only(QuizResult.id, QuizResult.quiz_id, QuizResult.score_percentage, QuizResult.attempt_date))
+        .filter(QuizResult.user_id == user_id, QuizResult.quiz_id.in_(quiz_ids))
+        .distinct(QuizResult.quiz_id)
+        .order_by(QuizResult.quiz_id, QuizResult.attempt_date.desc(), QuizResult.id.desc())
+    )
+    return {r.quiz_id: r for r in rows}
@@ -0,0 +1,290 @@
+"""
+Quiz scoring rules, for one attempt and for many at once.
+
+`calculate_quiz_score` (POST /quizzes/submit) scores a single attempt with
+the per-question helpers below. Rescoring in bulk — an answer key corrected
+after the fact, admin re-grades, analytics backfills — goes through
+`AnswerKey` instead: a quiz's key is compiled once into int64 arrays and
+every submission is encoded into one row of a matrix of the same width, so
+checking N attempts is a single numpy comparison rather than N walks over
+the questions.
+
+Both paths share the same rules per question type:
+
+  - multiple_select: the chosen indices, as a set, equal the correct ones;
+  - letter_matching: the chosen letter, trimmed and lower-cased, is
+    non-empty and equals the correct one;
+  - everything else (single_choice, true_false, ...): the choice `==` the
+    correct option index.
+
+Keys or answers that don't fit the integer encoding (a non-integer index,
+more than 63 options, ...) are checked with the scalar rule for that cell,
+so the batch result is always identical to `calculate_quiz_score`.
+scripts/check_scoring_equivalence.py compares the two.
+
+Both work from a quiz's compiled answer key (`compile_answer_key`): one
+`[question_type, correct_answer, topic, explanation]` entry per question —
+everything scoring and the stored breakdown need, without the passages,
+scripts and ad pools Hören/Lesen content carries. It is kept in
+`Quiz.answer_key`, compiled whenever a quiz's content is written (mapper
+events below), so submit loads that column instead of `Quiz.content`.
+Quizzes created before the column existed get it on their first submit.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Iterable, Mapping, Optional, Sequence
+
+from sqlalchemy import event, inspect
+
+from db.models import Quiz
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Per-question encoding kinds.
+_INDEX, _MULTI, _LETTER, _SCALAR = 0, 1, 2, 3
+
+# Sentinels below any real code (indices, letter codes and masks are
+# encoded as themselves). `_NO_MATCH` is only produced for choices and
+# `_UNMATCHABLE` only for keys, so neither ever compares equal to anything.
+_NO_ANSWER = -(2 ** 63)   # None / not answered — equals a None key, as with ==
+_NO_MATCH = -(2 ** 63) + 1
+_UNMATCHABLE = -(2 ** 63) + 2
+_MAX_MULTI_OPTION = 62
+
+
+def question_type(question: dict, quiz_type: str) -> str:
+    # Per-question type wins over the quiz-level type so a mixed quiz
+    # (Lesen) can score each item with its own logic.
+    return question.get("question_type") or quiz_type
+
+
+def correct_answer(question: dict, q_type: str) -> Any:
+    """The value a choice is checked against (also shown for review)."""
+    if q_type == "multiple_select":
+        return question.get("correct_option_indices", [])
+    if q_type == "letter_matching":
+        return (question.get("correct_letter") or "").lower().strip()
+    return question.get("correct_option_index")
+
+
+def is_correct(q_type: str, correct: Any, choice: Any) -> bool:
+    if q_type == "multiple_select":
+        return isinstance(choice, list) and set(choice) == set(correct)
+    if q_type == "letter_matching":
+        # The input field is lenient about whitespace + case.
+        letter = choice.lower().strip() if isinstance(choice, str) else ""
+        return bool(letter) and letter == correct
+    # single_choice, true_false, true_false_ja_nein — index match
+    return choice == correct
+
+
+def compile_answer_key(quiz_content: dict, quiz_type: str) -> list[list]:
+    """[question_type, correct_answer, topic, explanation] per question."""
+    key = []
+    for q in quiz_content.get("questions", []):
+        q_type = question_type(q, quiz_type)
+        key.append([q_type, correct_answer(q, q_type), q.get("topic", "Unknown"), q.get("explanation", "")])
+    return key
+
+
+def choices_from_answers(answers: Iterable) -> dict[int, Any]:
+    """question_index -> choice from submitted `AnswerSubmission`s (a later
+    answer to the same question wins)."""
+    return {a.question_index: a.selected_options for a in answers}
+
+
+def choices_from_breakdown(breakdown: Iterable[dict]) -> dict[int, Any]:
+    """question_index -> choice from a stored `QuizResult.user_answers`."""
+    return {item["question_index"]: item.get("user_choice") for item in breakdown or ()}
+
+
+def _as_int(value: Any) -> Optional[int]:
+    """`value` as an int when it compares equal to one (bools and integral
+    floats included, as with ==), else None."""
+    if isinstance(value, int):
+        return int(value)
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return None
+
+
+def _fits(value: int) -> bool:
+    return _UNMATCHABLE < value < 2 ** 63
+
+
+def _mask(values: Any) -> Optional[int]:
+    """Bitmask of a list of small non-negative ints, else None."""
+    if not isinstance(values, list):
+        return None
+    mask = 0
+    for value in values:
+        as_int = _as_int(value)
+        if as_int is None or not 0 <= as_int <= _MAX_MULTI_OPTION:
+            return None
+        mask |= 1 << as_int
+    return mask
+
+
+class AnswerKey:
+    """A quiz's answer key compiled for batch scoring."""
+
+    def __init__(self, entries: list[list]) -> None:
+        """`entries` as returned by `compile_answer_key`."""
+        import numpy as np
+
+        self.entries = entries
+        self.types = [entry[0] for entry in entries]
+        self.answers = [entry[1] for entry in entries]
+        self._letters: dict[str, int] = {}
+
+        kinds, key = [], []
+        for q_type, correct in zip(self.types, self.answers):
+            kind, code = self._compile(q_type, correct)
+            kinds.append(kind)
+            key.append(code)
+        self.kinds = np.array(kinds, dtype=np.int8)
+        self.key = np.array(key, dtype=np.int64)
+        self._scalar_columns = [i for i, kind in enumerate(kinds) if kind == _SCALAR]
+
+    @classmethod
+    def from_quiz(cls, quiz_content: dict, quiz_type: str) -> "AnswerKey":
+        return cls(compile_answer_key(quiz_content, quiz_type))
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _compile(self, q_type: str, correct: Any) -> tuple[int, int]:
+        if q_type == "multiple_select":
+            mask = _mask(correct)
+            return (_MULTI, mask) if mask is not None else (_SCALAR, 0)
+        if q_type == "letter_matching":
+            if not correct:
+                # An empty key letter matches nothing.
+                return _LETTER, _UNMATCHABLE
+            return _LETTER, self._letters.setdefault(correct, len(self._letters))
+        if correct is None:
+            return _INDEX, _NO_ANSWER
+        as_int = _as_int(correct)
+        if as_int is None or not _fits(as_int):
+            return _SCALAR, 0
+        return _INDEX, as_int
+
+    def _encode(self, kind: int, choice: Any) -> int:
+        if kind == _MULTI:
+            mask = _mask(choice)
+            return mask if mask is not None else _NO_MATCH
+        if kind == _LETTER:
+            if not isinstance(choice, str):
+                return _NO_MATCH
+            return self._letters.get(choice.lower().strip(), _NO_MATCH)
+        if kind == _INDEX:
+            if choice is None:
+                return _NO_ANSWER
+            as_int = _as_int(choice)
+            return as_int if as_int is not None and _fits(as_int) else _NO_MATCH
+        return 0  # _SCALAR columns are checked separately
+
+    def encode(self, choices: Sequence[Mapping[int, Any]]) -> np.ndarray:
+        """(len(choices), len(self)) int64 matrix of encoded choices."""
+        import numpy as np
+
+        kinds = self.kinds.tolist()
+        rows = np.empty((len(choices), len(kinds)), dtype=np.int64)
+        for r, row_choices in enumerate(choices):
+            rows[r] = [self._encode(kind, row_choices.get(i)) for i, kind in enumerate(kinds)]
+        return rows
+
+    def grade(self, choices: Sequence[Mapping[int, Any]]) -> np.ndarray:
+        """(len(choices), len(self)) bool matrix: was question j right in
+        submission i."""
+        correct = self.encode(choices) == self.key
+        for j in self._scalar_columns:
+            q_type, answer = self.types[j], self.answers[j]
+            correct[:, j] = [is_correct(q_type, answer, c.get(j)) for c in choices]
+        return correct
+
+    def score(self, choices: Sequence[Mapping[int, Any]]) -> tuple[np.ndarray, np.ndarray]:
+        """Score percentages (rounded like `calculate_quiz_score`) and the
+        per-question correctness matrix for many submissions."""
+        import numpy as np
+
+        correct = self.grade(choices)
+        if not len(self):
+            return np.zeros(len(choices)), correct
+        scores = correct.sum(axis=1) / len(self) * 100
+        return np.array([round(s, 2) for s in scores.tolist()]), correct
+
+    def breakdown(self, choices: Mapping[int, Any], correct_row: Sequence[bool]) -> list[dict]:
+        """The `QuizResult.user_answers` entries for one graded submission."""
+        return [
+            _breakdown_entry(i, entry, choices.get(i), bool(ok))
+            for i, (entry, ok) in enumerate(zip(self.entries, correct_row))
+        ]
+
+
+def _breakdown_entry(index: int, entry: list, user_choice: Any, correct: bool) -> dict:
+    q_type, answer, topic, explanation = entry
+    return {
+        "question_index": index,
+        "topic": topic,
+        "question_type": q_type,
+        "is_correct": correct,
+        "user_choice": user_choice,
+        "correct_answer": answer,
+        "explanation": explanation,
+    }
+
+
+def score_answer_key(answer_key: list[list], user_answers: list):
+    """Score one attempt against a compiled answer key: (percentage, breakdown)."""
+    user_map = choices_from_answers(user_answers)
+    correct_count = 0
+    detailed_results = []
+    for i, entry in enumerate(answer_key):
+        user_choice = user_map.get(i)
+        correct = is_correct(entry[0], entry[1], user_choice)
+        if correct:
+            correct_count += 1
+        detailed_results.append(_breakdown_entry(i, entry, user_choice, correct))
+
+    score_pct = (correct_count / len(answer_key) * 100) if answer_key else 0
+    return round(score_pct, 2), detailed_results
+
+
+def calculate_quiz_score(quiz_content: dict, quiz_type: str, user_answers: list):
+    """Score a quiz attempt.
+
+    Dispatches per-question on `question_type` when present (mixed-type quizzes
+    like B1 Lesen, where Teil 3 uses letter_matching but other Teile use
+    single_choice / true_false). Falls back to the legacy `quiz_type` argument
+    for older quizzes that have no per-question type tag.
+    """
+    return score_answer_key(compile_answer_key(quiz_content, quiz_type), user_answers)
+
+
+def quiz_answer_key(quiz: Quiz) -> list[list]:
+    """`quiz.answer_key`, compiled from its content (and stored with the
+    caller's commit) if the quiz predates the column."""
+    if quiz.answer_key is None:
+        quiz.answer_key = compile_answer_key(quiz.content, _quiz_type(quiz))
+    return quiz.answer_key
+
+
+def _quiz_type(quiz: Quiz) -> str:
+    # Column default, which isn't applied until the INSERT runs.
+    return quiz.quiz_type if quiz.quiz_type is not None else "single_choice"
+
+
+@event.listens_for(Quiz, "before_insert")
+def _compile_on_insert(_mapper, _connection, quiz: Quiz) -> None:
+    if quiz.content is not None:
+        quiz.answer_key = compile_answer_key(quiz.content, _quiz_type(quiz))
+
+
+@event.listens_for(Quiz, "before_update")
+def _compile_on_update(_mapper, _connection, quiz: Quiz) -> None:
+    state = inspect(quiz)
+    if state.attrs.content.history.has_changes() or state.attrs.quiz_type.history.has_changes():
+        quiz.answer_key = compile_answer_key(quiz.content, _quiz_type(quiz))
@@ -0,0 +1,50 @@
+"""
+Per-user deduplicated storage of QuizSource text.
+
+A QuizSource points at its text by (user_id, text_hash); uploading the same
+material again — into another subject, under another name — adds a source
+row but not another copy of the text. Texts are dropped once no source of
+that user references them.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import uuid
+from typing import Optional
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from db.models import QuizSource, SourceText
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def save_source_text(db: Session, user_id: uuid.UUID, text: str) -> str:
+    """Store `text` for `user_id` unless already stored; returns its hash.
+    Part of the caller's transaction."""
+    digest = text_hash(text)
+    db.execute(
+        pg_insert(SourceText)
+        .values(user_id=user_id, text_hash=digest, text=text)
+        .on_conflict_do_nothing(index_elements=["user_id", "text_hash"])
+    )
+    return digest
+
+
+def delete_source_text_if_unused(db: Session, user_id: uuid.UUID, digest: Optional[str]) -> None:
+    """Call after deleting a source (same transaction, flushed)."""
+    if digest is None:
+        return
+    still_used = (
+        db.query(QuizSource.id)
+        .filter(QuizSource.user_id == user_id, QuizSource.text_hash == digest)
+        .first()
+    )
+    if still_used is None:
+        db.query(SourceText).filter(
+            SourceText.user_id == user_id, SourceText.text_hash == digest
+        ).delete(synchronize_session=False)
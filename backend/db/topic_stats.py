@@ -0,0 +1,206 @@
+"""
+Incremental per-topic answer totals (`user_topic_stats`).
+
+GET /quizzes/performance/by-topic and GET /recommendations/weak-topics used
+to load every QuizResult the user ever produced and walk each `user_answers`
+element in Python. They now read `user_topic_stats`, one row per
+(user, topic), so their cost doesn't grow with quiz history:
+
+  - `record_result` folds a new result's answers in (POST /quizzes/submit),
+    in the same transaction as the QuizResult insert;
+  - `forget_quizzes` subtracts the results of quizzes about to be deleted
+    (directly, or with their source) — the DB cascade removes the results
+    themselves without the ORM seeing them;
+  - `rebuild` recomputes the rows from quiz_results in SQL. The migration
+    that adds the table runs it once; `python -m db.topic_stats` reruns it
+    (for everyone, or --user-id) if the totals are ever in doubt.
+
+Topics are normalised as the endpoints always did: a missing or empty topic
+counts as "Unknown", surrounding whitespace is stripped, and a topic that is
+only whitespace is skipped. `last_seen_at` is the latest attempt that
+touched the topic; it isn't moved back when quizzes are deleted.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import ARRAY, Text, bindparam, case, func, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from db.models import Quiz, QuizResult, UserTopicStat
+
+# Rebuild from quiz_results. Mirrors `topic_counts`; kept in step with the
+# copy in the migration that created the table.
+_REBUILD_SQL = """
+INSERT INTO user_topic_stats (user_id, topic, total, correct, last_seen_at, quiz_ids)
+SELECT r.user_id,
+       t.topic,
+       count(*),
+       count(*) FILTER (WHERE a.answer -> 'is_correct' = 'true'::jsonb),
+       max(r.attempt_date),
+       jsonb_agg(DISTINCT r.quiz_id::text)
+FROM quiz_results r
+CROSS JOIN LATERAL jsonb_array_elements(
+    CASE WHEN jsonb_typeof(r.user_answers) = 'array' THEN r.user_answers ELSE '[]'::jsonb END
+) AS a(answer)
+CROSS JOIN LATERAL (
+    SELECT btrim(coalesce(nullif(a.answer ->> 'topic', ''), 'Unknown'), E' \\t\\r\\n') AS topic
+) AS t
+WHERE t.topic <> '' {user_filter}
+GROUP BY r.user_id, t.topic
+"""
+
+
+def normalize_topic(answer: dict) -> Optional[str]:
+    topic = (answer.get("topic") or "Unknown").strip()
+    return topic or None
+
+
+def topic_counts(answers: Iterable[dict]) -> dict[str, list[int]]:
+    """topic -> [total, correct] over one result's `user_answers`."""
+    counts: dict[str, list[int]] = {}
+    for answer in answers or ():
+        topic = normalize_topic(answer)
+        if topic is None:
+            continue
+        entry = counts.setdefault(topic, [0, 0])
+        entry[0] += 1
+        if answer.get("is_correct"):
+            entry[1] += 1
+    return counts
+
+
+def record_result(
+    db: Session,
+    user_id: uuid.UUID,
+    quiz_id: uuid.UUID,
+    answers: list[dict],
+    seen_at: datetime,
+) -> None:
+    """Add one result's answers to the user's topic rows. The caller commits."""
+    counts = topic_counts(answers)
+    if not counts:
+        return
+    stmt = pg_insert(UserTopicStat).values([
+        {
+            "user_id": user_id,
+            "topic": topic,
+            "total": total,
+            "correct": correct,
+            "last_seen_at": seen_at,
+            "quiz_ids": [str(quiz_id)],
+        }
+        for topic, (total, correct) in counts.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "topic"],
+        set_={
+            "total": UserTopicStat.total + stmt.excluded.total,
+            "correct": UserTopicStat.correct + stmt.excluded.correct,
+            "last_seen_at": func.greatest(UserTopicStat.last_seen_at, stmt.excluded.last_seen_at),
+            "quiz_ids": case(
+                (UserTopicStat.quiz_ids.contains(stmt.excluded.quiz_ids), UserTopicStat.quiz_ids),
+                else_=UserTopicStat.quiz_ids.concat(stmt.excluded.quiz_ids),
+            ),
+        },
+    )
+    db.execute(stmt)
+
+
+def forget_quizzes(
+    db: Session,
+    quiz_ids: Optional[list[uuid.UUID]] = None,
+    *,
+    source_id: Optional[uuid.UUID] = None,
+) -> None:
+    """Subtract the results of the given quizzes (or of every quiz of
+    `source_id`) from their users' topic rows. Call before deleting them, in
+    the same transaction."""
+    query = db.query(QuizResult.user_id, QuizResult.quiz_id, QuizResult.user_answers)
+    if source_id is not None:
+        query = query.join(Quiz, Quiz.id == QuizResult.quiz_id).filter(Quiz.source_id == source_id)
+    elif quiz_ids:
+        query = query.filter(QuizResult.quiz_id.in_(quiz_ids))
+    else:
+        return
+
+    # (user_id, topic) -> [total, correct, {quiz ids}]
+    removed: dict[tuple, list] = defaultdict(lambda: [0, 0, set()])
+    for user_id, quiz_id, answers in query:
+        for topic, (total, correct) in topic_counts(answers).items():
+            entry = removed[(user_id, topic)]
+            entry[0] += total
+            entry[1] += correct
+            entry[2].add(str(quiz_id))
+    if not removed:
+        return
+
+    table = UserTopicStat.__table__
+    db.execute(
+        update(table)
+        .where(table.c.user_id == bindparam("b_user_id"), table.c.topic == bindparam("b_topic"))
+        .values(
+            total=table.c.total - bindparam("b_total"),
+            correct=table.c.correct - bindparam("b_correct"),
+            quiz_ids=table.c.quiz_ids.op("-")(bindparam("b_quiz_ids", type_=ARRAY(Text))),
+        ),
+        [
+            {
+                "b_user_id": user_id,
+                "b_topic": topic,
+                "b_total": total,
+                "b_correct": correct,
+                "b_quiz_ids": sorted(ids),
+            }
+            for (user_id, topic), (total, correct, ids) in removed.items()
+        ],
+    )
+    db.query(UserTopicStat).filter(
+        UserTopicStat.user_id.in_({user_id for user_id, _ in removed}),
+        UserTopicStat.total <= 0,
+    ).delete(synchronize_session=False)
+
+
+def rebuild(db: Session, user_id: Optional[uuid.UUID] = None) -> int:
+    """Recompute topic rows from quiz_results for `user_id` (or everyone).
+    Returns the number of rows written. The caller commits."""
+    params = {}
+    user_filter = ""
+    stale = db.query(UserTopicStat)
+    if user_id is not None:
+        user_filter = "AND r.user_id = :user_id"
+        params["user_id"] = user_id
+        stale = stale.filter(UserTopicStat.user_id == user_id)
+    stale.delete(synchronize_session=False)
+    return db.execute(text(_REBUILD_SQL.format(user_filter=user_filter)), params).rowcount
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rebuild user_topic_stats from quiz_results.")
+    parser.add_argument("--user-id", type=uuid.UUID, default=None, help="Only this user (default: everyone).")
+    args = parser.parse_args()
+
+    from db.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        written = rebuild(db, args.user_id)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    print(f"Rebuilt {written} topic row(s).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
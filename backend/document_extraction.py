@@ -0,0 +1,296 @@
+"""
+Text extraction for uploaded source documents (POST /quizzes/create).
+
+The upload is copied to a temp file in chunks (never held whole in memory)
+and rejected as soon as it passes MAX_UPLOAD_BYTES. Parsing runs in a
+process pool, so neither the event loop nor the request threadpool is held
+by PyMuPDF / python-docx / python-pptx:
+
+  - PDFs are split into runs of EXTRACTION_PAGES_PER_CHUNK pages, extracted
+    in parallel (each worker opens the file by path) and reassembled in page
+    order. At most EXTRACTION_WORKERS chunks are in flight, and no further
+    chunks are scheduled once the text already fills the prompt budget, so a
+    300-page book stops after the pages that can actually be used.
+  - DOCX / PPTX are parsed in one worker task each (their text isn't
+    addressable per page).
+
+The selected page range is validated against EXTRACTION_MAX_PAGES before
+any text is extracted. EXTRACTION_WORKERS=0 parses on a thread instead of a
+process pool (local dev, constrained containers).
+
+With a `PageCache` (db/extraction_cache.py in the app), pages are looked up
+by sha256 of the file — computed while spooling — before anything is
+parsed: a re-upload, or a different page range of a file seen before, only
+extracts the pages nobody has asked for yet.
+
+This module is imported by the pool's child processes, so keep its
+top-level imports light — no database, no FastAPI app.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional, Protocol
+
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(50 * 1024 * 1024)))
+EXTRACTION_MAX_PAGES = int(os.getenv("EXTRACTION_MAX_PAGES", "500"))
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", str(min(4, os.cpu_count() or 1))))
+EXTRACTION_PAGES_PER_CHUNK = int(os.getenv("EXTRACTION_PAGES_PER_CHUNK", "16"))
+
+# Prompt-side cap on source text; see compress_text.
+MAX_SOURCE_CHARS = 40_000
+
+_SPOOL_CHUNK_BYTES = 1024 * 1024
+
+SUPPORTED_EXTENSIONS = {".pdf", ".docx", ".pptx", ".txt"}
+
+
+class ExtractionError(Exception):
+    """Upload rejected; `status_code` is what the router should answer."""
+
+    def __init__(self, message: str, status_code: int = 400) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class PageCache(Protocol):
+    def load(self, content_hash: str, first: int, last: int) -> tuple[Optional[int], dict[int, str]]:
+        """(page_count, {page_number: text}) for cached pages in first..last."""
+
+    def store(self, content_hash: str, file_ext: str, page_count: int, pages: dict[int, str]) -> None:
+        ...
+
+
+def compress_text(text: str, max_chars: int = MAX_SOURCE_CHARS) -> str:
+    """Normalize whitespace and cap text length to reduce token usage."""
+    # Collapse runs of whitespace/newlines to at most 2 newlines
+    text = re.sub(r'\n{3,}', '\n\n', text)
+    text = re.sub(r'[ \t]{2,}', ' ', text)
+    text = text.strip()
+    if len(text) > max_chars:
+        text = text[:max_chars]
+    return text
+
+
+# ── worker functions (run in the pool; must stay top-level / picklable) ──────
+
+
+def _pdf_page_count(path: str) -> int:
+    import fitz  # PyMuPDF
+
+    with fitz.open(path) as doc:
+        return len(doc)
+
+
+def _pdf_pages(path: str, first: int, stop: int) -> list[str]:
+    """Text of 0-based pages [first, stop)."""
+    import fitz  # PyMuPDF
+
+    with fitz.open(path) as doc:
+        return [doc.load_page(n).get_text() for n in range(first, stop)]
+
+
+def _docx_text(path: str) -> str:
+    from docx import Document as DocxDocument
+
+    doc = DocxDocument(path)
+    return "\n".join(p.text for p in doc.paragraphs if p.text.strip())
+
+
+def _pptx_text(path: str) -> str:
+    from pptx import Presentation
+
+    lines = []
+    for slide in Presentation(path).slides:
+        for shape in slide.shapes:
+            if shape.has_text_frame:
+                for paragraph in shape.text_frame.paragraphs:
+                    text = paragraph.text.strip()
+                    if text:
+                        lines.append(text + "\n")
+    return "".join(lines)
+
+
+def _txt_text(path: str) -> str:
+    with open(path, "rb") as f:
+        return f.read().decode("utf-8", errors="ignore")
+
+
+# ── pool ──────────────────────────────────────────────────────────────────────
+
+_pool: Optional[Executor] = None
+_pool_lock = threading.Lock()
+
+
+def _executor() -> Executor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                if EXTRACTION_WORKERS > 0:
+                    # spawn, not fork: the parent has live DB connections and
+                    # worker threads that must not be duplicated into children.
+                    _pool = ProcessPoolExecutor(
+                        max_workers=EXTRACTION_WORKERS,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                else:
+                    _pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="extract")
+    return _pool
+
+
+def _done(value) -> Future:
+    future: Future = Future()
+    future.set_result(value)
+    return future
+
+
+def _pdf_text(
+    path: str,
+    start_page: Optional[int],
+    end_page: Optional[int],
+    max_chars: int,
+    cache: Optional[PageCache] = None,
+    content_hash: Optional[str] = None,
+) -> str:
+    pool = _executor()
+    cached: dict[int, str] = {}
+    total_pages = None
+    if cache is not None:
+        # Page count first (it's on the cache row), then only the wanted range.
+        total_pages, _ = cache.load(content_hash, 1, 0)
+    if total_pages is None:
+        total_pages = pool.submit(_pdf_page_count, path).result()
+    s = start_page if start_page is not None else 1
+    e = end_page if end_page is not None else total_pages
+    if s < 1 or e > total_pages or s > e:
+        raise ExtractionError(f"Invalid page range. PDF has {total_pages} pages.")
+    if e - s + 1 > EXTRACTION_MAX_PAGES:
+        raise ExtractionError(
+            f"Please select at most {EXTRACTION_MAX_PAGES} pages (got {e - s + 1})."
+        )
+    if cache is not None:
+        _, cached = cache.load(content_hash, s, e)
+
+    chunk = max(1, EXTRACTION_PAGES_PER_CHUNK)
+    pending = deque(range(s - 1, e, chunk))
+    in_flight: deque = deque()
+    parts: list[str] = []
+    fresh: dict[int, str] = {}
+    raw_chars = 0
+    window = max(1, EXTRACTION_WORKERS)
+    try:
+        while pending or in_flight:
+            while pending and len(in_flight) < window:
+                first = pending.popleft()
+                stop = min(first + chunk, e)
+                numbers = range(first + 1, stop + 1)  # 1-based
+                if all(n in cached for n in numbers):
+                    in_flight.append((numbers, _done([cached[n] for n in numbers]), True))
+                else:
+                    in_flight.append((numbers, pool.submit(_pdf_pages, path, first, stop), False))
+            numbers, future, from_cache = in_flight.popleft()
+            pages = future.result()
+            if not from_cache:
+                fresh.update(zip(numbers, pages))
+            parts.extend(pages)
+            raw_chars += sum(len(p) for p in pages)
+            # Whitespace collapsing only shrinks text, so the raw count is a
+            # cheap gate before the exact check.
+            if raw_chars > max_chars and len(compress_text("".join(parts), max_chars + 1)) > max_chars:
+                break
+    finally:
+        for _, future, _ in in_flight:
+            future.cancel()
+    if cache is not None:
+        cache.store(content_hash, ".pdf", total_pages, fresh)
+    return "".join(parts)
+
+
+def _extract_path(
+    path: str,
+    ext: str,
+    start_page: Optional[int],
+    end_page: Optional[int],
+    max_chars: int,
+    cache: Optional[PageCache] = None,
+    content_hash: Optional[str] = None,
+) -> str:
+    if ext == ".pdf":
+        return _pdf_text(path, start_page, end_page, max_chars, cache, content_hash)
+
+    # Other formats are one "page" holding the whole text.
+    if cache is not None:
+        _, cached = cache.load(content_hash, 1, 1)
+        if 1 in cached:
+            return cached[1]
+    if ext == ".docx":
+        text = _executor().submit(_docx_text, path).result()
+    elif ext == ".pptx":
+        text = _executor().submit(_pptx_text, path).result()
+    else:
+        text = _txt_text(path)
+    if cache is not None:
+        cache.store(content_hash, ext, 1, {1: text})
+    return text
+
+
+# ── public API ────────────────────────────────────────────────────────────────
+
+
+async def spool_upload(file, max_bytes: int = MAX_UPLOAD_BYTES) -> tuple[str, str]:
+    """Copy an UploadFile to a named temp file. Returns (path, sha256 hex of
+    the bytes); the caller deletes the file. Raises ExtractionError(413)
+    past `max_bytes`."""
+    fd, path = tempfile.mkstemp(prefix="quizify-upload-")
+    digest = hashlib.sha256()
+    written = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await file.read(_SPOOL_CHUNK_BYTES)
+                if not chunk:
+                    break
+                written += len(chunk)
+                if written > max_bytes:
+                    raise ExtractionError(
+                        f"File is too large (limit {max_bytes // (1024 * 1024)} MB).", status_code=413
+                    )
+                digest.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path, digest.hexdigest()
+
+
+async def extract_upload(
+    file,
+    ext: str,
+    start_page: Optional[int] = None,
+    end_page: Optional[int] = None,
+    max_chars: int = MAX_SOURCE_CHARS,
+    cache: Optional[PageCache] = None,
+) -> str:
+    """Spool `file`, extract its text off the event loop and return it
+    compressed to at most `max_chars`. `start_page` / `end_page` (1-based,
+    inclusive) apply to PDFs only. `cache` is consulted and filled on the
+    extraction thread."""
+    if ext not in SUPPORTED_EXTENSIONS:
+        raise ExtractionError(f"Unsupported file type '{ext}'. Supported: PDF, DOCX, PPTX, TXT.")
+    path, content_hash = await spool_upload(file)
+    try:
+        text = await asyncio.to_thread(
+            _extract_path, path, ext, start_page, end_page, max_chars, cache, content_hash
+        )
+    finally:
+        os.unlink(path)
+    return compress_text(text, max_chars)
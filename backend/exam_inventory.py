@@ -0,0 +1,248 @@
+"""
+Pre-generated exam inventory for Hören and Lesen.
+
+A full exam takes ~20–120s to generate, but nothing in it belongs to the
+user until it's persisted as their Quiz. The inventory keeps
+EXAM_INVENTORY_DEPTH finished exams per subject slug in the `exam_inventory`
+table, so POST /horen|lesen/{slug}/quiz can hand one out instead of queueing
+a generation — the user waits for a DELETE and an INSERT:
+
+  - `claim` deletes the oldest stocked exam for a slug and returns its
+    manifest, on the request's session and without committing, so the
+    route's Quiz insert and the claim land together. The row is picked
+    FOR UPDATE SKIP LOCKED: concurrent claims each get a different exam
+    and never wait on each other;
+  - with nothing on the shelf the route queues a generation job as before;
+  - `request_refill` tops a slug back up to the depth, one exam at a time,
+    on its own pool of EXAM_INVENTORY_WORKERS threads — refills never take
+    a generation worker a user is waiting on. Routes call it after every
+    claim; `refill_periodically` (started by main.py) covers startup and
+    retries refills that failed.
+
+Exams come from the same `generate_full_exam` pipelines the jobs run: each
+router declares its slugs with `register_stock` at import time, like
+`register_job_kind`. Consecutive refills get different scenarios because
+the generators rotate through each Teil's topic catalog
+(agents/_tools/topic_rotation.py).
+
+Refill state is per process, but a refill holds a per-slug Postgres
+advisory lock (pg_try_advisory_lock) while it fills: with several worker
+processes, one of them refills a slug and the others skip it instead of
+each generating up to the depth, and every worker's refill at startup
+costs one fill, not one per worker. The holder re-counts the table before
+every exam, so claims made meanwhile are covered; one that lands after its
+last count waits for the next claim or periodic pass.
+
+The inventory is opt-in: every stocked exam is a full generation (model
+calls, and TTS for Hören) spent before anyone asked for it, so
+EXAM_INVENTORY_DEPTH defaults to 0, which turns it off.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from db.database import SessionLocal, engine
+from db.models import ExamInventoryItem
+
+logger = logging.getLogger(__name__)
+
+EXAM_INVENTORY_DEPTH = int(os.getenv("EXAM_INVENTORY_DEPTH", "0"))
+EXAM_INVENTORY_WORKERS = int(os.getenv("EXAM_INVENTORY_WORKERS", "1"))
+
+# How often `refill_periodically` checks every slug. Claims trigger their
+# own refill; this only matters at startup and after a failed refill.
+EXAM_INVENTORY_REFILL_INTERVAL_SECONDS = 10 * 60
+
+
+@dataclass(frozen=True)
+class _Stock:
+    kind: str
+    produce: Callable[[], dict]
+    tts_provider: Optional[str]
+
+
+_stock: dict[str, _Stock] = {}
+_refilling: set[str] = set()
+_requested_again: set[str] = set()
+_lock = threading.Lock()
+_counts = {"claimed": 0, "missed": 0, "stocked": 0, "refill_failures": 0}
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def register_stock(slug: str, *, kind: str, produce: Callable[[], dict], tts_provider: Optional[str] = None) -> None:
+    """Declare how to stock `slug`: `produce()` returns a finished manifest
+    (the generation job kind's `generate_full_exam`, without progress).
+    `tts_provider` is the voice set a Hören stock is rendered with; a request
+    for another provider generates fresh."""
+    _stock[slug] = _Stock(kind=kind, produce=produce, tts_provider=tts_provider)
+
+
+def _bump(key: str) -> None:
+    with _lock:
+        _counts[key] += 1
+
+
+def _matches(slug: str, tts_provider: Optional[str]):
+    provider = (
+        ExamInventoryItem.tts_provider.is_(None) if tts_provider is None
+        else ExamInventoryItem.tts_provider == tts_provider
+    )
+    return (ExamInventoryItem.subject_slug == slug, provider)
+
+
+def claim(db: Session, slug: str, *, tts_provider: Optional[str] = None) -> Optional[dict]:
+    """Take the oldest stocked exam for `slug` off the shelf and return its
+    manifest, or None when there is none. Doesn't commit: the caller's Quiz
+    insert commits the claim with it (and a rollback puts the exam back), so
+    nothing in between may commit on `db` — the routers' subject lookup only
+    flushes. Call `request_refill` once committed."""
+    stock = _stock.get(slug)
+    if EXAM_INVENTORY_DEPTH <= 0 or stock is None or stock.tts_provider != tts_provider:
+        return None
+    oldest = (
+        select(ExamInventoryItem.id)
+        .where(*_matches(slug, tts_provider))
+        .order_by(ExamInventoryItem.created_at)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    try:
+        content = db.execute(
+            delete(ExamInventoryItem)
+            .where(ExamInventoryItem.id == oldest)
+            .returning(ExamInventoryItem.content)
+        ).scalar_one_or_none()
+    except Exception:
+        # An inventory failure must not fail the request: generate instead.
+        db.rollback()
+        logger.warning("Exam inventory claim for %s failed", slug, exc_info=True)
+        content = None
+    _bump("claimed" if content is not None else "missed")
+    return content
+
+
+def _stock_level(slug: str, tts_provider: Optional[str]) -> int:
+    with SessionLocal() as db:
+        return db.scalar(select(func.count()).select_from(ExamInventoryItem).where(*_matches(slug, tts_provider)))
+
+
+def _put(slug: str, stock: _Stock, manifest: dict) -> None:
+    with SessionLocal() as db:
+        db.add(ExamInventoryItem(
+            kind=stock.kind,
+            subject_slug=slug,
+            tts_provider=stock.tts_provider,
+            content=manifest,
+        ))
+        db.commit()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(EXAM_INVENTORY_WORKERS, 1),
+                thread_name_prefix="exam-inventory",
+            )
+        return _executor
+
+
+def _fill(slug: str) -> None:
+    stock = _stock[slug]
+    # Session-level advisory lock on a connection of its own, held for the
+    # whole fill (committed at once so it doesn't sit idle in a transaction).
+    lock_key = func.hashtext(f"exam_inventory:{slug}")
+    with engine.connect() as lock_conn:
+        locked = lock_conn.scalar(select(func.pg_try_advisory_lock(lock_key)))
+        lock_conn.commit()
+        if not locked:
+            logger.info("Exam inventory: %s is being refilled by another process", slug)
+            return
+        try:
+            while _stock_level(slug, stock.tts_provider) < EXAM_INVENTORY_DEPTH:
+                manifest = stock.produce()
+                if not manifest.get("questions"):
+                    raise RuntimeError("generation produced 0 questions")
+                _put(slug, stock, manifest)
+                _bump("stocked")
+                logger.info("Exam inventory: stocked one %s exam", slug)
+        finally:
+            lock_conn.execute(select(func.pg_advisory_unlock(lock_key)))
+            lock_conn.commit()
+
+
+def _refill(slug: str) -> None:
+    while True:
+        try:
+            _fill(slug)
+        except Exception:
+            # Stop here rather than retry at once — a failing model or TTS
+            # provider would just burn calls. The periodic pass tries again.
+            _bump("refill_failures")
+            logger.exception("Exam inventory refill for %s failed", slug)
+            with _lock:
+                _refilling.discard(slug)
+                _requested_again.discard(slug)
+            return
+        with _lock:
+            # A claim that committed after our last count asked again.
+            if slug not in _requested_again:
+                _refilling.discard(slug)
+                return
+            _requested_again.discard(slug)
+
+
+def request_refill(slug: str) -> None:
+    """Top `slug` back up to EXAM_INVENTORY_DEPTH in the background. Returns
+    at once; a refill already running for the slug re-counts when done."""
+    if EXAM_INVENTORY_DEPTH <= 0 or slug not in _stock:
+        return
+    with _lock:
+        if slug in _refilling:
+            _requested_again.add(slug)
+            return
+        _refilling.add(slug)
+    _get_executor().submit(_refill, slug)
+
+
+async def refill_periodically(interval_seconds: int = EXAM_INVENTORY_REFILL_INTERVAL_SECONDS) -> None:
+    """Startup task: `request_refill` every registered slug now and every
+    `interval_seconds` after, until cancelled."""
+    while True:
+        for slug in list(_stock):
+            request_refill(slug)
+        await asyncio.sleep(interval_seconds)
+
+
+def snapshot() -> dict:
+    """Stock per slug, plus this process's claim and refill counters."""
+    with SessionLocal() as db:
+        rows = (
+            db.query(ExamInventoryItem.subject_slug, ExamInventoryItem.tts_provider, func.count())
+            .group_by(ExamInventoryItem.subject_slug, ExamInventoryItem.tts_provider)
+            .all()
+        )
+    stocked = {(slug, provider): n for slug, provider, n in rows}
+    with _lock:
+        return {
+            "depth": EXAM_INVENTORY_DEPTH,
+            "stock": {
+                slug: stocked.get((slug, stock.tts_provider), 0) for slug, stock in _stock.items()
+            },
+            "refilling": sorted(_refilling),
+            **_counts,
+        }
@@ -0,0 +1,621 @@
+"""
+Background generation jobs.
+
+Full Hören exams take ~20–120s (Gemini scripts + Edge TTS + ffmpeg). Running
+that inside the request held the HTTP connection open for the whole time,
+pinned one of uvicorn's threadpool slots, and tripped proxy timeouts under
+load. Instead the route handler calls `submit_job`, which records a job and
+hands the work to a bounded worker pool; the client polls the job until it
+links a Quiz.
+
+Throughput is bounded by GENERATION_WORKERS (default 2). Jobs beyond that
+wait in the executor queue with status="queued", so API latency stays
+constant no matter how many exams are in flight.
+
+Job lifecycle:  queued → running → succeeded | failed
+While running, the job body's `progress(stage, current, total)` calls are
+written straight to the store — the same callback shape `generate_full_exam`
+already emits. `progress.partial(data)` publishes a finished chunk (one Teil)
+without touching the store.
+
+An exam handed out from the pre-generated inventory (exam_inventory.py) is
+recorded by `record_completed_job` as already succeeded, so clients follow
+it the same way and get `done` straight away.
+
+No job stays active longer than JOB_STALE_AFTER: `sweep_periodically`
+(started by main.py in every process) heartbeats the jobs its process owns
+and fails any active job past that age, or whose owning process stopped
+heartbeating — it died in a restart or crash — so clients stop waiting and
+the quota slot is released.
+
+Progress stream (Server-Sent Events):
+  Every status change, progress report and partial result is also appended
+  to a per-job in-process event log. `stream_job_events` replays that log
+  and then follows it, so a client that connects late still sees the whole
+  history. Event types:
+    status   {status}                                   queued / running
+    progress {stage, current, total, percent}
+    partial  {...}                                      one finished chunk
+    done     {status: "succeeded", quiz_id, percent: 100}
+    failed   {status: "failed", error}
+  `percent` is a weighted sum over the stages registered for the job's kind
+  (`register_job_kind`), so "audio 4/8" and "teil 2/5" both land on one
+  0–100 bar. When the job ran in another process (no local log), the stream
+  falls back to polling the store and emits progress from its snapshot.
+
+Storage backends (GENERATION_JOB_BACKEND):
+  - "database" (default): the `generation_jobs` table, via short-lived
+    SessionLocal sessions so worker threads never share a request's session.
+  - "memory": a process-local dict. For tests and local runs without
+    Postgres; jobs don't survive a restart.
+
+Workers are threads rather than processes: generation is I/O bound (HTTP +
+websocket + subprocess waits release the GIL), and threads let the progress
+callback and the final Quiz insert run without pickling anything.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Callable, Optional, Sequence
+
+from fastapi.responses import StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+GENERATION_WORKERS = int(os.getenv("GENERATION_WORKERS", "2"))
+GENERATION_JOB_BACKEND = os.getenv("GENERATION_JOB_BACKEND", "database")
+
+ACTIVE_STATUSES = ("queued", "running")
+
+# A queued/running job older than this can't still be alive — the slowest
+# exam finishes in ~2 minutes. `sweep_jobs` marks such rows failed so the
+# client stops polling and the user's quota slot is released.
+JOB_STALE_AFTER = timedelta(minutes=15)
+
+# Every process stamps `heartbeat_at` on the jobs it owns (queued in its
+# executor or running) this often. A job whose owner has been silent for
+# JOB_OWNER_TIMEOUT died with it — a restart or crash — and is failed by the
+# next sweep in any process, without waiting out JOB_STALE_AFTER.
+JOB_HEARTBEAT_SECONDS = 60
+JOB_OWNER_TIMEOUT = timedelta(minutes=3)
+
+# SSE: how often a stream checks for new events, and how long it may stay
+# silent before sending a keep-alive comment (proxies drop idle streams).
+JOB_EVENT_POLL_SECONDS = 0.5
+JOB_EVENT_KEEPALIVE_SECONDS = 15.0
+
+# Event logs kept in memory. Finished jobs' logs are evicted oldest-first;
+# a stream for an evicted job falls back to the store snapshot.
+JOB_EVENT_LOG_SIZE = 256
+
+ProgressFn = Callable[[str, int, int], None]
+# A job body receives a `JobProgress` (callable as `progress(stage, current,
+# total)`) and returns a result dict; the only key read back is "quiz_id".
+JobBody = Callable[["JobProgress"], dict]
+
+# kind → ((stage, weight), ...) with weights summing to 100, in pipeline order.
+_JOB_STAGES: dict[str, tuple[tuple[str, int], ...]] = {}
+
+_JOB_FIELDS = (
+    "id", "user_id", "kind", "subject_slug", "status", "stage",
+    "progress_current", "progress_total", "params", "quiz_id", "error",
+    "created_at", "started_at", "finished_at", "heartbeat_at",
+)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def register_job_kind(kind: str, stages: Sequence[tuple[str, int]]) -> None:
+    """Declare the progress stages a job kind reports, with their share of
+    the 0–100 bar. Called once at import time by the router that owns the
+    kind. Stages not listed here (e.g. Hören's "teil") still stream, they
+    just don't move `percent`."""
+    _JOB_STAGES[kind] = tuple(stages)
+
+
+def stage_percent(kind: str, fractions: dict[str, float]) -> int:
+    """Weighted completion for `kind` given each stage's completed fraction.
+    Capped at 99 — only a finished job reports 100."""
+    total = sum(weight * min(fractions.get(stage, 0.0), 1.0) for stage, weight in _JOB_STAGES.get(kind, ()))
+    return min(int(total), 99)
+
+
+def _snapshot_percent(job: dict) -> int:
+    """Percent from a store row, which only keeps the latest stage: stages
+    before it count as done."""
+    if job["status"] == "succeeded":
+        return 100
+    fractions: dict[str, float] = {}
+    for stage, _ in _JOB_STAGES.get(job["kind"], ()):
+        if stage == job["stage"]:
+            total = job["progress_total"]
+            fractions[stage] = job["progress_current"] / total if total else 0.0
+            return stage_percent(job["kind"], fractions)
+        fractions[stage] = 1.0
+    return 0
+
+
+# ── Stores ────────────────────────────────────────────────────────────────────
+
+
+class InMemoryJobStore:
+    """Process-local job store. Same interface as DatabaseJobStore."""
+
+    def __init__(self) -> None:
+        self._jobs: dict[uuid.UUID, dict] = {}
+        self._lock = threading.Lock()
+
+    def create(self, *, user_id, kind: str, subject_slug: str, params: Optional[dict], **fields) -> uuid.UUID:
+        job_id = uuid.uuid4()
+        with self._lock:
+            self._jobs[job_id] = {
+                "id": job_id,
+                "user_id": user_id,
+                "kind": kind,
+                "subject_slug": subject_slug,
+                "status": "queued",
+                "stage": None,
+                "progress_current": 0,
+                "progress_total": 0,
+                "params": params,
+                "quiz_id": None,
+                "error": None,
+                "created_at": _now(),
+                "started_at": None,
+                "finished_at": None,
+                "heartbeat_at": _now(),
+                **fields,
+            }
+        return job_id
+
+    def update(self, job_id: uuid.UUID, **fields) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(fields)
+
+    def get(self, job_id: uuid.UUID) -> Optional[dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def count_active(self, user_id, kind: str) -> int:
+        with self._lock:
+            return sum(
+                1 for j in self._jobs.values()
+                if j["user_id"] == user_id and j["kind"] == kind and j["status"] in ACTIVE_STATUSES
+            )
+
+    def transition(self, job_id: uuid.UUID, from_statuses: Sequence[str], **fields) -> bool:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] not in from_statuses:
+                return False
+            job.update(fields)
+            return True
+
+    def touch(self, job_ids: Sequence[uuid.UUID], now: datetime) -> None:
+        with self._lock:
+            for job_id in job_ids:
+                if job_id in self._jobs:
+                    self._jobs[job_id]["heartbeat_at"] = now
+
+    def fail_stale(self, created_before: datetime, silent_since: datetime) -> list[uuid.UUID]:
+        failed = []
+        with self._lock:
+            for j in self._jobs.values():
+                last_seen = j.get("heartbeat_at") or j["created_at"]
+                if j["status"] in ACTIVE_STATUSES and (j["created_at"] < created_before or last_seen < silent_since):
+                    j.update(status="failed", error="interrupted", finished_at=_now())
+                    failed.append(j["id"])
+        return failed
+
+
+class DatabaseJobStore:
+    """Job store backed by the `generation_jobs` table."""
+
+    def create(self, *, user_id, kind: str, subject_slug: str, params: Optional[dict], **fields) -> uuid.UUID:
+        # Deferred imports so the memory backend works without DATABASE_URL.
+        from db.database import SessionLocal
+        from db.models import GenerationJob
+
+        fields.setdefault("status", "queued")
+        fields.setdefault("heartbeat_at", _now())
+        with SessionLocal() as db:
+            job = GenerationJob(
+                id=uuid.uuid4(),
+                user_id=user_id,
+                kind=kind,
+                subject_slug=subject_slug,
+                params=params,
+                **fields,
+            )
+            db.add(job)
+            db.commit()
+            return job.id
+
+    def update(self, job_id: uuid.UUID, **fields) -> None:
+        from db.database import SessionLocal
+        from db.models import GenerationJob
+
+        with SessionLocal() as db:
+            db.query(GenerationJob).filter(GenerationJob.id == job_id).update(fields)
+            db.commit()
+
+    def get(self, job_id: uuid.UUID) -> Optional[dict]:
+        from db.database import SessionLocal
+        from db.models import GenerationJob
+
+        with SessionLocal() as db:
+            job = db.query(GenerationJob).filter(GenerationJob.id == job_id).first()
+            if job is None:
+                return None
+            return {f: getattr(job, f) for f in _JOB_FIELDS}
+
+    def count_active(self, user_id, kind: str) -> int:
+        from db.database import SessionLocal
+        from db.models import GenerationJob
+
+        with SessionLocal() as db:
+            return (
+                db.query(GenerationJob)
+                .filter(
+                    GenerationJob.user_id == user_id,
+                    GenerationJob.kind == kind,
+                    GenerationJob.status.in_(ACTIVE_STATUSES),
+                )
+                .count()
+            )
+
+    def transition(self, job_id: uuid.UUID, from_statuses: Sequence[str], **fields) -> bool:
+        """Update the job only while its status is one of `from_statuses`;
+        False if it has moved on (e.g. a sweep failed it)."""
+        from db.database import SessionLocal
+        from db.models import GenerationJob
+
+        with SessionLocal() as db:
+            updated = (
+                db.query(GenerationJob)
+                .filter(GenerationJob.id == job_id, GenerationJob.status.in_(from_statuses))
+                .update(fields, synchronize_session=False)
+            )
+            db.commit()
+            return bool(updated)
+
+    def touch(self, job_ids: Sequence[uuid.UUID], now: datetime) -> None:
+        from db.database import SessionLocal
+        from db.models import GenerationJob
+
+        with SessionLocal() as db:
+            (
+                db.query(GenerationJob)
+                .filter(GenerationJob.id.in_(job_ids), GenerationJob.status.in_(ACTIVE_STATUSES))
+                .update({"heartbeat_at": now}, synchronize_session=False)
+            )
+            db.commit()
+
+    def fail_stale(self, created_before: datetime, silent_since: datetime) -> list[uuid.UUID]:
+        from sqlalchemy import func, or_, update
+
+        from db.database import SessionLocal
+        from db.models import GenerationJob
+
+        with SessionLocal() as db:
+            failed = db.execute(
+                update(GenerationJob)
+                .where(
+                    GenerationJob.status.in_(ACTIVE_STATUSES),
+                    or_(
+                        GenerationJob.created_at < created_before,
+                        func.coalesce(GenerationJob.heartbeat_at, GenerationJob.created_at) < silent_since,
+                    ),
+                )
+                .values(status="failed", error="interrupted", finished_at=_now())
+                .returning(GenerationJob.id)
+                .execution_options(synchronize_session=False)
+            ).scalars().all()
+            db.commit()
+            return list(failed)
+
+
+class _JobEventLog:
+    """Append-only per-job event lists, shared by the worker threads that
+    write them and the SSE streams that read them."""
+
+    def __init__(self, max_jobs: int) -> None:
+        self._max_jobs = max_jobs
+        self._logs: OrderedDict[uuid.UUID, dict] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def open(self, job_id: uuid.UUID) -> None:
+        with self._lock:
+            self._logs[job_id] = {"events": [], "closed": False}
+            # Evict the oldest finished logs; running jobs are never dropped.
+            while len(self._logs) > self._max_jobs:
+                oldest = next((k for k, v in self._logs.items() if v["closed"]), None)
+                if oldest is None:
+                    break
+                del self._logs[oldest]
+
+    def append(self, job_id: uuid.UUID, event: str, data: dict, *, close: bool = False) -> None:
+        with self._lock:
+            log = self._logs.get(job_id)
+            if log is None:
+                return
+            log["events"].append((event, data))
+            if close:
+                log["closed"] = True
+
+    def read(self, job_id: uuid.UUID, cursor: int) -> Optional[tuple[list[tuple[str, dict]], bool]]:
+        """Events from `cursor` on and whether the log is closed, or None when
+        this process has no log for the job."""
+        with self._lock:
+            log = self._logs.get(job_id)
+            if log is None:
+                return None
+            return log["events"][cursor:], log["closed"]
+
+
+_store = InMemoryJobStore() if GENERATION_JOB_BACKEND == "memory" else DatabaseJobStore()
+_events = _JobEventLog(JOB_EVENT_LOG_SIZE)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+# Jobs this process has submitted and not finished; `sweep_jobs` heartbeats them.
+_owned: set[uuid.UUID] = set()
+_owned_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(GENERATION_WORKERS, 1),
+                thread_name_prefix="generation-job",
+            )
+        return _executor
+
+
+# ── Public API ────────────────────────────────────────────────────────────────
+
+
+class JobProgress:
+    """Progress callback handed to a job body.
+
+    `progress(stage, current, total)` records the stage on the job row and
+    publishes a progress event; `progress.partial(data)` publishes a finished
+    chunk. Percent only moves forward: parallel sections report stages out
+    of order, and a bar that jumps back reads as a stall."""
+
+    def __init__(self, job_id: uuid.UUID, kind: str) -> None:
+        self.job_id = job_id
+        self.kind = kind
+        self._fractions: dict[str, float] = {}
+        self._percent = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, stage: str, current: int, total: int) -> None:
+        with self._lock:
+            self._fractions[stage] = max(self._fractions.get(stage, 0.0), current / total if total else 0.0)
+            self._percent = max(self._percent, stage_percent(self.kind, self._fractions))
+            percent = self._percent
+        _store.update(self.job_id, stage=stage, progress_current=current, progress_total=total)
+        _events.append(
+            self.job_id,
+            "progress",
+            {"stage": stage, "current": current, "total": total, "percent": percent},
+        )
+
+    def partial(self, data: dict) -> None:
+        _events.append(self.job_id, "partial", data)
+
+
+def _run(job_id: uuid.UUID, kind: str, body: JobBody) -> None:
+    try:
+        # A job that waited in the queue past JOB_STALE_AFTER was already
+        # failed by the sweep; the user has been told, don't run it.
+        if not _store.transition(job_id, ("queued",), status="running", started_at=_now()):
+            return
+        _events.append(job_id, "status", {"status": "running"})
+        _execute(job_id, kind, body)
+    finally:
+        with _owned_lock:
+            _owned.discard(job_id)
+
+
+def _execute(job_id: uuid.UUID, kind: str, body: JobBody) -> None:
+    try:
+        result = body(JobProgress(job_id, kind)) or {}
+    except Exception as e:
+        # Full traceback goes to the server log; the client only sees the
+        # one-line summary on the job.
+        logger.exception("Generation job %s failed", job_id)
+        error = f"{type(e).__name__}: {e}"
+        if _store.transition(job_id, ACTIVE_STATUSES, status="failed", error=error, finished_at=_now()):
+            _events.append(job_id, "failed", {"status": "failed", "error": error}, close=True)
+        return
+
+    quiz_id = result.get("quiz_id")
+    if not _store.transition(job_id, ACTIVE_STATUSES, status="succeeded", quiz_id=quiz_id, finished_at=_now()):
+        # Overran JOB_STALE_AFTER and was failed by the sweep; the quiz
+        # still landed in the user's library.
+        logger.warning("Generation job %s finished after it was marked stale (quiz %s)", job_id, quiz_id)
+        return
+    _events.append(
+        job_id,
+        "done",
+        {"status": "succeeded", "quiz_id": str(quiz_id) if quiz_id else None, "percent": 100},
+        close=True,
+    )
+
+
+def submit_job(*, user_id, kind: str, subject_slug: str, body: JobBody, params: Optional[dict] = None) -> uuid.UUID:
+    """Record a queued job and schedule `body(progress)` on the worker pool.
+    Returns the job id immediately."""
+    job_id = _store.create(user_id=user_id, kind=kind, subject_slug=subject_slug, params=params)
+    _events.open(job_id)
+    _events.append(job_id, "status", {"status": "queued"})
+    with _owned_lock:
+        _owned.add(job_id)
+    _get_executor().submit(_run, job_id, kind, body)
+    return job_id
+
+
+def record_completed_job(
+    *, user_id, kind: str, subject_slug: str, quiz_id, params: Optional[dict] = None,
+) -> uuid.UUID:
+    """Record a job that was done before it was queued — an exam handed out
+    by the inventory (exam_inventory.py) — so the client follows it like any
+    other: the poll and the event stream report it succeeded with `quiz_id`."""
+    now = _now()
+    job_id = _store.create(
+        user_id=user_id, kind=kind, subject_slug=subject_slug, params=params,
+        status="succeeded", quiz_id=quiz_id, started_at=now, finished_at=now,
+    )
+    _events.open(job_id)
+    _events.append(job_id, "done", {"status": "succeeded", "quiz_id": str(quiz_id), "percent": 100}, close=True)
+    return job_id
+
+
+def get_job(job_id: uuid.UUID) -> Optional[dict]:
+    return _store.get(job_id)
+
+
+def count_active_jobs(user_id, kind: str) -> int:
+    """Queued + running jobs of `kind` for a user. Quota checks add this to
+    the persisted-quiz count so concurrent submissions can't overshoot."""
+    return _store.count_active(user_id, kind)
+
+
+def sweep_jobs() -> int:
+    """Heartbeat the jobs this process owns, then fail every active job that
+    is older than JOB_STALE_AFTER or whose owner stopped heartbeating (it
+    died in a restart or crash). Returns how many were failed."""
+    now = _now()
+    with _owned_lock:
+        owned = list(_owned)
+    if owned:
+        _store.touch(owned, now)
+    failed = _store.fail_stale(now - JOB_STALE_AFTER, now - JOB_OWNER_TIMEOUT)
+    for job_id in failed:
+        # Only this process's own jobs have a log; for the rest it's a no-op
+        # and their streams follow the store.
+        _events.append(job_id, "failed", {"status": "failed", "error": "interrupted"}, close=True)
+    if failed:
+        logger.warning("Marked %d stale generation job(s) as failed", len(failed))
+    return len(failed)
+
+
+async def sweep_periodically(interval_seconds: int = JOB_HEARTBEAT_SECONDS) -> None:
+    """Startup task: `sweep_jobs` now and every `interval_seconds` until
+    cancelled."""
+    while True:
+        try:
+            await asyncio.to_thread(sweep_jobs)
+        except Exception:
+            logger.exception("Generation job sweep failed")
+        await asyncio.sleep(interval_seconds)
+
+
+def job_status_payload(job: dict) -> dict:
+    """Client-facing view of a job (no params / user id)."""
+    return {
+        "job_id": str(job["id"]),
+        "kind": job["kind"],
+        "subject_slug": job["subject_slug"],
+        "status": job["status"],
+        "stage": job["stage"],
+        "current": job["progress_current"],
+        "total": job["progress_total"],
+        "percent": _snapshot_percent(job),
+        "quiz_id": str(job["quiz_id"]) if job["quiz_id"] else None,
+        "error": job["error"],
+        "created_at": job["created_at"].isoformat() if job["created_at"] else None,
+        "started_at": job["started_at"].isoformat() if job["started_at"] else None,
+        "finished_at": job["finished_at"].isoformat() if job["finished_at"] else None,
+    }
+
+
+# ── Server-Sent Events ────────────────────────────────────────────────────────
+
+
+def sse_event(event: str, data: dict) -> str:
+    """One SSE frame."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _snapshot_event(job: dict) -> tuple[str, dict]:
+    if job["status"] == "succeeded":
+        return "done", {"status": "succeeded", "quiz_id": str(job["quiz_id"]) if job["quiz_id"] else None, "percent": 100}
+    if job["status"] == "failed":
+        return "failed", {"status": "failed", "error": job["error"]}
+    if job["stage"] is None:
+        return "status", {"status": job["status"]}
+    return "progress", {
+        "stage": job["stage"],
+        "current": job["progress_current"],
+        "total": job["progress_total"],
+        "percent": _snapshot_percent(job),
+    }
+
+
+async def stream_job_events(job_id: uuid.UUID) -> AsyncIterator[str]:
+    """SSE frames for one job until it finishes. Callers check ownership
+    before streaming. Store reads go through a thread so the DB backend
+    never blocks the event loop."""
+    cursor = 0
+    last_sent: Optional[tuple[str, dict]] = None
+    idle = 0.0
+    while True:
+        chunk = _events.read(job_id, cursor)
+        if chunk is not None:
+            events, closed = chunk
+            for event, data in events:
+                yield sse_event(event, data)
+            cursor += len(events)
+            if events:
+                idle = 0.0
+            if closed:
+                return
+        else:
+            # Queued by another worker process, or evicted: follow the store.
+            job = await asyncio.to_thread(get_job, job_id)
+            if job is None:
+                yield sse_event("failed", {"status": "failed", "error": "job not found"})
+                return
+            snapshot = _snapshot_event(job)
+            if snapshot != last_sent:
+                yield sse_event(*snapshot)
+                last_sent = snapshot
+                idle = 0.0
+            if job["status"] not in ACTIVE_STATUSES:
+                return
+
+        if idle >= JOB_EVENT_KEEPALIVE_SECONDS:
+            yield ": keep-alive\n\n"
+            idle = 0.0
+        await asyncio.sleep(JOB_EVENT_POLL_SECONDS)
+        idle += JOB_EVENT_POLL_SECONDS
+
+
+def sse_response(frames: AsyncIterator[str]) -> StreamingResponse:
+    """Wrap SSE frames in a streaming response. `X-Accel-Buffering` stops
+    nginx from holding events back until the buffer fills."""
+    return StreamingResponse(
+        frames,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
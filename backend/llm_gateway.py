@@ -0,0 +1,111 @@
+"""
+Shared async gateway for Gemini calls made from request handlers.
+
+Quiz-generation endpoints are `async def`; calling the synchronous
+`client.models.generate_content` from them froze the event loop for the
+whole LLM round trip, so every other request on the worker (auth checks,
+dashboard reads) waited behind it. Handlers now `await generate_json(...)`:
+
+  - the call goes through google-genai's native async client
+    (`client.aio`), so the loop keeps serving while it's in flight;
+  - at most LLM_MAX_CONCURRENCY calls run per process; callers beyond that
+    wait up to LLM_QUEUE_TIMEOUT_SECONDS for a slot, then get a 503;
+  - each call is cancelled after LLM_TIMEOUT_SECONDS with a 504.
+
+The background exam generators (agents/*/services/generation.py) run on the
+generation worker pool, not the event loop; they call the sync API directly
+but share this module's client (`get_client`).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any, Optional
+
+from fastapi import HTTPException
+
+logger = logging.getLogger(__name__)
+
+LLM_MODEL = os.getenv("LLM_MODEL", "gemini-2.5-flash-lite")
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "120"))
+LLM_QUEUE_TIMEOUT_SECONDS = float(os.getenv("LLM_QUEUE_TIMEOUT_SECONDS", "30"))
+
+# Flash-Lite with thinking off: the quiz prompts are extraction/formatting
+# work, and thinking tokens only add latency.
+DEFAULT_CONFIG = {"thinking_config": {"thinking_budget": 0}}
+
+_client = None
+_client_lock = threading.Lock()
+_slots = asyncio.Semaphore(max(1, LLM_MAX_CONCURRENCY))
+
+
+def get_client():
+    """The process-wide Gemini client, built on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from google import genai
+                _client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+    return _client
+
+
+def extract_json(text: str) -> dict:
+    """Parse the JSON object out of a model reply, tolerating prose or
+    markdown fences around it."""
+    match = re.search(r"(\{.*\})", text, re.DOTALL)
+    if match:
+        clean_text = match.group(1)
+    else:
+        clean_text = text.strip()
+        if clean_text.startswith("```"):
+            clean_text = re.sub(r"^```(?:json)?\s*", "", clean_text)
+            clean_text = re.sub(r"\s*```$", "", clean_text)
+    try:
+        return json.loads(clean_text)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"AI returned invalid JSON: {e}")
+
+
+async def generate_content(
+    contents: Any,
+    *,
+    model: str = LLM_MODEL,
+    config: Optional[dict] = None,
+    timeout: float = LLM_TIMEOUT_SECONDS,
+):
+    """`client.aio.models.generate_content` behind the per-process limit and
+    timeout. Raises HTTPException 503 (no slot) / 504 (call timed out)."""
+    try:
+        await asyncio.wait_for(_slots.acquire(), timeout=LLM_QUEUE_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        raise HTTPException(503, "Quiz generation is busy right now. Please try again in a moment.")
+    started = time.perf_counter()
+    try:
+        return await asyncio.wait_for(
+            get_client().aio.models.generate_content(
+                model=model,
+                contents=contents,
+                config=DEFAULT_CONFIG if config is None else config,
+            ),
+            timeout=timeout,
+        )
+    except asyncio.TimeoutError:
+        logger.warning("Gemini call timed out after %.0fs (model=%s)", timeout, model)
+        raise HTTPException(504, "The AI took too long to respond. Please try again.")
+    finally:
+        _slots.release()
+        logger.debug("Gemini call took %.2fs (model=%s)", time.perf_counter() - started, model)
+
+
+async def generate_json(contents: Any, **kwargs) -> dict:
+    """`generate_content` + `extract_json` on the reply text."""
+    response = await generate_content(contents, **kwargs)
+    return extract_json(response.text)
@@ -1,4 +1,6 @@
 #main.py
+import asyncio
+import logging
 import os
 from pathlib import Path
 from dotenv import load_dotenv
@@ -21,6 +23,11 @@ from db.routers.predefined.horen_router import router as horen_router
 from db.routers.predefined.lesen_router import router as lesen_router
 from db.routers.recommendations.recommendations_router import router as recommendations_router
 from db.routers.unsubscribe_router import router as unsubscribe_router
+from agents import warm_chapter_index
+from agents.pmp.knowledge_base.retrieval import warm_exemplar_index
+from db import extraction_cache, revocation
+import exam_inventory
+import generation_jobs
 from starlette.middleware.sessions import SessionMiddleware
 
 
@@ -59,6 +66,60 @@ session_secret_key=os.getenv("SESSION_SECRET_KEY")
 app.add_middleware(SessionMiddleware, secret_key=session_secret_key)
 
 
+@app.on_event("startup")
+async def schedule_generation_job_sweep():
+    # Jobs that were queued/running when their process died would otherwise
+    # be polled forever (and hold the user's quota slot). The task also
+    # heartbeats this process's own jobs so other workers leave them alone.
+    app.state.generation_job_sweeper = asyncio.create_task(generation_jobs.sweep_periodically())
+
+
+@app.on_event("startup")
+async def load_chapter_index():
+    # Chapter lookups and corpus text on the quiz / recommendations paths
+    # read from this index; building it here keeps the first request fast.
+    await asyncio.to_thread(warm_chapter_index)
+
+
+@app.on_event("startup")
+async def load_exemplar_index():
+    # Exemplar sampling reads question ids from memory; load them before the
+    # first quiz request. If the DB isn't reachable yet, the first sample
+    # loads it instead.
+    try:
+        await asyncio.to_thread(warm_exemplar_index)
+    except Exception:
+        logging.exception("Could not load the exemplar index at startup")
+
+
+@app.on_event("startup")
+async def schedule_revocation_pruning():
+    # Revoked-token rows are only needed until the token expires; the task
+    # also rebuilds this worker's revocation Bloom filter after each prune.
+    app.state.revocation_pruner = asyncio.create_task(revocation.prune_periodically())
+
+
+@app.on_event("startup")
+async def schedule_extraction_cache_pruning():
+    # Cached upload pages nobody has re-used within EXTRACTION_CACHE_TTL_DAYS.
+    app.state.extraction_cache_pruner = asyncio.create_task(extraction_cache.prune_periodically())
+
+
+@app.on_event("startup")
+async def schedule_exam_inventory_refill():
+    # Stock pre-generated Hören / Lesen exams up to EXAM_INVENTORY_DEPTH per
+    # slug; claims top it up themselves, this covers startup and failures.
+    app.state.exam_inventory_refiller = asyncio.create_task(exam_inventory.refill_periodically())
+
+
+@app.on_event("shutdown")
+async def stop_background_pruning():
+    app.state.revocation_pruner.cancel()
+    app.state.extraction_cache_pruner.cancel()
+    app.state.exam_inventory_refiller.cancel()
+    app.state.generation_job_sweeper.cancel()
+
+
 # A GET endpoint for simple health check (no DB access)
 @app.get("/")
 def read_root():
@@ -76,4 +137,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Paginated listings return their cursor and count in headers, which the
+    # dashboard (another origin) can only read if they're exposed.
+    expose_headers=["X-Next-Cursor", "X-Total-Count"],
 )
\ No newline at end of file
@@ -107,7 +107,9 @@ class SubjectDetailResponse(SubjectResponse):
     quiz_count: int = 0
 
 
-class QuizResponse(BaseModel):
+class QuizSummaryResponse(BaseModel):
+    """A quiz in a listing — everything but `content`, which only
+    GET /quizzes/{quiz_id} returns."""
     id: UUID
     source_id: Optional[UUID] = None
     subject_id: Optional[UUID] = None
@@ -115,7 +117,6 @@ class QuizResponse(BaseModel):
     quiz_type: str
     num_questions: Optional[int]
     time_limit: Optional[int]
-    content: dict
     topics: Optional[dict] = None
     generation_date: datetime
 
@@ -123,6 +124,10 @@ class QuizResponse(BaseModel):
         from_attributes = True
 
 
+class QuizResponse(QuizSummaryResponse):
+    content: dict
+
+
 class AnswerSubmission(BaseModel):
     question_index: int
     # int = single_choice / true_false answer index
@@ -140,7 +145,10 @@ class CheckoutRequest(BaseModel):
 
 class QuizSourceResponse(BaseModel):
     id: UUID
+    subject_id: Optional[UUID] = None
+    name: Optional[str] = None
     file_name: str
+    topics: Optional[dict] = None
     upload_date: datetime
     start_page: Optional[int] = None
     end_page: Optional[int] = None
@@ -148,6 +156,9 @@ class QuizSourceResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class QuizSourceDetailResponse(QuizSourceResponse):
+    extracted_text: Optional[str] = None
+
 class UserDetailResponse(UserAdminResponse):
     quiz_sources: List[QuizSourceResponse] = []
     quizzes: List[QuizResponse] = []
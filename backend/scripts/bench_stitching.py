@@ -0,0 +1,132 @@
+"""
+Benchmark: stitching multi-speaker Hören turns.
+
+Encodes --turns synthetic speech-length turns (sine tones, 24 kHz mono
+48 kbit/s — the format Edge TTS returns) with ffmpeg, then times three ways
+of joining them with the 0.4 s pause:
+
+  - legacy:      what `stitch_turns` used to do — one ffmpeg process to
+                 encode the silence, another to concat and re-encode;
+  - ffmpeg pass: the single-pass fallback (`_stitch_with_ffmpeg`);
+  - in-process:  MP3 frame splicing (`mp3_frames.concat`), the default.
+
+Prints the median per stitch and the time saved per exam (--scripts
+multi-speaker scripts per exam). Needs ffmpeg (set FFMPEG_BIN or have it on
+PATH):
+
+    python scripts/bench_stitching.py
+    python scripts/bench_stitching.py --turns 24 --repeat 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from agents._tools import horen_audio_generator as audio  # noqa: E402
+
+if os.getenv("FFMPEG_BIN"):
+    audio.FFMPEG_BIN = os.environ["FFMPEG_BIN"]
+
+
+def _encode_turn(path: Path, seconds: float, freq: int) -> None:
+    subprocess.run(
+        [
+            audio.FFMPEG_BIN, "-y", "-loglevel", "error",
+            "-f", "lavfi", "-i", f"sine=frequency={freq}:sample_rate=24000:duration={seconds}",
+            "-ac", "1", "-c:a", "libmp3lame", "-b:a", "48k",
+            str(path),
+        ],
+        check=True,
+    )
+
+
+def _legacy(turn_files: list[Path], out: Path, pause_seconds: float) -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp = Path(tmp_dir)
+        silence = tmp / "silence.mp3"
+        subprocess.run(
+            [
+                audio.FFMPEG_BIN, "-y", "-loglevel", "error",
+                "-f", "lavfi", "-i", "anullsrc=channel_layout=mono:sample_rate=24000",
+                "-t", str(pause_seconds), "-c:a", "libmp3lame", "-q:a", "4", str(silence),
+            ],
+            check=True,
+        )
+        concat_list = tmp / "concat.txt"
+        concat_list.write_text("".join(
+            f"file '{f.absolute()}'\n" + (f"file '{silence.absolute()}'\n" if i < len(turn_files) - 1 else "")
+            for i, f in enumerate(turn_files)
+        ))
+        subprocess.run(
+            [
+                audio.FFMPEG_BIN, "-y", "-loglevel", "error",
+                "-f", "concat", "-safe", "0", "-i", str(concat_list),
+                "-c:a", "libmp3lame", "-q:a", "4", str(out),
+            ],
+            check=True,
+        )
+
+
+def _median_ms(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000.0)
+    return statistics.median(samples)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--turns", type=int, default=16)
+    parser.add_argument("--turn-seconds", type=float, default=4.0)
+    parser.add_argument("--scripts", type=int, default=8, help="Multi-speaker scripts per exam.")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    try:
+        subprocess.run([audio.FFMPEG_BIN, "-version"], capture_output=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        print("ffmpeg not found; set FFMPEG_BIN or put it on PATH.", file=sys.stderr)
+        return 2
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp = Path(tmp_dir)
+        turns = [tmp / f"turn_{i:03d}.mp3" for i in range(args.turns)]
+        for i, path in enumerate(turns):
+            _encode_turn(path, args.turn_seconds, 300 + 40 * i)
+        out = tmp / "out.mp3"
+
+        if audio.mp3_frames.concat([p.read_bytes() for p in turns], audio.TURN_PAUSE_SECONDS) is None:
+            print("turns couldn't be spliced in-process", file=sys.stderr)
+            return 1
+
+        results = {
+            "legacy (2 ffmpeg processes)": _median_ms(
+                lambda: _legacy(turns, out, audio.TURN_PAUSE_SECONDS), args.repeat),
+            "ffmpeg pass (fallback)": _median_ms(
+                lambda: audio._stitch_with_ffmpeg(turns, out, audio.TURN_PAUSE_SECONDS), args.repeat),
+            "in-process (frame splice)": _median_ms(
+                lambda: audio.stitch_turns(turns, out, audio.TURN_PAUSE_SECONDS), args.repeat),
+        }
+
+    legacy = results["legacy (2 ffmpeg processes)"]
+    print(f"{args.turns} turns x {args.turn_seconds:.1f} s, median of {args.repeat}")
+    for label, ms in results.items():
+        print(f"  {label:<28} {ms:9.1f} ms per stitch")
+    saved = (legacy - results["in-process (frame splice)"]) * args.scripts
+    print(f"  saved per exam ({args.scripts} scripts) vs legacy: {saved:9.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""
+Benchmark: sequential vs concurrent turn rendering for multi-speaker Hören
+scripts.
+
+Renders --turns speaker turns through `render_segments` with a fake TTS
+provider that sleeps for a random --min-ms..--max-ms per call (simulated
+network latency; no audio, no ffmpeg, no network) and fails --fail-rate of
+its attempts, which the per-turn retry absorbs. Times concurrency 1 (the old
+turn-by-turn behaviour) against --concurrency, and checks every turn file
+ends up at its own index whatever order the calls finish in.
+
+Usage (from backend/):
+
+    python scripts/bench_tts_turns.py
+    python scripts/bench_tts_turns.py --turns 24 --concurrency 8 --max-ms 1500
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from agents._tools.horen_audio_generator import TTSProvider, render_segments  # noqa: E402
+
+
+class SleepingProvider(TTSProvider):
+    name = "bench_sleep"
+    voice_map = {"female_casual": "a", "male_casual": "b"}
+    default_voice = "a"
+    max_attempts = 3
+    retry_backoff_seconds = (0.05, 0.1)
+
+    def __init__(self, args) -> None:
+        self.rng = random.Random(args.seed)
+        self.min_s = args.min_ms / 1000.0
+        self.max_s = args.max_ms / 1000.0
+        self.fail_rate = args.fail_rate
+        self.calls = 0
+
+    async def asynthesize(self, text: str, voice_role: str, out_path: Path) -> None:
+        self.calls += 1
+        await asyncio.sleep(self.rng.uniform(self.min_s, self.max_s))
+        if self.rng.random() < self.fail_rate:
+            raise RuntimeError("simulated upstream failure")
+        out_path.write_text(text)
+
+
+def _run(args, concurrency: int) -> tuple[float, int]:
+    provider = SleepingProvider(args)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        segments = [
+            (f"turn {i}", "female_casual" if i % 2 else "male_casual", Path(tmp_dir) / f"turn_{i:03d}.mp3")
+            for i in range(args.turns)
+        ]
+        started = time.perf_counter()
+        render_segments(provider, segments, cache=None, concurrency=concurrency)
+        elapsed = time.perf_counter() - started
+        for text, _, path in segments:
+            if path.read_text() != text:
+                raise SystemExit(f"turn file out of order: {path.name} holds {path.read_text()!r}")
+    return elapsed, provider.calls
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--min-ms", type=float, default=300)
+    parser.add_argument("--max-ms", type=float, default=900)
+    parser.add_argument("--fail-rate", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    sequential, seq_calls = _run(args, 1)
+    concurrent, con_calls = _run(args, args.concurrency)
+    print(f"{args.turns} turns, {args.min_ms:.0f}-{args.max_ms:.0f} ms per call, fail rate {args.fail_rate:.0%}")
+    print(f"  concurrency 1    {sequential * 1000:9.1f} ms  ({seq_calls} calls)")
+    print(f"  concurrency {args.concurrency:<4} {concurrent * 1000:9.1f} ms  ({con_calls} calls)")
+    print(f"  speedup          {sequential / concurrent:9.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""
+Query-count regression check for list endpoints.
+
+For each endpoint in CHECKS, a throwaway user is given a small and a large
+library, the endpoint is called through the app for both, and the SQL
+statements issued during the request are counted on the engine. The check
+fails when the count grows with the library size — an N+1 crept back in.
+Authentication is bypassed with a dependency override, so only the
+endpoint's own statements are counted.
+
+Needs a migrated database; everything it creates is deleted again:
+
+    DATABASE_URL=postgresql://... python scripts/check_query_counts.py
+    python scripts/check_query_counts.py --small 1 --large 25
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import uuid
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def _seed_subjects(db, user_id: uuid.UUID, n: int) -> None:
+    from db.models import QuizSource, Subject
+
+    for i in range(n):
+        subject = Subject(user_id=user_id, name=f"Query-count subject {i}")
+        db.add(subject)
+        db.flush()
+        db.add(QuizSource(user_id=user_id, subject_id=subject.id, name=f"Source {i}", file_name="source.txt"))
+
+
+# (label, path, seed(db, user_id, n))
+CHECKS: list[tuple[str, str, Callable]] = [
+    ("GET /subjects", "/subjects", _seed_subjects),
+]
+
+
+def _count_statements(client, path: str) -> int:
+    from sqlalchemy import event
+
+    from db.database import engine
+
+    count = 0
+
+    def on_execute(*_args) -> None:
+        nonlocal count
+        count += 1
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    try:
+        response = client.get(path)
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+    response.raise_for_status()
+    return count
+
+
+def _run_check(client, app, path: str, seed: Callable, n: int) -> int:
+    from db.database import SessionLocal
+    from db.dependency import get_current_user
+    from db.models import User
+
+    db = SessionLocal()
+    user_id = uuid.uuid4()
+    try:
+        db.add(User(id=user_id, email=f"query-count+{user_id.hex}@example.invalid", name="Query count"))
+        db.flush()
+        seed(db, user_id, n)
+        db.commit()
+        app.dependency_overrides[get_current_user] = lambda: User(id=user_id)
+        return _count_statements(client, path)
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+        db.rollback()
+        # Subjects, sources and quizzes go with the user (ON DELETE CASCADE).
+        db.query(User).filter(User.id == user_id).delete(synchronize_session=False)
+        db.commit()
+        db.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Fail if list endpoints issue per-row queries.")
+    parser.add_argument("--small", type=int, default=1)
+    parser.add_argument("--large", type=int, default=20)
+    args = parser.parse_args()
+
+    if not os.getenv("DATABASE_URL"):
+        print("DATABASE_URL must point at a migrated database.", file=sys.stderr)
+        return 2
+
+    from fastapi.testclient import TestClient
+
+    from main import app
+
+    failed = False
+    # No `with`: startup hooks (background pruning etc.) aren't needed here.
+    client = TestClient(app)
+    for label, path, seed in CHECKS:
+        small = _run_check(client, app, path, seed, args.small)
+        large = _run_check(client, app, path, seed, args.large)
+        ok = large == small
+        failed |= not ok
+        print(f"{'OK  ' if ok else 'FAIL'} {label}: {small} statement(s) at {args.small}, {large} at {args.large}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
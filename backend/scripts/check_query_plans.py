@@ -0,0 +1,211 @@
+"""
+Query-plan check for the hottest query shapes.
+
+Seeds a migrated Postgres with synthetic users (quizzes of every type,
+results, subjects, generation jobs), ANALYZEs, then runs EXPLAIN on each
+shape in `_checks` and fails unless the plan reads the expected index
+(Index Scan, Index Only Scan or Bitmap Index Scan). Everything runs in one
+transaction that is rolled back, so nothing it seeds is left behind.
+
+Each shape is built from the models the same way the endpoint builds it,
+so a query change that stops matching an index shows up here:
+
+    DATABASE_URL=postgresql://... python scripts/check_query_plans.py
+    python scripts/check_query_plans.py --users 500 --quizzes-per-user 80 -v
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+QUIZ_TYPES = ["single_choice", "multiple_select", "audio_listening", "reading"]
+JOB_STATUSES = ["succeeded"] * 18 + ["failed", "running"]
+
+
+def _seed(conn, args) -> uuid.UUID:
+    """Insert the synthetic data; returns the id of one user to query for."""
+    from sqlalchemy import insert
+
+    from db.models import GenerationJob, Quiz, QuizResult, Subject, User
+
+    rng = random.Random(args.seed)
+    now = datetime.now(timezone.utc)
+    users, subjects, quizzes, results, jobs = [], [], [], [], []
+    for u in range(args.users):
+        user_id = uuid.uuid4()
+        users.append({"id": user_id, "email": f"plan-check+{user_id.hex}@example.invalid", "name": f"User {u}"})
+        for s in range(5):
+            subjects.append({"id": uuid.uuid4(), "user_id": user_id, "name": f"Subject {s}"})
+        for q in range(args.quizzes_per_user):
+            quiz_id = uuid.uuid4()
+            generated = now - timedelta(hours=rng.randint(0, 24 * 365))
+            quizzes.append({
+                "id": quiz_id,
+                "user_id": user_id,
+                "quiz_type": rng.choice(QUIZ_TYPES),
+                "title": f"Quiz {q}",
+                "num_questions": 10,
+                "content": {"questions": []},
+                "generation_date": generated,
+            })
+            for _ in range(rng.randint(0, 3)):
+                results.append({
+                    "id": uuid.uuid4(),
+                    "quiz_id": quiz_id,
+                    "user_id": user_id,
+                    "score_percentage": rng.randint(0, 100),
+                    "is_passed": rng.random() < 0.5,
+                    "user_answers": [],
+                    "attempt_date": generated + timedelta(minutes=rng.randint(5, 60 * 24 * 30)),
+                })
+        for _ in range(10):
+            jobs.append({
+                "id": uuid.uuid4(),
+                "user_id": user_id,
+                "kind": rng.choice(["horen", "lesen"]),
+                "subject_slug": "deutsch_b1_horen",
+                "status": rng.choice(JOB_STATUSES),
+            })
+
+    for model, rows in ((User, users), (Subject, subjects), (Quiz, quizzes), (QuizResult, results), (GenerationJob, jobs)):
+        for start in range(0, len(rows), 5000):
+            conn.execute(insert(model), rows[start:start + 5000])
+    for model in (User, Subject, Quiz, QuizResult, GenerationJob):
+        conn.exec_driver_sql(f"ANALYZE {model.__tablename__}")
+    print(
+        f"seeded {len(users)} users, {len(quizzes)} quizzes, {len(results)} results, "
+        f"{len(subjects)} subjects, {len(jobs)} jobs"
+    )
+    return users[0]["id"]
+
+
+def _checks(user_id: uuid.UUID, quiz_id: uuid.UUID):
+    """(label, statement, indexes any one of which the plan must use)."""
+    from sqlalchemy import func, select
+
+    from db.models import GenerationJob, Quiz, QuizResult, Subject
+    from generation_jobs import ACTIVE_STATUSES
+
+    week_ago = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=7)
+    return [
+        (
+            "Hören quota window (quiz type since date)",
+            select(Quiz.id, Quiz.generation_date)
+            .where(Quiz.user_id == user_id, Quiz.quiz_type == "audio_listening", Quiz.generation_date >= week_ago)
+            .order_by(Quiz.generation_date.asc()),
+            "ix_quizzes_user_id_quiz_type_generation_date",
+        ),
+        (
+            "Lesen trial quota (count of quiz type)",
+            select(func.count()).select_from(Quiz).where(Quiz.user_id == user_id, Quiz.quiz_type == "reading"),
+            "ix_quizzes_user_id_quiz_type_generation_date",
+        ),
+        (
+            "results of one quiz, newest first",
+            select(QuizResult.id)
+            .where(QuizResult.quiz_id == quiz_id, QuizResult.user_id == user_id)
+            .order_by(QuizResult.attempt_date.desc(), QuizResult.id.desc()),
+            # A quiz has a handful of results; the planner may rightly go
+            # straight to them by quiz_id.
+            ("ix_quiz_results_user_id_quiz_id_attempt_date", "ix_quiz_results_quiz_id"),
+        ),
+        (
+            "predefined subject by name",
+            select(Subject.id).where(Subject.user_id == user_id, Subject.name == "Subject 3").limit(1),
+            "ix_subjects_user_id_name",
+        ),
+        (
+            "active generation jobs",
+            select(func.count()).select_from(GenerationJob).where(
+                GenerationJob.user_id == user_id,
+                GenerationJob.kind == "horen",
+                GenerationJob.status.in_(ACTIVE_STATUSES),
+            ),
+            "ix_generation_jobs_active_user_id_kind",
+        ),
+        (
+            "my_quizzes page",
+            select(Quiz.id)
+            .where(Quiz.user_id == user_id)
+            .order_by(Quiz.generation_date.desc().nulls_first(), Quiz.id.desc())
+            .limit(21),
+            "ix_quizzes_user_id_generation_date_id",
+        ),
+        (
+            "my_results page",
+            select(QuizResult.id)
+            .where(QuizResult.user_id == user_id)
+            .order_by(QuizResult.attempt_date.desc().nulls_first(), QuizResult.id.desc())
+            .limit(21),
+            "ix_quiz_results_user_id_attempt_date_id",
+        ),
+    ]
+
+
+def _indexes_used(plan: dict) -> set[str]:
+    found = set()
+    if plan.get("Node Type") in ("Index Scan", "Index Only Scan", "Bitmap Index Scan") and "Index Name" in plan:
+        found.add(plan["Index Name"])
+    for child in plan.get("Plans", ()):
+        found |= _indexes_used(child)
+    return found
+
+
+def _explain(conn, statement) -> dict:
+    compiled = statement.compile(dialect=conn.dialect, compile_kwargs={"render_postcompile": True})
+    params = {k: str(v) if isinstance(v, uuid.UUID) else v for k, v in compiled.params.items()}
+    raw = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", params).scalar()
+    return (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Fail if a hot query shape doesn't use its index.")
+    parser.add_argument("--users", type=int, default=300)
+    parser.add_argument("--quizzes-per-user", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-v", "--verbose", action="store_true", help="Print every plan.")
+    args = parser.parse_args()
+
+    if not os.getenv("DATABASE_URL"):
+        print("DATABASE_URL must point at a migrated database.", file=sys.stderr)
+        return 2
+
+    from sqlalchemy import select
+
+    from db.database import engine
+    from db.models import Quiz
+
+    failed = False
+    with engine.connect() as conn:
+        trans = conn.begin()
+        try:
+            user_id = _seed(conn, args)
+            quiz_id = conn.execute(select(Quiz.id).where(Quiz.user_id == user_id).limit(1)).scalar()
+            for label, statement, expected in _checks(user_id, quiz_id):
+                expected = (expected,) if isinstance(expected, str) else expected
+                plan = _explain(conn, statement)
+                used = _indexes_used(plan)
+                ok = bool(used.intersection(expected))
+                failed |= not ok
+                print(
+                    f"{'OK  ' if ok else 'FAIL'} {label}: expected {' or '.join(expected)}, "
+                    f"plan uses {', '.join(sorted(used)) or 'no index'}"
+                )
+                if args.verbose or not ok:
+                    print(json.dumps(plan, indent=2))
+        finally:
+            trans.rollback()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+Load test: /auth/verify latency while quiz generations are in flight.
+
+Before llm_gateway.py, the quiz endpoints ran the blocking Gemini call on
+the event loop, so a handful of generations stalled every other request on
+the worker. This script checks that doesn't happen any more:
+
+  1. baseline — probe GET /auth/verify for --baseline-seconds;
+  2. load — start --generations concurrent POST /quizzes/create calls (from
+     an existing source, so no upload) and keep probing /auth/verify until
+     they have all finished;
+  3. compare p50 / p95 / max and exit non-zero if the loaded p95 is more
+     than --max-ratio × baseline p95 (+ --slack-ms).
+
+Runs against a live server with a Pro account's access token:
+
+    python scripts/load_test_llm_gateway.py \\
+        --base-url http://localhost:8000 --token "$TOKEN" --source-id <uuid>
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+import httpx
+
+
+async def _probe(client: httpx.AsyncClient, until, interval: float) -> list[float]:
+    """Hit /auth/verify back to back until `until()` is true; latencies in ms."""
+    latencies = []
+    while not until():
+        started = time.perf_counter()
+        response = await client.get("/auth/verify")
+        latencies.append((time.perf_counter() - started) * 1000.0)
+        response.raise_for_status()
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def _generate(client: httpx.AsyncClient, source_id: str, num_questions: int) -> tuple[int, float]:
+    started = time.perf_counter()
+    response = await client.post(
+        "/quizzes/create",
+        data={"source_id": source_id, "num_questions": str(num_questions), "quiz_name": "load test"},
+        timeout=None,
+    )
+    return response.status_code, time.perf_counter() - started
+
+
+def _summary(latencies: list[float]) -> dict:
+    ordered = sorted(latencies)
+    return {
+        "n": len(ordered),
+        "p50": statistics.median(ordered),
+        "p95": ordered[max(0, int(len(ordered) * 0.95) - 1)],
+        "max": ordered[-1],
+    }
+
+
+async def run(args) -> int:
+    headers = {"Authorization": f"Bearer {args.token}"}
+    async with httpx.AsyncClient(base_url=args.base_url, headers=headers, timeout=30) as client:
+        deadline = time.monotonic() + args.baseline_seconds
+        probes = [
+            _probe(client, lambda: time.monotonic() > deadline, args.interval)
+            for _ in range(args.probes)
+        ]
+        baseline = [ms for batch in await asyncio.gather(*probes) for ms in batch]
+
+        generations = [
+            asyncio.create_task(_generate(client, args.source_id, args.num_questions))
+            for _ in range(args.generations)
+        ]
+        # Give the requests a moment to reach the gateway before measuring.
+        await asyncio.sleep(0.5)
+        probes = [
+            _probe(client, lambda: all(g.done() for g in generations), args.interval)
+            for _ in range(args.probes)
+        ]
+        loaded = [ms for batch in await asyncio.gather(*probes) for ms in batch]
+        results = await asyncio.gather(*generations)
+
+    base, load = _summary(baseline), _summary(loaded)
+    print(f"{'':10} {'n':>6} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    for label, s in (("baseline", base), ("loaded", load)):
+        print(f"{label:10} {s['n']:>6} {s['p50']:>9.1f} {s['p95']:>9.1f} {s['max']:>9.1f}")
+    statuses = [status for status, _ in results]
+    print(f"generations: {len(results)} · statuses {sorted(set(statuses))} · "
+          f"slowest {max(seconds for _, seconds in results):.1f}s")
+
+    limit = base["p95"] * args.max_ratio + args.slack_ms
+    if load["p95"] > limit:
+        print(f"FAIL: loaded p95 {load['p95']:.1f}ms > {limit:.1f}ms")
+        return 1
+    print(f"OK: loaded p95 {load['p95']:.1f}ms <= {limit:.1f}ms")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check /auth/verify stays responsive during quiz generation.")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--token", required=True, help="Access token of a Pro user.")
+    parser.add_argument("--source-id", required=True, help="QuizSource id owned by that user.")
+    parser.add_argument("--generations", type=int, default=10, help="Concurrent quiz generations (default 10).")
+    parser.add_argument("--num-questions", type=int, default=5)
+    parser.add_argument("--probes", type=int, default=4, help="Concurrent /auth/verify probe loops (default 4).")
+    parser.add_argument("--interval", type=float, default=0.05, help="Pause between probes per loop, seconds.")
+    parser.add_argument("--baseline-seconds", type=float, default=5.0)
+    parser.add_argument("--max-ratio", type=float, default=3.0)
+    parser.add_argument("--slack-ms", type=float, default=25.0)
+    return asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
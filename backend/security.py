@@ -1,3 +1,4 @@
+import uuid
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 from passlib.context import CryptContext
@@ -35,8 +36,9 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    # PyJWT uses 'exp' claim automatically
-    to_encode.update({"exp": expire})
+    # PyJWT uses 'exp' claim automatically. `jti` gives logout a short,
+    # stable id to revoke (db/revocation.py) instead of the whole token.
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     
     # Encode the token
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
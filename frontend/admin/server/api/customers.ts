@@ -34,18 +34,27 @@ export default eventHandler(async (event) => {
   }
 
   const backendUrl = process.env.NUXT_PUBLIC_API_BASE_URL || 'http://localhost:8000'
-  
+
+  // Search, sort and paging happen in the backend; pass them straight through.
+  const { q, sort, order, limit, after } = getQuery(event)
+
   try {
     // 3. Use the token from the session to authorize the FastAPI request
-    const response = await $fetch(`${backendUrl}/admin/allusers`, {
+    const response = await $fetch.raw<AdminUser[]>(`${backendUrl}/admin/allusers`, {
       method: 'GET',
       headers: {
         'Authorization': `Bearer ${session.token}`,
         'Content-Type': 'application/json'
-      }
+      },
+      query: { q: q || undefined, sort, order, limit, after: after || undefined }
     })
-    
-    return response
+
+    // The backend sends the next page's cursor as a header; hand it to the
+    // page in the body, next to the rows.
+    return {
+      users: response._data ?? [],
+      next_cursor: response.headers.get('X-Next-Cursor')
+    }
   } catch (error: any) {
     console.error('Error fetching users from FastAPI:', error.data || error.message)
     throw createError({
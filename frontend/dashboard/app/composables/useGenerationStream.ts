@@ -0,0 +1,170 @@
+/**
+ * Follows a quiz-generation progress stream (Server-Sent Events) so the
+ * generate buttons can show a real progress bar instead of a blind spinner.
+ *
+ * Two transports, one event vocabulary:
+ *   - job streams (GET /horen|lesen/jobs/{id}/events) via EventSource, which
+ *     falls back to polling GET /…/jobs/{id} if the stream can't be opened;
+ *   - POST streams (/predefined/{slug}/quiz/stream), read off fetch().
+ *
+ * Events: status {status} · progress {stage, current, total, percent} ·
+ * partial {…one finished Teil / chapter…} · done {quiz_id} · failed {error}
+ */
+
+export type GenerationProgress = {
+  status: 'queued' | 'running' | 'succeeded' | 'failed'
+  stage: string | null
+  current: number
+  total: number
+  percent: number
+  /** One entry per finished Teil / chapter, in completion order. */
+  partials: Record<string, any>[]
+}
+
+type GenerationHandlers = {
+  onDone: (quizId: string) => void
+  /** `message` is the server's error, or null for the caller's own wording. */
+  onFailed: (message: string | null) => void
+}
+
+const EVENT_NAMES = ['status', 'progress', 'partial', 'done', 'failed'] as const
+
+// Poll interval when EventSource isn't available (old proxy, blocked stream).
+const JOB_POLL_INTERVAL_MS = 2000
+
+export function useGenerationStream() {
+  const config = useRuntimeConfig()
+  const progress = ref<GenerationProgress | null>(null)
+
+  let source: EventSource | null = null
+  let pollTimer: ReturnType<typeof setTimeout> | null = null
+  let abort: AbortController | null = null
+
+  function stop() {
+    source?.close()
+    source = null
+    if (pollTimer) clearTimeout(pollTimer)
+    pollTimer = null
+    abort?.abort()
+    abort = null
+  }
+
+  function start() {
+    stop()
+    progress.value = { status: 'queued', stage: null, current: 0, total: 0, percent: 0, partials: [] }
+  }
+
+  function apply(event: string, data: any, handlers: GenerationHandlers) {
+    const p = progress.value
+    if (!p) return
+    if (event === 'status') {
+      p.status = data.status
+    } else if (event === 'progress') {
+      p.status = 'running'
+      p.stage = data.stage
+      p.current = data.current
+      p.total = data.total
+      p.percent = Math.max(p.percent, data.percent ?? 0)
+    } else if (event === 'partial') {
+      p.partials.push(data)
+    } else if (event === 'done') {
+      p.status = 'succeeded'
+      p.percent = 100
+      stop()
+      handlers.onDone(data.quiz_id)
+    } else if (event === 'failed') {
+      p.status = 'failed'
+      stop()
+      handlers.onFailed(data.error || null)
+    }
+  }
+
+  async function pollJob(pollPath: string, handlers: GenerationHandlers) {
+    let job: any
+    try {
+      job = await $fetch(`${config.public.apiBase}${pollPath}`, { credentials: 'include' })
+    } catch (e: any) {
+      stop()
+      handlers.onFailed(e?.data?.detail || e?.message || null)
+      return
+    }
+    if (job.status === 'succeeded' && job.quiz_id) return apply('done', job, handlers)
+    if (job.status === 'failed') return apply('failed', job, handlers)
+    if (job.stage) apply('progress', job, handlers)
+    else apply('status', job, handlers)
+    pollTimer = setTimeout(() => pollJob(pollPath, handlers), JOB_POLL_INTERVAL_MS)
+  }
+
+  /** Follow a queued job (`events_url` / `poll_url` from the 202 response). */
+  function followJob(eventsPath: string, pollPath: string, handlers: GenerationHandlers) {
+    start()
+    source = new EventSource(`${config.public.apiBase}${eventsPath}`, { withCredentials: true })
+    for (const name of EVENT_NAMES) {
+      source.addEventListener(name, (e) => apply(name, JSON.parse((e as MessageEvent).data), handlers))
+    }
+    // Transport error (not the job's own `failed` event). EventSource would
+    // retry forever; switch to polling, which also survives a server restart.
+    source.onerror = () => {
+      if (!source) return
+      source.close()
+      source = null
+      pollTimer = setTimeout(() => pollJob(pollPath, handlers), JOB_POLL_INTERVAL_MS)
+    }
+  }
+
+  /**
+   * POST `body` as JSON and follow the SSE response. Returns the Response so
+   * the caller can handle non-2xx statuses (403 → subscription modal, …);
+   * events are only read from a successful response.
+   */
+  async function streamPost(path: string, body: unknown, handlers: GenerationHandlers): Promise<Response> {
+    start()
+    abort = new AbortController()
+    const res = await fetch(`${config.public.apiBase}${path}`, {
+      method: 'POST',
+      credentials: 'include',
+      headers: { 'Content-Type': 'application/json', Accept: 'text/event-stream' },
+      body: JSON.stringify(body),
+      signal: abort.signal,
+    })
+    if (!res.ok || !res.body) return res
+
+    const reader = res.body.pipeThrough(new TextDecoderStream()).getReader()
+    let buffer = ''
+    try {
+      while (true) {
+        const { value, done } = await reader.read()
+        if (done) break
+        buffer += value
+        let sep: number
+        while ((sep = buffer.indexOf('\n\n')) !== -1) {
+          const frame = buffer.slice(0, sep)
+          buffer = buffer.slice(sep + 2)
+          let event = 'message'
+          let data = ''
+          for (const line of frame.split('\n')) {
+            if (line.startsWith('event: ')) event = line.slice(7)
+            else if (line.startsWith('data: ')) data += line.slice(6)
+          }
+          if (data) apply(event, JSON.parse(data), handlers)
+        }
+      }
+    } catch (e: any) {
+      if (e?.name === 'AbortError') return res
+      throw e
+    }
+    // Stream closed without a verdict (connection dropped mid-generation).
+    const status = progress.value?.status
+    if (status !== 'succeeded' && status !== 'failed') handlers.onFailed(null)
+    return res
+  }
+
+  if (getCurrentInstance()) onUnmounted(stop)
+
+  return {
+    progress,
+    followJob,
+    streamPost,
+    stop,
+  }
+}
@@ -0,0 +1,47 @@
+/**
+ * Cursor paging for the history listings (my quizzes, a subject's quizzes,
+ * Hören/Lesen sessions). Each request returns one page — the backend's
+ * default page size unless the URL sets `limit` — and the cursor for the
+ * next page in the X-Next-Cursor header, absent on the last page.
+ * `loadMore()` follows it and appends. `rows` picks the list out of the body
+ * for endpoints that wrap it (the sessions listings return `{ sessions }`).
+ */
+
+export function usePagedList<T = any>(url: () => string, rows: (body: any) => T[] = body => body) {
+  const items = ref<T[]>([]) as Ref<T[]>
+  const nextCursor = ref<string | null>(null)
+  const isLoadingMore = ref(false)
+  const hasMore = computed(() => nextCursor.value !== null)
+
+  async function fetchPage(after: string | null): Promise<T[]> {
+    const base = url()
+    const target = after
+      ? `${base}${base.includes('?') ? '&' : '?'}after=${encodeURIComponent(after)}`
+      : base
+    const res = await fetch(target, { credentials: 'include' })
+    if (!res.ok) throw new Error(`GET ${base} failed: ${res.status}`)
+    nextCursor.value = res.headers.get('X-Next-Cursor')
+    return rows(await res.json())
+  }
+
+  /** First page, replacing whatever was loaded. */
+  async function reload(): Promise<T[]> {
+    items.value = await fetchPage(null)
+    return items.value
+  }
+
+  /** Next page appended to `items`; returns just the new rows. */
+  async function loadMore(): Promise<T[]> {
+    if (!nextCursor.value || isLoadingMore.value) return []
+    isLoadingMore.value = true
+    try {
+      const page = await fetchPage(nextCursor.value)
+      items.value = [...items.value, ...page]
+      return page
+    } finally {
+      isLoadingMore.value = false
+    }
+  }
+
+  return { items, hasMore, isLoadingMore, reload, loadMore }
+}
@@ -54,7 +54,7 @@ export interface Quiz {
   quiz_type: QuizType
   num_questions: number
   time_limit: number
-  content: Question[]
+  content?: Question[]  // GET /quizzes/{id} only; listings leave it out
   generation_date: string
 }
 
@@ -62,7 +62,7 @@ export interface QuizSource {
   id: number
   user_id: number
   file_name: string
-  extracted_text: string
+  extracted_text?: string
   upload_date: string
   start_page?: number
   end_page?: number